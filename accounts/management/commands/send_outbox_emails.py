@@ -0,0 +1,46 @@
+import time
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from accounts.outbox import send_outbox_batch
+
+
+class Command(BaseCommand):
+    help = "Send the emails queued in the outbox, batching them over one SMTP connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Send what is due and exit instead of polling"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help="Most emails sent per batch",
+        )
+
+    def handle(self, *args, **options):
+        mail_connection = get_connection()
+        total_sent = total_failed = 0
+
+        try:
+            while True:
+                # The connection stays open while full batches keep coming, closed when idle
+                mail_connection.open()
+                sent, failed = send_outbox_batch(mail_connection, options["batch_size"])
+                total_sent += sent
+                total_failed += failed
+
+                if sent + failed < options["batch_size"]:
+                    mail_connection.close()
+                    if options["once"]:
+                        break
+                    time.sleep(settings.EMAIL_OUTBOX_POLL_INTERVAL)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            mail_connection.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Sent {total_sent} emails, {total_failed} failed attempts")
+        )
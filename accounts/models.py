@@ -20,6 +20,8 @@ TOKEN_TYPE = (
 
 GENDER = (('MALE', 'MALE'), ('FEMALE', 'FEMALE'))
 
+OUTBOX_STATUS = (('PENDING', 'PENDING'), ('SENT', 'SENT'), ('FAILED', 'FAILED'))
+
 
 # Create a new user
 class CustomUserManager(BaseUserManager):
@@ -69,6 +71,7 @@ class User(AbstractUser):
     is_verified = models.BooleanField(default=False, null=True)
     image_url = models.CharField(max_length=255, null=True)
     cloud_id = models.CharField(max_length=255, null=True)
+    # Snapshot of chat presence, written by `manage.py flush_presence`
     online_count = models.IntegerField(default=0, validators=[MinValueValidator(0)])
     created_at = models.DateTimeField(auto_now_add=True, null=True)
     updated_at = models.DateTimeField(auto_now=True, null=True)
@@ -106,6 +109,7 @@ class User(AbstractUser):
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [models.Index(fields=["organization_id"], name="user_organization_id_idx")]
 
 
 @receiver(post_save, sender=User)
@@ -138,4 +142,26 @@ class Token(models.Model):
 
     def reset_user_password(self, password):
         self.user.set_password(password)
-        self.user.save()
+        self.user.save()
+
+
+class OutboxEmail(models.Model):
+    """An email waiting to be sent by the send_outbox_emails worker"""
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    html_message = models.TextField()
+    status = models.CharField(max_length=20, choices=OUTBOX_STATUS, default='PENDING')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_attempt_idx')
+        ]
+
+    def __str__(self):
+        return f"{self.subject} --> {self.recipient} ({self.status})"
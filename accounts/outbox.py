@@ -0,0 +1,81 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(subject, html_message, recipient):
+    """Store an email for the outbox worker, it commits or rolls back with the caller"""
+    return OutboxEmail.objects.create(
+        subject=subject, html_message=html_message, recipient=recipient
+    )
+
+
+def get_retry_delay(attempts):
+    """Seconds to wait before the next attempt, doubling with every failed one"""
+    delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return min(delay, settings.EMAIL_OUTBOX_MAX_RETRY_DELAY)
+
+
+def claim_due_emails(batch_size):
+    """Pending emails that are due, leased to this worker so no other worker sends them too
+
+    An email whose worker dies mid-send is picked up again once the lease runs out.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = OutboxEmail.objects.filter(status='PENDING', next_attempt_at__lte=now)
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        emails = list(due.order_by('next_attempt_at', 'pk')[:batch_size])
+        OutboxEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+            next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+        )
+    return emails
+
+
+def build_message(email, mail_connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body='',
+        from_email=settings.EMAIL_HOST_USER,
+        to=[email.recipient],
+        connection=mail_connection,
+    )
+    message.attach_alternative(email.html_message, "text/html")
+    return message
+
+
+def send_outbox_batch(mail_connection, batch_size=None):
+    """Send up to batch_size due emails over an open mail connection, returning (sent, failed)"""
+
+    emails = claim_due_emails(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    sent, failed = [], []
+    for email in emails:
+        try:
+            mail_connection.send_messages([build_message(email, mail_connection)])
+        except Exception as error:
+            logger.warning("Sending email %s to %s failed: %s", email.pk, email.recipient, error)
+            failed.append((email, error))
+        else:
+            sent.append(email.pk)
+
+    now = timezone.now()
+    OutboxEmail.objects.filter(pk__in=sent).update(
+        status='SENT', sent_at=now, attempts=F('attempts') + 1, last_error=""
+    )
+    for email, error in failed:
+        email.attempts += 1
+        email.last_error = str(error)
+        if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            email.status = 'FAILED'
+        else:
+            email.next_attempt_at = now + timedelta(seconds=get_retry_delay(email.attempts))
+        email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+    return len(sent), len(failed)
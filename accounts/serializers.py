@@ -1,16 +1,53 @@
 from rest_framework import serializers
 from rest_framework.authtoken.models import Token
 from rest_framework.validators import ValidationError
-from group.serializers import UserGroupCreateSerializer
 
 from .models import User
-from group.models import Group, UserGroup
-from django.core.exceptions import ObjectDoesNotExist
+from group.models import UserGroup
 from organization.models import Organization
+from django.db import models
+from chat.presence import get_online_user_ids
 
 EXISITING_EMAIL_ERROR = "Email has already been used"
 
 
+class UserLookups:
+    """Organization pks, groups and presence of a set of users, loaded in four lookups"""
+
+    def __init__(self, users):
+        self.users = {user.pk for user in users}
+
+        organization_ids = {user.organization_id for user in users if user.organization_id}
+        self.organizations = dict(
+            Organization.objects.filter(organization_id__in=organization_ids).values_list(
+                "organization_id", "pk"
+            )
+        )
+
+        # Users without a UserGroup row have no groups at all (None), not an empty list
+        self.user_groups = {
+            user: []
+            for user in UserGroup.objects.filter(user__in=self.users).values_list("user", flat=True)
+        }
+        memberships = (
+            UserGroup.groups.through.objects.filter(usergroup__user__in=self.users)
+            .order_by("-group__created_at")
+            .values_list("usergroup__user", "group", "group__title")
+        )
+        for user, group, title in memberships:
+            self.user_groups[user].append({"group_id": group, "group_name": title})
+
+        self.online_users = get_online_user_ids(self.users)
+
+
+class UserListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        users = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        # One lookup table for the whole list instead of queries per user
+        self.context["user_lookups"] = UserLookups(users)
+        return super().to_representation(users)
+
+
 class ListUserSerializer(serializers.ModelSerializer):
     user_groups = serializers.SerializerMethodField(method_name='get_user_groups')
     organization = serializers.SerializerMethodField(method_name="get_user_organization")
@@ -42,28 +79,24 @@ class ListUserSerializer(serializers.ModelSerializer):
             "updated_at",
             "is_verified",
         ]
+        list_serializer_class = UserListSerializer
+
+    def get_lookups(self, instance):
+        """The list's lookup table, or one for this user when serialized on its own"""
+        for lookups in (self.context.get("user_lookups"), getattr(self, "_lookups", None)):
+            if lookups is not None and instance.pk in lookups.users:
+                return lookups
+        self._lookups = UserLookups([instance])
+        return self._lookups
 
     def check_user_online(self, instance):
-        return instance.is_active_for_chat
+        return instance.pk in self.get_lookups(instance).online_users
 
     def get_user_organization(self, instance):
-        try:
-            if instance.organization_id:
-                return Organization.objects.get(organization_id=instance.organization_id).pk
-        except ObjectDoesNotExist:
-            return None
+        return self.get_lookups(instance).organizations.get(instance.organization_id)
+
     def get_user_groups(self, instance):
-        try:
-            user_group_object =  UserGroupCreateSerializer(UserGroup.objects.get(user=instance)).data
-            data = [{
-            
-                    "group_id":group,
-                    "group_name":Group.objects.get(pk=group).title,
-            }  for group in user_group_object["groups"]]
-
-            return data
-        except ObjectDoesNotExist:
-            return None
+        return self.get_lookups(instance).user_groups.get(instance.pk)
 
 
 class UserSignUpSerializer(serializers.ModelSerializer):
@@ -1,20 +1,11 @@
-from django.core.mail import send_mail
-from django.conf import settings
 from django.template.loader import get_template
+from .outbox import queue_email
 
-# Todo , add task delay using redis or any other message broker
+# Emails are queued in the outbox table and sent by the send_outbox_emails worker
 
 
 def send_email_with_content(subject, content, reciever):
-    sender = settings.EMAIL_HOST_USER
-    send_mail(
-        subject=subject,
-        message='',
-        from_email=sender,
-        recipient_list=[reciever],
-        fail_silently=False,
-        html_message=content,
-    )
+    queue_email(subject, content, reciever)
 
 
 def send_account_verification_mail(email_data):
@@ -0,0 +1,66 @@
+import pytest
+from django.urls import reverse
+from accounts.models import User
+from accounts.serializers import ListUserSerializer
+from accounts.tests.factories import UserFactory
+from leader.tests.factories import OrganizationFactory, GroupFactory, UserGroupFactory
+
+pytestmark = pytest.mark.django_db
+
+CHAT_USERS_URL = reverse("user:user-get-list-of-users-to-chat-with")
+
+
+def create_organization_users(count):
+    organization = OrganizationFactory()
+    groups = GroupFactory.create_batch(3, organization_id=organization.organization_id)
+    users = UserFactory.create_batch(count, organization_id=organization.organization_id)
+    for user in users:
+        UserGroupFactory(user=user, groups=groups)
+    return organization, groups, users
+
+
+class TestListUserSerializer:
+    def test_lists_are_serialized_in_constant_queries(self, django_assert_max_num_queries):
+        organization, groups, _ = create_organization_users(2)
+        with django_assert_max_num_queries(4):
+            ListUserSerializer(User.objects.all(), many=True).data
+
+        create_organization_users(20)
+        with django_assert_max_num_queries(4):
+            data = ListUserSerializer(User.objects.all(), many=True).data
+
+        member = next(
+            user for user in data if user["organization_id"] == organization.organization_id
+        )
+        assert member["organization"] == organization.pk
+        assert member["user_groups"] == [
+            {"group_id": group.pk, "group_name": group.title}
+            for group in sorted(groups, key=lambda group: group.created_at, reverse=True)
+        ]
+
+    def test_single_user(self):
+        organization, groups, (user,) = create_organization_users(1)
+        loner = UserFactory(organization_id="missing")
+
+        data = ListUserSerializer(user).data
+
+        assert data["organization"] == organization.pk
+        assert len(data["user_groups"]) == 3
+        assert ListUserSerializer(loner).data["user_groups"] is None
+        assert ListUserSerializer(loner).data["organization"] is None
+
+
+class TestUsersToChatWith:
+    def test_list_is_paginated_on_request(self, api_client):
+        organization, _, users = create_organization_users(12)
+        api_client.force_authenticate(user=users[0])
+        params = {"organization_id": organization.organization_id}
+
+        everyone = api_client.get(CHAT_USERS_URL, params).json()
+        page = api_client.get(CHAT_USERS_URL, {**params, "page": 2, "page_size": 5}).json()
+
+        assert everyone["count"] == 12
+        assert page["total"] == 12
+        assert [user["id"] for user in page["results"]] == [
+            user["id"] for user in everyone["data"][5:10]
+        ]
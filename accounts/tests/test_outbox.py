@@ -0,0 +1,100 @@
+from datetime import timedelta
+from io import StringIO
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+from accounts.models import OutboxEmail
+from accounts.task import send_account_verification_mail, send_password_reset_mail
+
+pytestmark = pytest.mark.django_db
+
+FLAKY_BACKEND = "accounts.tests.test_outbox.FlakyEmailBackend"
+
+
+class FlakyEmailBackend(EmailBackend):
+    """locmem backend that counts its connections and refuses mail for bounce@ addresses"""
+
+    opened = 0
+
+    def open(self):
+        # Like the SMTP backend, opening an open connection does nothing
+        if getattr(self, "is_open", False):
+            return False
+        self.is_open = True
+        FlakyEmailBackend.opened += 1
+        return True
+
+    def close(self):
+        self.is_open = False
+
+    def send_messages(self, messages):
+        if any(address.startswith("bounce@") for message in messages for address in message.to):
+            raise ConnectionError("mailbox unavailable")
+        return super().send_messages(messages)
+
+
+def queue_verification(email):
+    send_account_verification_mail({"email": email, "full_name": "Ada", "link": "http://x/verify"})
+
+
+def send_outbox(*args):
+    call_command("send_outbox_emails", "--once", *args, stdout=StringIO())
+
+
+class TestEmailOutbox:
+    def test_mails_are_queued_instead_of_sent(self):
+        queue_verification("ada@example.com")
+        send_password_reset_mail(
+            {"email": "ada@example.com", "full_name": "Ada", "reset_link": "http://x/reset"}
+        )
+
+        assert mail.outbox == []
+        assert list(OutboxEmail.objects.values_list("subject", "status")) == [
+            ("Account Verification", "PENDING"),
+            ("Pasword Reset", "PENDING"),
+        ]
+
+    def test_worker_sends_batches_over_one_connection(self, settings):
+        settings.EMAIL_BACKEND = FLAKY_BACKEND
+        FlakyEmailBackend.opened = 0
+        for number in range(5):
+            queue_verification(f"user{number}@example.com")
+
+        send_outbox("--batch-size", "2")
+
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f"user{number}@example.com" for number in range(5)
+        ]
+        assert "http://x/verify" in mail.outbox[0].alternatives[0][0]
+        assert set(OutboxEmail.objects.values_list("status", flat=True)) == {"SENT"}
+        assert FlakyEmailBackend.opened == 1
+
+    def test_failed_mails_are_retried_with_backoff(self, settings):
+        settings.EMAIL_BACKEND = FLAKY_BACKEND
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 3
+        queue_verification("bounce@example.com")
+        queue_verification("ada@example.com")
+
+        send_outbox()
+
+        bounced = OutboxEmail.objects.get(recipient="bounce@example.com")
+        assert [message.to for message in mail.outbox] == [["ada@example.com"]]
+        assert bounced.status == "PENDING"
+        assert bounced.attempts == 1
+        assert bounced.last_error == "mailbox unavailable"
+        assert bounced.next_attempt_at > timezone.now() + timedelta(
+            seconds=settings.EMAIL_OUTBOX_RETRY_DELAY - 5
+        )
+
+        send_outbox()
+        assert OutboxEmail.objects.get(pk=bounced.pk).attempts == 1
+
+        for attempt in [2, 3]:
+            OutboxEmail.objects.filter(pk=bounced.pk).update(next_attempt_at=timezone.now())
+            send_outbox()
+
+        bounced.refresh_from_db()
+        assert bounced.attempts == 3
+        assert bounced.status == "FAILED"
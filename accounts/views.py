@@ -31,21 +31,23 @@ from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 from group.models import Group
 from simpleblog.utils import calculate_engagement_scores
-from blog.models import Blog, Comment
-from in_app_chat.models import InAppChat
-from resource.models import Resources
-from browser_history.models import BrowserHistory
-from forum.models import Forum
-from topics.models import Topic
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils import timezone
 from rest_framework import mixins
-import cloudinary.uploader
 from rest_framework.parsers import MultiPartParser, FormParser
 from group.models import UserGroup
+from counter.counts import count_rows
+from resource.deletions import delete_with_media
+from resource.uploads import queue_upload
 from group.serializers import GroupSerializer
-from leader.models import Socialization, Externalization, Combination, Internalization
-from simpleblog.utils import calculate_total_engagement_score
+from simpleblog.utils import (
+    calculate_category_score,
+    calculate_percentage,
+    calculate_total_engagement_score,
+)
+from leader.weights import get_weight_profile
+from leader.scoring import DIMENSIONS, count_activities
+from leader.snapshots import get_period_range, parse_month
 from .task import send_account_verification_mail, send_password_reset_mail
 from datetime import datetime
 
@@ -91,9 +93,7 @@ class UserViewSets(
         return super().get_permissions()
 
     def perform_destroy(self, instance):
-        if instance.cloud_id is not None:
-            cloudinary.uploader.destroy(instance.cloud_id)
-        instance.delete()
+        delete_with_media(instance, [instance.cloud_id])
 
     def paginate_results(self, queryset):
         page = self.paginate_queryset(queryset)
@@ -118,23 +118,21 @@ class UserViewSets(
         if serializer.is_valid():
             image = serializer.validated_data["image"]
 
-            upload_result = cloudinary.uploader.upload(image, public_id=user.full_name)
-            if "public_id" not in upload_result or "url" not in upload_result:
-                return Response(
-                    {"error": "Failed to upload image to Cloudinary"},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                )
-
-            if user.cloud_id and user.image_url:
-                cloudinary.uploader.destroy(user.cloud_id)
-
-            user.cloud_id = upload_result["public_id"]
-            user.image_url = upload_result["url"]
-            user.save()
+            # The process_media_uploads worker uploads the image and removes the old one after
+            upload = queue_upload(
+                image,
+                user=user,
+                requested_by=request.user,
+                public_id=user.full_name,
+            )
 
             return Response(
-                {"success": True, "data": "User profle image udated successfully"},
-                status=status.HTTP_201_CREATED,
+                {
+                    "success": True,
+                    "data": "User profile image update queued",
+                    "upload": upload.id,
+                },
+                status=status.HTTP_202_ACCEPTED,
             )
         return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -233,7 +231,7 @@ class UserViewSets(
 
         organization = request.query_params["organization"]
         organization_id = Organization.objects.get(pk=organization).organization_id
-        output = User.objects.filter(organization_id=organization_id).count()
+        output = count_rows(User, organization_id=organization_id)
 
         if not output:
             return Response(
@@ -254,7 +252,7 @@ class UserViewSets(
     )
     def get_total_members(self, request, pk=None):
         """get total members in the app"""
-        output = User.objects.count()
+        output = count_rows(User)
         if not output:
             return Response(
                 {"success": False, "total_members": 0},
@@ -287,7 +285,7 @@ class UserViewSets(
 
         group = request.query_params["group"]
 
-        output = UserGroup.objects.filter(groups=group).count()
+        output = count_rows(UserGroup.groups.through, group=group)
 
         if not output:
             return Response(
@@ -356,131 +354,25 @@ class UserViewSets(
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        try:
-            socialization_instance = Socialization.objects.get(
-                organization=organization, group=group.pk
-            )
-        except ObjectDoesNotExist:
-            return Response(
-                {"message": f"Group {group.pk} have no socialization activities constants"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        try:
-            externalization_instance = Externalization.objects.get(
-                organization=organization, group=group.pk
-            )
-        except ObjectDoesNotExist:
-            return Response(
-                {"message": f"Group {group.pk} have no externalization activities constants"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        try:
-            combination_instance = Combination.objects.get(
-                organization=organization, group=group.pk
-            )
-        except ObjectDoesNotExist:
-            return Response(
-                {"message": f"Group {group.pk} have no combination activities constants"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        try:
-            internalization_instance = Internalization.objects.get(
-                organization=organization, group=group.pk
-            )
-        except ObjectDoesNotExist:
+        weights = get_weight_profile(organization, group)
+        if weights.missing:
             return Response(
-                {"message": f"Group {group.pk} have no internalization activities constants"},
+                {"message": f"Group {group.pk} have no {weights.missing} activities constants"},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        post_blog = Blog.objects.filter(
-            organization=organization, group=group.pk, created_at__range=date_range
-        ).count()
-
-        send_chat_message = InAppChat.objects.filter(
-                organization=organization, group=group.pk, created_at__range=date_range
-            ).count()
-
-        post_forum = Forum.objects.filter(
-            organization=organization, group=group.pk, created_at__range=date_range
-        ).count()
-
-        image_sharing = Resources.objects.filter(
-            type='IMAGE',
-            organization=organization,
-            group=group.pk,
-            created_at__range=date_range,
-        ).count()
-
-        video_sharing = Resources.objects.filter(
-            type='VIDEO',
-            organization=organization,
-            group=group.pk,
-            created_at__range=date_range,
-        ).count()
-
-        text_resource_sharing = Resources.objects.filter(
-            type='DOCUMENT',
-            organization=organization,
-            group=group.pk,
-            created_at__range=date_range,
-        ).count()
-
-        created_topic = Topic.objects.filter(
-            organization=organization, group=group.pk, created_at__range=date_range
-        ).count()
-
-        comment = Comment.objects.filter(
-                organization=organization, group=group.pk, created_at__range=date_range
-            ).count()
-
-        used_in_app_browser = BrowserHistory.objects.filter(
-            organization=organization, group=group.pk, created_at__range=date_range
-        ).count()
-
-        recieve_chat_message = InAppChat.objects.filter(
-            organization=organization, group=group.pk, created_at__range=date_range
-        ).count()
-
-        # Todo download_resource,read_blog,read_forum
-
-        tallies = {
-            "post_blog": post_blog,
-            "send_chat_message": send_chat_message,
-            "post_forum": post_forum,
-            "image_sharing": image_sharing,
-            "video_sharing": video_sharing,
-            "text_resource_sharing": text_resource_sharing,
-            "created_topic": created_topic,
-            "comment": comment,
-            "used_in_app_browser": used_in_app_browser,
-            "read_blog": 0,
-            "read_forum": 0,
-            "recieve_chat_message": recieve_chat_message,
-            "download_resources": 0,
-        }
+        tallies = count_activities(date_range, organization=organization, group=group)
 
-        sec = socialization_instance.calculate_socialization_score(tallies)
-        eec = externalization_instance.calculate_externalization_score(tallies)
-        cec = combination_instance.calculate_combination_score(tallies)
-        iec = internalization_instance.calculate_internalization_score(tallies)
+        sec = calculate_category_score(weights.socialization, tallies)
+        eec = calculate_category_score(weights.externalization, tallies)
+        cec = calculate_category_score(weights.combination, tallies)
+        iec = calculate_category_score(weights.internalization, tallies)
         tes = calculate_total_engagement_score(sec, eec, cec, iec)
 
-        socialization_percentage = round(
-            socialization_instance.calculate_socialization_percentage(sec, tes), 2
-        )
-
-        externalization_percentage = round(
-            externalization_instance.calculate_externalization_percentage(eec, tes), 2
-        )
-
-        combination_percentage = round(
-            combination_instance.calculate_combination_percentage(cec, tes), 2
-        )
-
-        internalization_percentage = round(
-            internalization_instance.calculate_internalization_percentage(iec, tes), 2
-        )
+        socialization_percentage = round(calculate_percentage(sec, tes), 2)
+        externalization_percentage = round(calculate_percentage(eec, tes), 2)
+        combination_percentage = round(calculate_percentage(cec, tes), 2)
+        internalization_percentage = round(calculate_percentage(iec, tes), 2)
 
         seci_details = {
             "socialization_engagement_score": sec,
@@ -519,13 +411,20 @@ class UserViewSets(
             OpenApiParameter(
                 name="start_date",
                 description="Start date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
-                required=True,
+                required=False,
                 type=OpenApiTypes.STR,
             ),
             OpenApiParameter(
                 name="end_date",
                 description="End date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
-                required=True,
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="period",
+                description="YYYY-MM month or current, the same as start_date and end_date "
+                "spanning that month",
+                required=False,
                 type=OpenApiTypes.STR,
             ),
         ],
@@ -557,11 +456,18 @@ class UserViewSets(
                 {"message": f"organization id - {user.organization_id} not found"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        start_date = datetime.strptime(request.query_params["start_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
-
-        end_date = datetime.strptime(request.query_params["end_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
-
-        date_range = (start_date, end_date)
+        period = request.query_params.get("period")
+        if period:
+            # Scored like any other range, the snapshots only split activity by group
+            period = parse_month(period)
+            start_date, end_date = get_period_range(period)
+            window = {"period": f"{period:%Y-%m}"}
+        else:
+            start_date = datetime.strptime(
+                request.query_params["start_date"], "%Y-%m-%dT%H:%M:%S.%fZ"
+            )
+            end_date = datetime.strptime(request.query_params["end_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
+            window = {"start_date": start_date, "end_date": end_date}
 
         user_groups = UserGroup.objects.filter(user=user).values_list("groups", flat=True)
 
@@ -574,149 +480,38 @@ class UserViewSets(
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        sec_list = []
-        eec_list = []
-        cec_list = []
-        iec_list = []
-
+        group_weights = {}
         for group in user_groups:
 
-            try:
-                socialization_instance = Socialization.objects.get(
-                    group=group, organization=user_organization_pk
-                )
-
-            except ObjectDoesNotExist:
-                return Response(
-                    {
-                        "message": f"User belongs to Group {group} which  have no socialization activities constants"
-                    },
-                    status=status.HTTP_404_NOT_FOUND,
-                )
-            try:
-                externalization_instance = Externalization.objects.get(
-                    group=group, organization=user_organization_pk
-                )
-            except ObjectDoesNotExist:
-                return Response(
-                    {
-                        "message": f"User belongs to Group {group} which  have no externalization activities constants"
-                    },
-                    status=status.HTTP_404_NOT_FOUND,
-                )
-            try:
-                combination_instance = Combination.objects.get(
-                    group=group, organization=user_organization_pk
-                )
-            except ObjectDoesNotExist:
-                return Response(
-                    {
-                        "message": f"User belongs to Group {group} which  have no combination activities constants"
-                    },
-                    status=status.HTTP_404_NOT_FOUND,
-                )
-            try:
-                internalization_instance = Internalization.objects.get(
-                    group=group, organization=user_organization_pk
-                )
-            except ObjectDoesNotExist:
+            weights = get_weight_profile(user_organization_pk, group)
+            if weights.missing:
                 return Response(
                     {
-                        "message": f"User belongs to Group {group} which  have no internalization activities constants"
+                        "message": f"User belongs to Group {group} which  have no {weights.missing} activities constants"
                     },
                     status=status.HTTP_404_NOT_FOUND,
                 )
+            group_weights[group] = weights
+
+        tallies = count_activities((start_date, end_date), users=[user])
+        scores = [
+            [
+                calculate_category_score(getattr(weights, dimension), tallies)
+                for dimension in DIMENSIONS
+            ]
+            for weights in group_weights.values()
+        ]
 
-            post_blog = Blog.objects.filter(author=user, created_at__range=date_range).count()
-
-            send_chat_message = InAppChat.objects.filter(
-                    sender=user, created_at__range=date_range
-                ).count()
-
-            post_forum = Forum.objects.filter(user=user, created_at__range=date_range).count()
-
-            image_sharing = Resources.objects.filter(
-                type='IMAGE',
-                sender=user,
-                created_at__range=date_range,
-            ).count()
-
-            video_sharing = Resources.objects.filter(
-                    type='VIDEO',
-                    sender=user,
-                    created_at__range=date_range,
-                ).count()
-
-            text_resource_sharing = Resources.objects.filter(
-                    type='DOCUMENT',
-                    sender=user,
-                    created_at__range=date_range,
-                ).count()
-
-            created_topic = Topic.objects.filter(
-                    author=user, created_at__range=date_range
-                ).count()
-
-            comment = Comment.objects.filter(user=user, created_at__range=date_range).count()
-
-            used_in_app_browser = BrowserHistory.objects.filter(
-                    user=user, created_at__range=date_range
-                ).count()
-
-            recieve_chat_message = InAppChat.objects.filter(
-                    receiver=user, created_at__range=date_range
-                ).count()
-
-            # # Todo download_resource,read_blog,read_forum
-
-            tallies = {
-                "post_blog": post_blog,
-                "send_chat_message": send_chat_message,
-                "post_forum": post_forum,
-                "image_sharing": image_sharing,
-                "video_sharing": video_sharing,
-                "text_resource_sharing": text_resource_sharing,
-                "created_topic": created_topic,
-                "comment": comment,
-                "used_in_app_browser": used_in_app_browser,
-                "read_blog": 0,
-                "read_forum": 0,
-                "recieve_chat_message": recieve_chat_message,
-                "download_resources": 0,
-            }
-
-            sec = socialization_instance.calculate_socialization_score(tallies)
-            eec = externalization_instance.calculate_externalization_score(tallies)
-            cec = combination_instance.calculate_combination_score(tallies)
-            iec = internalization_instance.calculate_internalization_score(tallies)
-
-            sec_list.append(sec)
-            eec_list.append(eec)
-            cec_list.append(cec)
-            iec_list.append(iec)
-
-        sec_total = sum(sec_list)
-        eec_total = sum(eec_list)
-        cec_total = sum(cec_list)
-        iec_total = sum(iec_list)
-
-        tes = calculate_total_engagement_score(sec_total, eec_total, cec_total, iec_total)
-
-        socialization_percentage = round(
-            socialization_instance.calculate_socialization_percentage(sec_total, tes), 2
-        )
-
-        externalization_percentage = round(
-            externalization_instance.calculate_externalization_percentage(eec_total, tes), 2
+        sec_total, eec_total, cec_total, iec_total = (
+            sum(group_scores[index] for group_scores in scores) for index in range(len(DIMENSIONS))
         )
 
-        combination_percentage = round(
-            combination_instance.calculate_combination_percentage(cec_total, tes), 2
-        )
+        tes = calculate_total_engagement_score(sec_total, eec_total, cec_total, iec_total)
 
-        internalization_percentage = round(
-            internalization_instance.calculate_internalization_percentage(iec_total, tes), 2
-        )
+        socialization_percentage = round(calculate_percentage(sec_total, tes), 2)
+        externalization_percentage = round(calculate_percentage(eec_total, tes), 2)
+        combination_percentage = round(calculate_percentage(cec_total, tes), 2)
+        internalization_percentage = round(calculate_percentage(iec_total, tes), 2)
 
         seci_details = {
             "socialization_engagement_score": sec_total,
@@ -735,8 +530,7 @@ class UserViewSets(
                 "success": True,
                 "seci_details": seci_details,
                 "user_groups": user_groups,
-                "start_date": start_date,
-                "end_date": end_date,
+                **window,
             },
             status=status.HTTP_200_OK,
         )
@@ -752,6 +546,15 @@ class UserViewSets(
                 type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
             ),
+            OpenApiParameter(
+                'page',
+                description='page number, the whole list is returned when omitted',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+            ),
+            OpenApiParameter(
+                'page_size', description='page_size', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY
+            ),
         ]
     )
     @action(
@@ -764,9 +567,12 @@ class UserViewSets(
     def get_list_of_users_to_chat_with(self, request, pk=None):
         group = request.query_params.get("group")
         organization_id = request.query_params.get("organization_id")
+        paginate = "page" in request.query_params
 
         if self.request.user.role_id == 1 and self.request.user.is_superuser:
             queryset = self.get_queryset()
+            if paginate:
+                return self.paginate_results(queryset)
             return Response(
                 {
                     "success": True,
@@ -785,6 +591,8 @@ class UserViewSets(
                 ).values("user__pk")
                 qs = self.get_queryset().filter(pk__in=users_in_group)
 
+            if paginate:
+                return self.paginate_results(qs)
             return Response(
                 {
                     "success": True,
@@ -823,12 +631,8 @@ class UserSignUpView(generics.GenericAPIView):
                 "link": verification_url,
             }
 
-            try:
-                send_account_verification_mail(email_data)
-            except Exception as e:
-                # If an error occurs during email sending, rollback the transaction
-                user.delete()
-                return Response(data=str(e), status=status.HTTP_400_BAD_REQUEST)
+            # Queued with the user, the outbox worker sends it once the signup commits
+            send_account_verification_mail(email_data)
 
             response = {"message": "User Created Successfully", "data": serializer.data}
             return Response(data=response, status=status.HTTP_201_CREATED)
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0008_remove_comment_platform"),
+        ("category", "0001_initial"),
+        ("group", "0003_usergroup_unique_user_per_group"),
+        ("organization", "0002_alter_organization_organization_id_and_more"),
+        ("resource", "0006_alter_resources_type_delete_type"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="blog",
+            index=models.Index(
+                fields=["organization", "group", "created_at"],
+                name="blog_org_group_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="blog",
+            index=models.Index(
+                fields=["author", "created_at"], name="blog_author_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["organization", "group", "created_at"],
+                name="comment_org_group_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["user", "created_at"], name="comment_user_created_idx"
+            ),
+        ),
+    ]
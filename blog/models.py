@@ -25,6 +25,13 @@ class Blog(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["organization", "group", "created_at"],
+                name="blog_org_group_created_idx",
+            ),
+            models.Index(fields=["author", "created_at"], name="blog_author_created_idx"),
+        ]
 
 
 class Comment(models.Model):
@@ -45,6 +52,13 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["organization", "group", "created_at"],
+                name="comment_org_group_created_idx",
+            ),
+            models.Index(fields=["user", "created_at"], name="comment_user_created_idx"),
+        ]
 
 
 class BlogCommentReplies(models.Model):
@@ -5,6 +5,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from .models import Blog, Comment,BlogCommentReplies
+from counter.counts import count_rows
 from organization.models import Organization
 from group.models import Group
 from .serializers import BlogCreateSerializer, CommentSerializer, BlogListSerializer,BlogCommentReplySerializer
@@ -16,7 +17,8 @@ from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 from django.db.models import F, Value, CharField
 from django.db.models.functions import Concat
-import cloudinary.uploader
+from resource.deletions import delete_with_media
+from leader.events import record_view
 
 class BlogViewSets(viewsets.ModelViewSet):
     http_method_names = ["get", "patch", "post", "put", "delete"]
@@ -47,16 +49,21 @@ class BlogViewSets(viewsets.ModelViewSet):
         return self.queryset.filter(organization=organization)
 
     def perform_destroy(self, instance):
-    
-      for resource in instance.resources.all():
-        cloudinary.uploader.destroy(resource.cloud_id)
-      instance.delete()
+        # Attached files are removed by the purge_media_deletions worker once the blog is gone
+        cloud_ids = [resource.cloud_id for resource in instance.resources.all()]
+        delete_with_media(instance, cloud_ids, resource_type="raw")
 
 
     def perform_create(self, serializer):
         author = self.request.user
         serializer.save(author=author)
 
+    def retrieve(self, request, *args, **kwargs):
+        blog = self.get_object()
+        # Buffered, counted as a read_blog SECI activity once its batch is written
+        record_view(request.user, "READ_BLOG", blog)
+        return Response(self.get_serializer(blog).data)
+
     def get_serializer_class(self):
         if self.action in ["retrieve", "list"]:
             return BlogListSerializer
@@ -92,7 +99,7 @@ class BlogViewSets(viewsets.ModelViewSet):
 
         organization = request.query_params["organization"]
 
-        output = Blog.objects.filter(organization=organization).count()
+        output = count_rows(Blog, organization=organization)
         if not output:
             return Response(
                 {"success": False, "total_blogs": 0},
@@ -112,7 +119,7 @@ class BlogViewSets(viewsets.ModelViewSet):
     )
     def get_total_blogs(self, request, pk=None):
         """get total blogs in the app"""
-        output = Blog.objects.count()
+        output = count_rows(Blog)
         if not output:
             return Response(
                 {"success": False, "total_blogs": 0},
@@ -144,7 +151,7 @@ class BlogViewSets(viewsets.ModelViewSet):
         """Get total for an  organization blogs by groups"""
 
         group = request.query_params["group"]
-        output = Blog.objects.filter(group=group).count()
+        output = count_rows(Blog, group=group)
         if not output:
             return Response(
                 {"success": False, "total_blogs": 0},
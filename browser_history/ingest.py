@@ -0,0 +1,58 @@
+from django.db import transaction
+from counter.counts import record_counts
+from group.models import Group
+from leader.rollups import record_activities
+from organization.models import Organization
+from .models import BrowserHistory
+from .serializers import BrowserHistoryVisitSerializer
+
+# Fields of a visit holding the id of another row
+VISIT_RELATIONS = [("group_id", "group", Group), ("organization_id", "organization", Organization)]
+
+
+def find_existing_ids(visits):
+    """Ids of the groups and organizations the visits refer to that exist, one query per model"""
+
+    existing = {}
+    for attname, _, model in VISIT_RELATIONS:
+        ids = {visit[attname] for visit in visits}
+        existing[attname] = set(model.objects.filter(pk__in=ids).values_list("pk", flat=True))
+    return existing
+
+
+def ingest_visits(user, items):
+    """Store the valid visits of a batch for the user with one insert
+
+    Returns a result per item in order, with the id of the stored row or the errors of the item.
+    """
+    results, valid = [], []
+    for index, item in enumerate(items):
+        serializer = BrowserHistoryVisitSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+            results.append(None)
+        else:
+            results.append({"index": index, "errors": serializer.errors})
+
+    existing = find_existing_ids([visit for _, visit in valid])
+    histories = []
+    for index, visit in valid:
+        errors = {
+            field: [f"Invalid pk \"{visit[attname]}\" - object does not exist."]
+            for attname, field, _ in VISIT_RELATIONS
+            if visit[attname] not in existing[attname]
+        }
+        if errors:
+            results[index] = {"index": index, "errors": errors}
+        else:
+            histories.append((index, BrowserHistory(user=user, **visit)))
+
+    with transaction.atomic():
+        BrowserHistory.objects.bulk_create([history for _, history in histories])
+        # bulk_create sends no post_save, rollups and counters are kept up to date here
+        record_activities([history for _, history in histories])
+        record_counts([history for _, history in histories])
+
+    for index, history in histories:
+        results[index] = {"index": index, "id": history.pk}
+    return results
@@ -28,3 +28,10 @@ class BrowserHistory(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["organization", "group", "created_at"],
+                name="history_org_group_created_idx",
+            ),
+            models.Index(fields=["user", "created_at"], name="history_user_created_idx"),
+        ]
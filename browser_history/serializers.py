@@ -15,3 +15,14 @@ class BrowserHistorySerializer(serializers.ModelSerializer):
     class Meta:
         model = BrowserHistory
         fields = "__all__"
+
+
+class BrowserHistoryVisitSerializer(serializers.ModelSerializer):
+    """One visit of a batch, group and organization are checked for the whole batch at once"""
+
+    group = serializers.IntegerField(source="group_id")
+    organization = serializers.IntegerField(source="organization_id")
+
+    class Meta:
+        model = BrowserHistory
+        fields = ["url", "start_time", "end_time", "time_spent", "group", "organization"]
@@ -0,0 +1,104 @@
+import json
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from accounts.tests.factories import UserFactory
+from counter.models import RecordCount
+from leader.models import DailyActivityTally
+from leader.tests.factories import OrganizationFactory, GroupFactory
+from .models import BrowserHistory
+
+pytestmark = pytest.mark.django_db
+
+BATCH_URL = reverse("browser_histroy:browserhistory-batch")
+
+
+@pytest.fixture
+def visitor(api_client):
+    organization = OrganizationFactory()
+    group = GroupFactory(organization_id=organization.organization_id)
+    user = UserFactory(organization_id=organization.organization_id)
+    api_client.force_authenticate(user=user)
+    return user, group, organization
+
+
+def make_visit(visitor, number=0, **fields):
+    _, group, organization = visitor
+    return {
+        "url": f"https://example.com/{number}",
+        "start_time": "10:00:00",
+        "end_time": "10:05:00",
+        "time_spent": 300,
+        "group": group.pk,
+        "organization": organization.pk,
+        **fields,
+    }
+
+
+def count_queries(api_client, visits):
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.post(BATCH_URL, visits, format="json")
+    assert response.status_code == 201
+    return len(context.captured_queries), response.json()
+
+
+class TestBrowserHistoryBatch:
+    def test_stores_a_batch_with_one_insert(self, api_client, visitor, settings):
+        settings.SECI_ACTIVITY_ROLLUPS = True
+        settings.RECORD_COUNTS = True
+        user, group, _ = visitor
+        count_queries(api_client, [make_visit(visitor)])
+
+        one_visit_queries, _ = count_queries(api_client, [make_visit(visitor)])
+        batch_queries, body = count_queries(
+            api_client, [make_visit(visitor, number) for number in range(20)]
+        )
+
+        assert batch_queries == one_visit_queries
+        assert body["created"] == 20
+        stored = BrowserHistory.objects.order_by("pk")[2:]
+        assert [result["id"] for result in body["results"]] == [row.pk for row in stored]
+        assert {row.user_id for row in stored} == {user.pk}
+        assert DailyActivityTally.objects.get(activity_key="used_in_app_browser").count == 22
+        assert RecordCount.objects.get(
+            model="browser_history.browserhistory", scope=f"group={group.pk}"
+        ).count == 22
+
+    def test_reports_each_rejected_visit(self, api_client, visitor):
+        visits = [
+            make_visit(visitor, 0),
+            make_visit(visitor, 1, time_spent="long"),
+            make_visit(visitor, 2, group=0),
+            "not a visit",
+        ]
+
+        response = api_client.post(BATCH_URL, visits, format="json")
+
+        assert response.status_code == 207
+        results = response.json()["results"]
+        assert "id" in results[0]
+        assert "time_spent" in results[1]["errors"]
+        assert "group" in results[2]["errors"]
+        assert "errors" in results[3]
+        assert list(BrowserHistory.objects.values_list("url", flat=True)) == [
+            "https://example.com/0"
+        ]
+
+    def test_accepts_ndjson(self, api_client, visitor):
+        lines = "\n".join(json.dumps(make_visit(visitor, number)) for number in range(3))
+
+        response = api_client.post(
+            BATCH_URL, lines + "\n", content_type="application/x-ndjson"
+        )
+
+        assert response.status_code == 201
+        assert BrowserHistory.objects.count() == 3
+
+    def test_rejects_oversized_batches(self, api_client, visitor, settings):
+        settings.BROWSER_HISTORY_BATCH_LIMIT = 2
+
+        response = api_client.post(BATCH_URL, [make_visit(visitor)] * 3, format="json")
+
+        assert response.status_code == 400
+        assert not BrowserHistory.objects.exists()
@@ -5,7 +5,13 @@ from rest_framework.permissions import AllowAny
 from rest_framework.request import Request
 from rest_framework.response import Response
 from .models import BrowserHistory
-from .serializers import BrowserHistorySerializer
+from counter.counts import count_rows
+from .serializers import BrowserHistorySerializer, BrowserHistoryVisitSerializer
+from .ingest import ingest_visits
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
+from simpleblog.parsers import NDJSONParser
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, status, viewsets, filters
 from rest_framework.decorators import action
@@ -33,6 +39,38 @@ class BrowserHistoryViewSets(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    @extend_schema(
+        request=BrowserHistoryVisitSerializer(many=True), responses={201: None, 207: None}
+    )
+    @action(
+        methods=['POST'],
+        detail=False,
+        serializer_class=BrowserHistoryVisitSerializer,
+        parser_classes=[JSONParser, NDJSONParser],
+        url_path='batch',
+    )
+    def batch(self, request, pk=None):
+        """Store the visits of the user sent as a JSON array or as NDJSON, one insert per batch
+
+        Each visit gets a result in order, its id or its errors. The status is 207 when some
+        visits were rejected, the valid ones are stored anyway.
+        """
+        visits = request.data
+        if not isinstance(visits, list):
+            raise ValidationError(detail="Send a list of visits", code=status.HTTP_400_BAD_REQUEST)
+        if len(visits) > settings.BROWSER_HISTORY_BATCH_LIMIT:
+            raise ValidationError(
+                detail=f"Send at most {settings.BROWSER_HISTORY_BATCH_LIMIT} visits at once",
+                code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = ingest_visits(request.user, visits)
+        failed = sum("errors" in result for result in results)
+        return Response(
+            {"created": len(results) - failed, "failed": failed, "results": results},
+            status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_201_CREATED,
+        )
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -55,7 +93,7 @@ class BrowserHistoryViewSets(viewsets.ModelViewSet):
 
         organization = request.query_params["organization"]
 
-        output = BrowserHistory.objects.filter(organization=organization).count()
+        output = count_rows(BrowserHistory, organization=organization)
         if not output:
             return Response(
                 {"success": False, "total_browser_histories": 0},
@@ -75,7 +113,7 @@ class BrowserHistoryViewSets(viewsets.ModelViewSet):
     )
     def get_total_browser_histories(self, request, pk=None):
         """get total  in the app"""
-        output = BrowserHistory.objects.count()
+        output = count_rows(BrowserHistory)
         if not output:
             return Response(
                 {"success": False, "total_browser_histories": 0},
@@ -107,7 +145,7 @@ class BrowserHistoryViewSets(viewsets.ModelViewSet):
         """Get total for an  organization browser_histories by groups"""
 
         group = request.query_params["group"]
-        output = BrowserHistory.objects.filter(group=group).count()
+        output = count_rows(BrowserHistory, group=group)
         if not output:
             return Response(
                 {"success": False, "total_browser_histories": 0},
@@ -1,30 +1,192 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from asgiref.sync import sync_to_async
+from django.conf import settings
+import asyncio
 import json
 import time
+from collections import OrderedDict
 
 
-class ChatConsumer(AsyncWebsocketConsumer):
+class CachedObjectsConsumer(AsyncWebsocketConsumer):
+    """Consumer that resolves the connecting user once and remembers the rows frames refer to
+
+    The user of the token query parameter, their organization and the ids of their groups
+    are looked up once at connect. Frames are always written as that user, frames for a
+    group they are not a member of are rejected. Rows a frame refers to by primary key are
+    kept in a small LRU for the life of the connection, so frames about the same forum or
+    blog only write.
+    """
+
+    room_group_format = None
+    cached_objects_size = 32
+
     async def connect(self):
-        from django.contrib.auth import get_user_model
-        from django.contrib.auth.models import AnonymousUser
-        from django.db.models import F
+        await self.identify()
+
+        # Join room group
+        await self.channel_layer.group_add(self.room_group_name, self.channel_name)
+
+        # Accept the WebSocket connection
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        # Leave room group
+        await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+
+    async def identify(self):
         from rest_framework_simplejwt.tokens import UntypedToken
         from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 
         self.room_name = self.scope['url_route']['kwargs']['room_name']
-        self.room_group_name = 'chat_%s' % self.room_name
+        self.room_group_name = self.room_group_format % self.room_name
+        self.cached_objects = OrderedDict()
+        self.user, self.organization, self.memberships = None, None, {}
 
         try:
             token = self.scope['query_string'].decode('utf-8').split('token=')[1]
-            decoded_data = UntypedToken(token).payload
-            user_id = decoded_data['user_id']
+            user_id = UntypedToken(token).payload['user_id']
+        except (InvalidToken, IndexError, KeyError, TokenError):
+            return
+
+        await self.load_identity(user_id)
+        if self.user is not None:
+            self.scope['user'] = self.user
+
+    @staticmethod
+    def get_group_ids(user):
+        from group.models import UserGroup
+
+        return frozenset(
+            UserGroup.objects.filter(user=user, groups__isnull=False).values_list(
+                "groups", flat=True
+            )
+        )
+
+    @staticmethod
+    def get_membership(user, group):
+        from group.models import UserGroup
+
+        return UserGroup.objects.filter(user=user, groups=group).exists()
+
+    async def is_group_member(self, group):
+        """Whether the connected user belongs to group, asked once per group and connection
+
+        Groups of the user are known from connect, any other group is looked up on its first
+        frame and the answer kept, so a group joined since connecting is found.
+        """
+        if group.pk not in self.memberships:
+            self.memberships[group.pk] = await database_sync_to_async(self.get_membership)(
+                self.user, group
+            )
+        return self.memberships[group.pk]
+
+    @database_sync_to_async
+    def load_identity(self, user_id):
+        from accounts.models import User
+        from organization.models import Organization
+
+        self.user = User.objects.filter(pk=user_id).first()
+        if self.user is None:
+            return
+
+        self.organization = Organization.objects.filter(
+            organization_id=self.user.organization_id
+        ).first()
+        self.memberships = dict.fromkeys(self.get_group_ids(self.user), True)
+        self.remember_object(self.user)
+        if self.organization is not None:
+            self.remember_object(self.organization)
+
+    def remember_object(self, instance):
+        key = (type(instance), instance.pk)
+        self.cached_objects[key] = instance
+        self.cached_objects.move_to_end(key)
+        while len(self.cached_objects) > self.cached_objects_size:
+            self.cached_objects.popitem(last=False)
+
+    async def get_objects(self, *lookups):
+        """Instances for (model, pk) pairs, None for rows that do not exist
+
+        Rows missing from the connection's cache are loaded together in a single hop.
+        """
+        from django.core.exceptions import ValidationError
+
+        keys = []
+        for model, pk in lookups:
+            try:
+                keys.append((model, model._meta.pk.to_python(pk)))
+            except ValidationError:
+                keys.append((model, None))
+
+        misses = [key for key in keys if key[1] is not None and key not in self.cached_objects]
+        if misses:
+            await self.load_objects(misses)
+
+        instances = []
+        for key in keys:
+            instance = self.cached_objects.get(key)
+            if instance is not None:
+                self.cached_objects.move_to_end(key)
+            instances.append(instance)
+        return instances
+
+    @database_sync_to_async
+    def load_objects(self, keys):
+        pks_by_model = {}
+        for model, pk in keys:
+            pks_by_model.setdefault(model, set()).add(pk)
+        for model, pks in pks_by_model.items():
+            for instance in model.objects.in_bulk(pks).values():
+                self.remember_object(instance)
+
+    async def get_frame_objects(self, target_model, target_pk, data):
+        """Target row, user, organization and group of a frame, None once a missing one is reported
+
+        The user is always the authenticated one, a "user" in the frame is ignored. The
+        organization defaults to theirs.
+        """
+        from group.models import Group
+        from organization.models import Organization
+
+        if self.user is None:
+            await self.send(
+                text_data=json.dumps({"error": "Authentication invalid or not provided"})
+            )
+            return None
+
+        lookups = [
+            (target_model, target_pk),
+            (Organization, data.get("organization") or getattr(self.organization, "pk", None)),
+            (Group, data.get("group")),
+        ]
+        instances = await self.get_objects(*lookups)
+
+        missing = [model.__name__ for (model, _), instance in zip(lookups, instances) if not instance]
+        if missing:
+            await self.send(text_data=json.dumps({"error": f"{', '.join(missing)} not found"}))
+            return None
 
-            user = await self.get_user(user_id)
-        except (InvalidToken, IndexError, TokenError, get_user_model().DoesNotExist):
-            user = AnonymousUser()
+        target, organization, group = instances
+        if not await self.is_group_member(group):
+            error = f"User {self.user.pk} is not a member of group {group.pk}"
+            await self.send(text_data=json.dumps({"error": error}))
+            return None
+        return [target, self.user, organization, group]
 
-        if isinstance(user, AnonymousUser):
+
+class ChatConsumer(CachedObjectsConsumer):
+    room_group_format = 'chat_%s'
+
+    async def identify(self):
+        # Set before anything can fail, disconnect runs even when connect raised
+        self.heartbeat_task = None
+        await super().identify()
+
+    async def connect(self):
+        await self.identify()
+
+        if self.user is None:
             await self.accept()
             await self.send(
                 text_data=json.dumps({"error": "Authentication invalid or not provided"})
@@ -32,93 +194,77 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await self.close()
         else:
             await self.channel_layer.group_add(self.room_group_name, self.channel_name)
-            self.scope['user'] = user
-            await self.update_online_count(user.pk, increment=True)
+            await self.send_heartbeat()
+            self.heartbeat_task = asyncio.get_running_loop().create_task(self.keep_alive())
             await self.accept()
 
     async def disconnect(self, close_code):
-        await self.update_online_count(self.scope['user'].pk, increment=False)
+        from chat.presence import get_presence
+
+        # Messages this socket fanned out stay with the batcher, which outlives the socket
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+        if self.user is not None:
+            await sync_to_async(get_presence().leave, thread_sensitive=False)(
+                self.user.pk, self.channel_name
+            )
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
 
-    @database_sync_to_async
-    def get_user(self, user_id):
-        from django.contrib.auth import get_user_model
-
-        return get_user_model().objects.get(pk=user_id)
+    async def send_heartbeat(self):
+        from chat.presence import get_presence
 
-    @database_sync_to_async
-    def update_online_count(self, user_id, increment=True):
-        from django.contrib.auth import get_user_model
-        from django.db.models import F
+        await sync_to_async(get_presence().heartbeat, thread_sensitive=False)(
+            self.user.pk, self.channel_name
+        )
 
-        if increment:
-            get_user_model().objects.filter(pk=user_id).update(online_count=F('online_count') + 1)
-        else:
-            get_user_model().objects.filter(pk=user_id).update(online_count=F('online_count') - 1)
+    async def keep_alive(self):
+        """Refresh this socket's presence until it disconnects"""
+        while True:
+            await asyncio.sleep(settings.PRESENCE_HEARTBEAT_INTERVAL)
+            await self.send_heartbeat()
 
     # Receive message from WebSocket
     async def receive(self, text_data):
-        from organization.models import Organization
-        from group.models import Group
-        from accounts.models import User
-        from in_app_chat.models import InAppChat
+        from chat.ingest import build_chat_message, get_chat_batcher, validate_chat_ids
 
         if text_data:
             try:
                 text_data_json = json.loads(text_data)
-                message = text_data_json.get("message")
-                sender = text_data_json.get("sender")
-                content_type = text_data_json.get("content_type")
-                receiver = text_data_json.get("receiver")
-                organization_id = text_data_json.get("organization")
-                group_id = text_data_json.get("group")
-                unique_identifier = text_data_json.get("unique_identifier")
             except json.JSONDecodeError as e:
                 print(f"Invalid JSON format: {e}")
                 return
 
-            # Use database_sync_to_async to run synchronous ORM operations
-            sender = await database_sync_to_async(User.objects.get)(pk=sender)
-            receiver = await database_sync_to_async(User.objects.get)(pk=receiver)
-            organization = await database_sync_to_async(Organization.objects.get)(
-                pk=organization_id
+            # Ids are checked against an in-process cache, only unknown ones hit the database
+            error = await validate_chat_ids(
+                text_data_json.get("sender"),
+                text_data_json.get("receiver"),
+                text_data_json.get("organization"),
+                text_data_json.get("group"),
             )
+            if error:
+                await self.send(text_data=json.dumps({"error": error}))
+                return
 
-            # Check if group_id is provided, if not, set group to None
-            if group_id:
-                group = await database_sync_to_async(Group.objects.get)(pk=group_id)
-            else:
-                group = None
-
+            chat_message = build_chat_message(text_data_json)
             created_at = int(time.time())
 
-            # Create and save the InAppChat instance
-            chat_message = InAppChat(
-                sender=sender,
-                content_type=content_type,
-                receiver=receiver,
-                message=message,
-                organization=organization,
-                group=group,
-                unique_identifier=unique_identifier,
-            )
-            await database_sync_to_async(chat_message.save)()
-
-            # Proceed with sending message to room group
+            # Fan the message out first, it is stored by the batcher shortly after
             await self.channel_layer.group_send(
                 self.room_group_name,
                 {
                     'type': 'chat_message',
-                    "message": chat_message.message,
-                    "sender": sender.pk,
-                    "receiver": receiver.pk,
-                    "content_type": content_type,
-                    "organization": organization.pk,
-                    "group": group.pk if group else None,  # Send None if group is None
-                    "unique_identifier": unique_identifier,
+                    "message": chat_message["message"],
+                    "sender": chat_message["sender_id"],
+                    "receiver": chat_message["receiver_id"],
+                    "content_type": chat_message["content_type"],
+                    "organization": chat_message["organization_id"],
+                    "group": chat_message["group_id"],  # None if group was not provided
+                    "unique_identifier": chat_message["unique_identifier"],
+                    "message_id": chat_message["message_id"],
                     "created_at": created_at,
                 },
             )
+            get_chat_batcher().add(chat_message)
 
     # Receive message from room group
     async def chat_message(self, event):
@@ -129,6 +275,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
         organization = event["organization"]
         group = event["group"]  # This will be None if group was not provided
         unique_identifier = event["unique_identifier"]
+        message_id = event["message_id"]
         created_at = event["created_at"]
 
         # Send the received message back to the client
@@ -142,32 +289,18 @@ class ChatConsumer(AsyncWebsocketConsumer):
                     "organization": organization,
                     "group": group,
                     "unique_identifier": unique_identifier,
+                    "message_id": message_id,
                     "created_at": created_at,
                 }
             )
         )
 
 
-class CommentConsumer(AsyncWebsocketConsumer):
-    async def connect(self):
-        self.room_name = self.scope['url_route']['kwargs']['room_name']
-        self.room_group_name = 'comments_%s' % self.room_name
-
-        # Join room group
-        await self.channel_layer.group_add(self.room_group_name, self.channel_name)
-
-        # Accept the WebSocket connection
-        await self.accept()
-
-    async def disconnect(self, close_code):
-        # Leave room group
-        await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+class CommentConsumer(CachedObjectsConsumer):
+    room_group_format = 'comments_%s'
 
     # Receive message from WebSocket
     async def receive(self, text_data):
-        from organization.models import Organization
-        from group.models import Group
-        from accounts.models import User
         from forum.models import Forum, ForumComment, CommentReplies
 
         if text_data:
@@ -175,21 +308,15 @@ class CommentConsumer(AsyncWebsocketConsumer):
                 text_data_json = json.loads(text_data)
                 forum = text_data_json.get("forum")
                 content = text_data_json.get("content")
-                organization_id = text_data_json.get("organization")
-                group_id = text_data_json.get("group")
-                user = text_data_json.get("user")
-
             except json.JSONDecodeError as e:
                 print(f"Invalid JSON format: {e}")
                 return
 
-            # Use database_sync_to_async to run synchronous ORM operations
-            forum = await database_sync_to_async(Forum.objects.get)(pk=forum)
-            user = await database_sync_to_async(User.objects.get)(pk=user)
-            organization = await database_sync_to_async(Organization.objects.get)(
-                pk=organization_id
-            )
-            group = await database_sync_to_async(Group.objects.get)(pk=group_id)
+            # Rows come from the connection's cache, only ones not seen yet are looked up
+            frame_objects = await self.get_frame_objects(Forum, forum, text_data_json)
+            if frame_objects is None:
+                return
+            forum, user, organization, group = frame_objects
 
             created_at = int(time.time())
             user_full_name = user.full_name
@@ -248,27 +375,11 @@ class CommentConsumer(AsyncWebsocketConsumer):
         )
 
 
-class RepliesConsumer(AsyncWebsocketConsumer):
-
-    async def connect(self):
-        self.room_name = self.scope['url_route']['kwargs']['room_name']
-        self.room_group_name = 'comment_replies_%s' % self.room_name
-
-        # Join room group
-        await self.channel_layer.group_add(self.room_group_name, self.channel_name)
-
-        # Accept the WebSocket connection
-        await self.accept()
-
-    async def disconnect(self, close_code):
-        # Leave room group
-        await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+class RepliesConsumer(CachedObjectsConsumer):
+    room_group_format = 'comment_replies_%s'
 
     # Receive message from WebSocket
     async def receive(self, text_data):
-        from organization.models import Organization
-        from group.models import Group
-        from accounts.models import User
         from forum.models import Forum, ForumComment, CommentReplies
 
         if text_data:
@@ -276,21 +387,15 @@ class RepliesConsumer(AsyncWebsocketConsumer):
                 text_data_json = json.loads(text_data)
                 comment = text_data_json.get("comment")
                 content = text_data_json.get("content")
-                organization_id = text_data_json.get("organization")
-                group_id = text_data_json.get("group")
-                user = text_data_json.get("user")
-
             except json.JSONDecodeError as e:
                 print(f"Invalid JSON format: {e}")
                 return
 
-            # Use database_sync_to_async to run synchronous ORM operations
-            comment = await database_sync_to_async(ForumComment.objects.get)(pk=comment)
-            user = await database_sync_to_async(User.objects.get)(pk=user)
-            organization = await database_sync_to_async(Organization.objects.get)(
-                pk=organization_id
-            )
-            group = await database_sync_to_async(Group.objects.get)(pk=group_id)
+            # Rows come from the connection's cache, only ones not seen yet are looked up
+            frame_objects = await self.get_frame_objects(ForumComment, comment, text_data_json)
+            if frame_objects is None:
+                return
+            comment, user, organization, group = frame_objects
 
             user_full_name = user.full_name
             created_at = int(time.time())
@@ -346,26 +451,11 @@ class RepliesConsumer(AsyncWebsocketConsumer):
         )
 
 
-class BlogCommentConsumer(AsyncWebsocketConsumer):
-    async def connect(self):
-        self.room_name = self.scope['url_route']['kwargs']['room_name']
-        self.room_group_name = 'blog_comments_%s' % self.room_name
-
-        # Join room group
-        await self.channel_layer.group_add(self.room_group_name, self.channel_name)
-
-        # Accept the WebSocket connection
-        await self.accept()
-
-    async def disconnect(self, close_code):
-        # Leave room group
-        await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+class BlogCommentConsumer(CachedObjectsConsumer):
+    room_group_format = 'blog_comments_%s'
 
     # Receive message from WebSocket
     async def receive(self, text_data):
-        from organization.models import Organization
-        from group.models import Group
-        from accounts.models import User
         from blog.models import Blog, Comment, BlogCommentReplies
         from platforms.models import Platform
 
@@ -374,23 +464,16 @@ class BlogCommentConsumer(AsyncWebsocketConsumer):
                 text_data_json = json.loads(text_data)
                 blog = text_data_json.get("blog")
                 content = text_data_json.get("content")
-                organization_id = text_data_json.get("organization")
-                group_id = text_data_json.get("group")
-                user = text_data_json.get("user")
-               
 
             except json.JSONDecodeError as e:
                 print(f"Invalid JSON format: {e}")
                 return
 
-            # Use database_sync_to_async to run synchronous ORM operations
-            blog = await database_sync_to_async(Blog.objects.get)(pk=blog)
-            user = await database_sync_to_async(User.objects.get)(pk=user)
-            organization = await database_sync_to_async(Organization.objects.get)(
-                pk=organization_id
-            )
-            group = await database_sync_to_async(Group.objects.get)(pk=group_id)
-            
+            # Rows come from the connection's cache, only ones not seen yet are looked up
+            frame_objects = await self.get_frame_objects(Blog, blog, text_data_json)
+            if frame_objects is None:
+                return
+            blog, user, organization, group = frame_objects
 
             created_at = int(time.time())
             user_full_name = user.full_name
@@ -449,27 +532,11 @@ class BlogCommentConsumer(AsyncWebsocketConsumer):
         )
 
 
-class BlogCommentRepliesConsumer(AsyncWebsocketConsumer):
-
-    async def connect(self):
-        self.room_name = self.scope['url_route']['kwargs']['room_name']
-        self.room_group_name = 'blog_comment_replies_%s' % self.room_name
-
-        # Join room group
-        await self.channel_layer.group_add(self.room_group_name, self.channel_name)
-
-        # Accept the WebSocket connection
-        await self.accept()
-
-    async def disconnect(self, close_code):
-        # Leave room group
-        await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+class BlogCommentRepliesConsumer(CachedObjectsConsumer):
+    room_group_format = 'blog_comment_replies_%s'
 
     # Receive message from WebSocket
     async def receive(self, text_data):
-        from organization.models import Organization
-        from group.models import Group
-        from accounts.models import User
         from blog.models import Comment,Blog,BlogCommentReplies
 
         if text_data:
@@ -477,21 +544,15 @@ class BlogCommentRepliesConsumer(AsyncWebsocketConsumer):
                 text_data_json = json.loads(text_data)
                 comment = text_data_json.get("comment")
                 content = text_data_json.get("content")
-                organization_id = text_data_json.get("organization")
-                group_id = text_data_json.get("group")
-                user = text_data_json.get("user")
-
             except json.JSONDecodeError as e:
                 print(f"Invalid JSON format: {e}")
                 return
 
-            # Use database_sync_to_async to run synchronous ORM operations
-            comment = await database_sync_to_async(Comment.objects.get)(pk=comment)
-            user = await database_sync_to_async(User.objects.get)(pk=user)
-            organization = await database_sync_to_async(Organization.objects.get)(
-                pk=organization_id
-            )
-            group = await database_sync_to_async(Group.objects.get)(pk=group_id)
+            # Rows come from the connection's cache, only ones not seen yet are looked up
+            frame_objects = await self.get_frame_objects(Comment, comment, text_data_json)
+            if frame_objects is None:
+                return
+            comment, user, organization, group = frame_objects
 
             user_full_name = user.full_name
             created_at = int(time.time())
@@ -545,3 +606,37 @@ class BlogCommentRepliesConsumer(AsyncWebsocketConsumer):
                 }
             )
         )
+
+
+class UploadConsumer(CachedObjectsConsumer):
+    """Tells a user how their queued resource and profile image uploads ended"""
+
+    room_group_format = 'uploads_%s'
+
+    async def connect(self):
+        await self.identify()
+
+        # Only the user themselves may follow their uploads
+        if self.user is None or str(self.user.pk) != self.room_name:
+            await self.accept()
+            await self.send(
+                text_data=json.dumps({"error": "Authentication invalid or not provided"})
+            )
+            await self.close()
+        else:
+            await self.channel_layer.group_add(self.room_group_name, self.channel_name)
+            await self.accept()
+
+    # Receive upload status from room group
+    async def upload_status(self, event):
+        await self.send(
+            text_data=json.dumps(
+                {
+                    "upload": event["upload"],
+                    "resource": event["resource"],
+                    "user": event["user"],
+                    "status": event["status"],
+                    "media_url": event["media_url"],
+                }
+            )
+        )
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+from uuid import uuid4
+from weakref import WeakKeyDictionary
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from accounts.models import User
+from counter.counts import record_counts
+from group.models import Group
+from in_app_chat.models import InAppChat
+from leader.rollups import record_activities
+from organization.models import Organization
+
+logger = logging.getLogger(__name__)
+
+# Seconds a primary key found in the database is trusted without looking it up again
+KNOWN_ID_TTL = 300
+
+
+class KnownIds:
+    """Primary keys recently seen in the database, shared by every consumer of a process"""
+
+    def __init__(self, ttl=KNOWN_ID_TTL):
+        self.ttl = ttl
+        self.expiries = {}
+
+    def is_known(self, model, pk):
+        expiry = self.expiries.get((model, pk))
+        return expiry is not None and expiry > time.monotonic()
+
+    def remember(self, model, pks):
+        expiry = time.monotonic() + self.ttl
+        for pk in pks:
+            self.expiries[(model, pk)] = expiry
+
+    def forget(self, model, pk):
+        self.expiries.pop((model, pk), None)
+
+    def find_missing(self, ids):
+        """The (model, pk) pairs of ids that do not exist, looking up only unknown ones"""
+
+        unknown = {}
+        for model, pk in ids:
+            if not self.is_known(model, pk):
+                unknown.setdefault(model, set()).add(pk)
+
+        missing = set()
+        for model, pks in unknown.items():
+            found = set(model.objects.filter(pk__in=pks).values_list("pk", flat=True))
+            self.remember(model, found)
+            missing.update((model, pk) for pk in pks - found)
+        return missing
+
+
+known_ids = KnownIds()
+
+
+async def validate_chat_ids(sender, receiver, organization, group=None):
+    """Error message for a chat whose sender, receiver, organization or group does not exist
+
+    Cached ids are accepted without a query, the others are looked up in a single hop.
+    """
+    try:
+        ids = [(User, int(sender)), (User, int(receiver)), (Organization, int(organization))]
+        if group:
+            ids.append((Group, int(group)))
+    except (TypeError, ValueError):
+        return "sender, receiver and organization must be ids"
+
+    if all(known_ids.is_known(model, pk) for model, pk in ids):
+        return None
+
+    missing = await database_sync_to_async(known_ids.find_missing)(ids)
+    if missing:
+        return ", ".join(
+            f"{model.__name__} {pk} not found" for model, pk in sorted(missing, key=str)
+        )
+    return None
+
+
+def build_chat_message(data):
+    """Field values of the InAppChat row a received chat message is stored as"""
+    return {
+        "sender_id": int(data["sender"]),
+        "receiver_id": int(data["receiver"]),
+        "organization_id": int(data["organization"]),
+        "group_id": int(data["group"]) if data.get("group") else None,
+        "content_type": data.get("content_type"),
+        "message": InAppChat.format_message(data.get("message")),
+        "unique_identifier": data.get("unique_identifier"),
+        "message_id": data.get("message_id") or uuid4().hex,
+    }
+
+
+def persist_chat_messages(messages):
+    """Store chat messages not stored yet under their message_id, returning the new rows"""
+
+    message_ids = [message["message_id"] for message in messages]
+    with transaction.atomic():
+        stored = set(
+            InAppChat.objects.filter(message_id__in=message_ids).values_list(
+                "message_id", flat=True
+            )
+        )
+        chats = [
+            InAppChat(**message) for message in messages if message["message_id"] not in stored
+        ]
+        InAppChat.objects.bulk_create(chats)
+        record_activities(chats)
+        record_counts(chats)
+    return chats
+
+
+def persist_chat_messages_one_by_one(messages):
+    """Store what can be stored of a batch that broke a constraint, dropping the bad rows"""
+
+    chats = []
+    for message in messages:
+        try:
+            chats += persist_chat_messages([message])
+        except IntegrityError:
+            logger.exception("Dropping chat message %s", message["message_id"])
+            known_ids.forget(User, message["sender_id"])
+            known_ids.forget(User, message["receiver_id"])
+            known_ids.forget(Organization, message["organization_id"])
+            known_ids.forget(Group, message["group_id"])
+    return chats
+
+
+class ChatBatcher:
+    """Stores chat messages with bulk_create every interval or batch_size messages
+
+    Messages are keyed on message_id, unique_identifier is the conversation they belong to.
+    A batch that fails is queued again and retried, and messages already stored under their
+    message_id are skipped, so retries and resent frames never duplicate a message. Messages
+    are fanned out before they are stored and pending ones are flushed on ASGI lifespan
+    shutdown, a process killed before that loses them: storage is at most once until a flush.
+    """
+
+    def __init__(self, batch_size, interval):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pending = {}
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+    def add(self, message):
+        self.pending.setdefault(message["message_id"], message)
+        if len(self.pending) >= self.batch_size:
+            self.wakeup.set()
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def run(self):
+        while self.pending:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        batch, self.pending = self.pending, {}
+        if not batch:
+            return []
+        try:
+            return await database_sync_to_async(persist_chat_messages)(list(batch.values()))
+        except IntegrityError:
+            return await database_sync_to_async(persist_chat_messages_one_by_one)(
+                list(batch.values())
+            )
+        except Exception:
+            logger.exception("Storing %s chat messages failed, retrying", len(batch))
+            for message_id, message in batch.items():
+                self.pending.setdefault(message_id, message)
+            return []
+
+
+_batchers = WeakKeyDictionary()
+
+
+def get_chat_batcher():
+    """The batcher of the running event loop"""
+    loop = asyncio.get_running_loop()
+    if loop not in _batchers:
+        _batchers[loop] = ChatBatcher(
+            settings.CHAT_BATCH_SIZE, settings.CHAT_BATCH_INTERVAL_MS / 1000
+        )
+    return _batchers[loop]
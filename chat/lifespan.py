@@ -0,0 +1,13 @@
+async def chat_lifespan(scope, receive, send):
+    """ASGI lifespan app storing the chat messages still batched when the server stops"""
+
+    from chat.ingest import get_chat_batcher
+
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await get_chat_batcher().flush()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from accounts.models import User
+from chat.presence import get_presence
+
+
+class Command(BaseCommand):
+    help = "Copy live chat presence into the online_count snapshot, run it periodically"
+
+    def handle(self, *args, **options):
+        online_counts = get_presence().online_counts()
+
+        with transaction.atomic():
+            gone = (
+                User.objects.filter(online_count__gt=0)
+                .exclude(pk__in=online_counts)
+                .update(online_count=0)
+            )
+            changed = [
+                user
+                for user in User.objects.filter(pk__in=online_counts).only("id", "online_count")
+                if user.online_count != online_counts[user.pk]
+            ]
+            for user in changed:
+                user.online_count = online_counts[user.pk]
+            User.objects.bulk_update(changed, ["online_count"], batch_size=500)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(online_counts)} users online, {len(changed)} counts updated, {gone} cleared"
+            )
+        )
@@ -0,0 +1,106 @@
+import time
+from threading import Lock
+from django.conf import settings
+
+PRESENCE_KEY_PREFIX = "presence:"
+
+
+class LocalPresence:
+    """In-process presence for development and tests, only sees this process's sockets"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.connections = {}
+        self.lock = Lock()
+
+    def heartbeat(self, user_id, connection):
+        now = time.time()
+        with self.lock:
+            connections = self.connections.setdefault(user_id, {})
+            for expired in [key for key, expiry in connections.items() if expiry <= now]:
+                del connections[expired]
+            connections[connection] = now + self.ttl
+
+    def leave(self, user_id, connection):
+        with self.lock:
+            self.connections.get(user_id, {}).pop(connection, None)
+
+    def online_counts(self, user_ids=None):
+        now = time.time()
+        with self.lock:
+            if user_ids is None:
+                user_ids = list(self.connections)
+            counts = {}
+            for user_id in user_ids:
+                live = sum(expiry > now for expiry in self.connections.get(user_id, {}).values())
+                if live:
+                    counts[user_id] = live
+        return counts
+
+
+class RedisPresence:
+    """Presence in Redis, one sorted set of connection -> expiry time per user
+
+    Connections that stop sending heartbeats drop out once their expiry passes, so a crashed
+    worker cannot leave users online. Every heartbeat removes the expired ones, so sockets
+    that never left do not pile up while a user keeps another one open, and the set itself
+    expires with its last connection.
+    """
+
+    def __init__(self, ttl, url):
+        import redis
+
+        if "://" not in url:
+            url = f"redis://{url}"
+        self.ttl = ttl
+        self.client = redis.Redis.from_url(url)
+
+    def get_key(self, user_id):
+        return f"{PRESENCE_KEY_PREFIX}{user_id}"
+
+    def heartbeat(self, user_id, connection):
+        key = self.get_key(user_id)
+        now = time.time()
+        with self.client.pipeline() as pipeline:
+            pipeline.zremrangebyscore(key, "-inf", now)
+            pipeline.zadd(key, {connection: now + self.ttl})
+            pipeline.expire(key, self.ttl)
+            pipeline.execute()
+
+    def leave(self, user_id, connection):
+        self.client.zrem(self.get_key(user_id), connection)
+
+    def online_counts(self, user_ids=None):
+        if user_ids is None:
+            user_ids = [
+                int(key[len(PRESENCE_KEY_PREFIX) :])
+                for key in self.client.scan_iter(match=f"{PRESENCE_KEY_PREFIX}*")
+            ]
+        user_ids = list(user_ids)
+
+        now = time.time()
+        with self.client.pipeline(transaction=False) as pipeline:
+            for user_id in user_ids:
+                pipeline.zcount(self.get_key(user_id), now, "+inf")
+            counts = pipeline.execute()
+        return {user_id: count for user_id, count in zip(user_ids, counts) if count}
+
+
+_presence = {}
+
+
+def get_presence():
+    """The presence backend named by PRESENCE_BACKEND, created once per process"""
+
+    backend = settings.PRESENCE_BACKEND
+    if backend not in _presence:
+        if backend == "redis":
+            _presence[backend] = RedisPresence(settings.PRESENCE_TTL, settings.REDIS_URL)
+        else:
+            _presence[backend] = LocalPresence(settings.PRESENCE_TTL)
+    return _presence[backend]
+
+
+def get_online_user_ids(user_ids):
+    """The ids among user_ids with at least one live connection, in one round trip"""
+    return set(get_presence().online_counts(user_ids))
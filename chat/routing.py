@@ -7,6 +7,7 @@ from chat.consumers import (
     RepliesConsumer,
     BlogCommentConsumer,
     BlogCommentRepliesConsumer,
+    UploadConsumer,
 )
 
 websocket_urlpatterns = [
@@ -15,4 +16,5 @@ websocket_urlpatterns = [
     re_path(r'^ws/forums/comment-replies/(?P<room_name>\w+)/$', RepliesConsumer.as_asgi()),
     re_path(r'^ws/blogs/comments/(?P<room_name>\w+)/$', BlogCommentConsumer.as_asgi()),
     re_path(r'^ws/blogs/comment-replies/(?P<room_name>\w+)/$', BlogCommentRepliesConsumer.as_asgi()),
+    re_path(r'^ws/uploads/(?P<room_name>\w+)/$', UploadConsumer.as_asgi()),
 ]
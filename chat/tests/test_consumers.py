@@ -0,0 +1,304 @@
+import asyncio
+import pytest
+
+# django-channels installs a different package under the channels name, skip when it shadows it
+pytest.importorskip("channels.consumer", exc_type=ImportError)
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.tests.factories import UserFactory
+from blog.models import Blog, Comment
+from group.models import Group
+from in_app_chat.models import InAppChat
+from leader.tests.factories import OrganizationFactory, GroupFactory, UserGroupFactory
+from chat.consumers import (
+    BlogCommentConsumer,
+    CachedObjectsConsumer,
+    ChatConsumer,
+    UploadConsumer,
+)
+from chat.ingest import get_chat_batcher
+from chat.presence import get_online_user_ids
+from resource.uploads import notify_upload
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture(autouse=True)
+def in_memory_channel_layer(settings):
+    settings.CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+@pytest.fixture
+def blog_scope():
+    organization = OrganizationFactory()
+    group = GroupFactory(organization_id=organization.organization_id)
+    user = UserFactory(organization_id=organization.organization_id)
+    UserGroupFactory(user=user, groups=[group])
+    blog = Blog.objects.create(organization=organization, group=group, author=user)
+    return organization, group, user, blog
+
+
+def connect(user=None):
+    query = f"?token={AccessToken.for_user(user)}" if user else ""
+    communicator = WebsocketCommunicator(
+        BlogCommentConsumer.as_asgi(), f"/ws/blogs/comments/room{query}"
+    )
+    communicator.scope["url_route"] = {"kwargs": {"room_name": "room"}}
+    return communicator
+
+
+class TestCachedObjectsConsumer:
+    def test_rows_are_looked_up_once_per_connection(self, blog_scope, monkeypatch):
+        organization, group, user, blog = blog_scope
+        loads = []
+        load_objects = CachedObjectsConsumer.__dict__["load_objects"]
+
+        async def counting_load_objects(self, keys):
+            loads.append(keys)
+            return await load_objects.__get__(self, type(self))(keys)
+
+        monkeypatch.setattr(CachedObjectsConsumer, "load_objects", counting_load_objects)
+
+        async def comment_twice():
+            communicator = connect(user)
+            connected, _ = await communicator.connect()
+            assert connected
+            replies = []
+            for content in ["first", "second"]:
+                await communicator.send_json_to(
+                    {"blog": blog.pk, "content": content, "group": group.pk}
+                )
+                replies.append(await communicator.receive_json_from())
+            await communicator.disconnect()
+            return replies
+
+        replies = asyncio.run(comment_twice())
+
+        assert [reply["content"] for reply in replies] == ["first", "second"]
+        assert {reply["user"] for reply in replies} == {user.pk}
+        assert {reply["organization"] for reply in replies} == {organization.pk}
+        assert Comment.objects.filter(blog=blog, user=user).count() == 2
+        # user and organization were resolved at connect, the blog and group by the first frame
+        assert loads == [[(Blog, blog.pk), (Group, group.pk)]]
+
+    def test_missing_rows_are_reported(self, blog_scope):
+        organization, group, user, _ = blog_scope
+
+        async def comment_on_missing_blog():
+            communicator = connect(user)
+            await communicator.connect()
+            await communicator.send_json_to(
+                {"blog": 0, "content": "lost", "organization": organization.pk, "group": group.pk}
+            )
+            reply = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return reply
+
+        assert asyncio.run(comment_on_missing_blog()) == {"error": "Blog not found"}
+        assert not Comment.objects.exists()
+
+    def test_frames_for_other_groups_are_rejected(self, blog_scope):
+        organization, _, user, blog = blog_scope
+        other_group = GroupFactory(organization_id=organization.organization_id)
+
+        async def comment_in_other_group():
+            communicator = connect(user)
+            await communicator.connect()
+            await communicator.send_json_to(
+                {"blog": blog.pk, "content": "intruding", "group": other_group.pk}
+            )
+            reply = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return reply
+
+        assert asyncio.run(comment_in_other_group()) == {
+            "error": f"User {user.pk} is not a member of group {other_group.pk}"
+        }
+        assert not Comment.objects.exists()
+
+
+    def test_frames_need_an_authenticated_user(self, blog_scope):
+        _, group, user, blog = blog_scope
+
+        async def comment_anonymously():
+            communicator = connect()
+            await communicator.connect()
+            await communicator.send_json_to(
+                {"blog": blog.pk, "content": "anonymous", "user": user.pk, "group": group.pk}
+            )
+            reply = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return reply
+
+        assert asyncio.run(comment_anonymously()) == {
+            "error": "Authentication invalid or not provided"
+        }
+        assert not Comment.objects.exists()
+
+    def test_frames_are_written_as_the_connected_user(self, blog_scope):
+        organization, group, user, blog = blog_scope
+        other_member = UserFactory(organization_id=organization.organization_id)
+        UserGroupFactory(user=other_member, groups=[group])
+
+        async def comment_as_someone_else():
+            communicator = connect(user)
+            await communicator.connect()
+            await communicator.send_json_to(
+                {"blog": blog.pk, "content": "mine", "user": other_member.pk, "group": group.pk}
+            )
+            reply = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return reply
+
+        assert asyncio.run(comment_as_someone_else())["user"] == user.pk
+        assert list(Comment.objects.values_list("user", flat=True)) == [user.pk]
+
+    def test_membership_is_asked_once_per_group(self, blog_scope, monkeypatch):
+        organization, _, user, blog = blog_scope
+        other_group = GroupFactory(organization_id=organization.organization_id)
+        asked = []
+        get_membership = CachedObjectsConsumer.get_membership
+
+        def counting_get_membership(user, group):
+            asked.append(group.pk)
+            return get_membership(user, group)
+
+        monkeypatch.setattr(
+            CachedObjectsConsumer, "get_membership", staticmethod(counting_get_membership)
+        )
+
+        async def comment_in_other_group_twice():
+            communicator = connect(user)
+            await communicator.connect()
+            replies = []
+            for content in ["first", "second"]:
+                await communicator.send_json_to(
+                    {"blog": blog.pk, "content": content, "group": other_group.pk}
+                )
+                replies.append(await communicator.receive_json_from())
+            await communicator.disconnect()
+            return replies
+
+        replies = asyncio.run(comment_in_other_group_twice())
+
+        assert all("error" in reply for reply in replies)
+        assert asked == [other_group.pk]
+
+
+class TestChatPresence:
+    def test_user_is_online_while_connected(self, blog_scope):
+        _, _, user, _ = blog_scope
+
+        async def connect_and_leave():
+            communicator = WebsocketCommunicator(
+                ChatConsumer.as_asgi(), f"/ws/chat/room?token={AccessToken.for_user(user)}"
+            )
+            communicator.scope["url_route"] = {"kwargs": {"room_name": "room"}}
+            await communicator.connect()
+            online_while_connected = get_online_user_ids([user.pk])
+            await communicator.disconnect()
+            return online_while_connected
+
+        assert asyncio.run(connect_and_leave()) == {user.pk}
+        assert get_online_user_ids([user.pk]) == set()
+
+    def test_disconnect_after_a_failed_connect(self, blog_scope, monkeypatch):
+        _, _, user, _ = blog_scope
+
+        async def failing_heartbeat(self):
+            raise ConnectionError("presence is down")
+
+        monkeypatch.setattr(ChatConsumer, "send_heartbeat", failing_heartbeat)
+        consumer = ChatConsumer()
+        consumer.scope = {
+            "url_route": {"kwargs": {"room_name": "room"}},
+            "query_string": f"token={AccessToken.for_user(user)}".encode(),
+        }
+        consumer.channel_layer = get_channel_layer()
+        consumer.channel_name = "chat.failed"
+
+        async def connect_and_disconnect():
+            with pytest.raises(ConnectionError):
+                await consumer.connect()
+            await consumer.disconnect(1011)
+
+        asyncio.run(connect_and_disconnect())
+
+        assert consumer.heartbeat_task is None
+
+    def test_disconnect_leaves_pending_messages_to_the_batcher(self, blog_scope, settings):
+        organization, group, user, _ = blog_scope
+        settings.CHAT_BATCH_INTERVAL_MS = 60000
+
+        async def chat_and_leave():
+            communicator = WebsocketCommunicator(
+                ChatConsumer.as_asgi(), f"/ws/chat/room?token={AccessToken.for_user(user)}"
+            )
+            communicator.scope["url_route"] = {"kwargs": {"room_name": "room"}}
+            await communicator.connect()
+            await communicator.send_json_to(
+                {
+                    "sender": user.pk,
+                    "receiver": user.pk,
+                    "organization": organization.pk,
+                    "group": group.pk,
+                    "message": "bye",
+                    "unique_identifier": "ada-bola",
+                    "message_id": "last-words",
+                }
+            )
+            reply = await communicator.receive_json_from()
+            await communicator.disconnect()
+            stored_at_disconnect = await database_sync_to_async(
+                InAppChat.objects.filter(message_id="last-words").exists
+            )()
+            await get_chat_batcher().flush()
+            return reply, stored_at_disconnect
+
+        reply, stored_at_disconnect = asyncio.run(chat_and_leave())
+
+        assert reply["message_id"] == "last-words"
+        assert not stored_at_disconnect
+        assert InAppChat.objects.filter(message_id="last-words").exists()
+
+
+
+class TestUploadConsumer:
+    def test_user_hears_about_their_own_uploads(self, blog_scope):
+        from resource.models import MediaUpload
+
+        _, _, user, _ = blog_scope
+        other_user = UserFactory()
+        upload = MediaUpload.objects.create(
+            staged_path="/tmp/me.png", user=user, requested_by=user, status="UPLOADED"
+        )
+
+        def connect_to_uploads(room_name):
+            communicator = WebsocketCommunicator(
+                UploadConsumer.as_asgi(),
+                f"/ws/uploads/{room_name}?token={AccessToken.for_user(user)}",
+            )
+            communicator.scope["url_route"] = {"kwargs": {"room_name": str(room_name)}}
+            return communicator
+
+        async def follow_uploads():
+            communicator = connect_to_uploads(user.pk)
+            await communicator.connect()
+            await database_sync_to_async(notify_upload)(upload)
+            status = await communicator.receive_json_from()
+            await communicator.disconnect()
+
+            stranger = connect_to_uploads(other_user.pk)
+            await stranger.connect()
+            refused = await stranger.receive_json_from()
+            await stranger.disconnect()
+            return status, refused
+
+        status, refused = asyncio.run(follow_uploads())
+
+        assert status["upload"] == upload.pk
+        assert status["status"] == "UPLOADED"
+        assert "error" in refused
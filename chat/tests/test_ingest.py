@@ -0,0 +1,130 @@
+import asyncio
+import pytest
+from accounts.tests.factories import UserFactory
+from in_app_chat.models import InAppChat
+from leader.models import DailyActivityTally
+from leader.tests.factories import OrganizationFactory, GroupFactory
+from chat.ingest import (
+    ChatBatcher,
+    build_chat_message,
+    get_chat_batcher,
+    known_ids,
+    persist_chat_messages,
+)
+from chat.lifespan import chat_lifespan
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def chat_scope():
+    organization = OrganizationFactory()
+    group = GroupFactory(organization_id=organization.organization_id)
+    sender, receiver = UserFactory.create_batch(2, organization_id=organization.organization_id)
+    return organization, group, sender, receiver
+
+
+def make_message(chat_scope, message_id, message="hello"):
+    organization, group, sender, receiver = chat_scope
+    return build_chat_message(
+        {
+            "sender": sender.pk,
+            "receiver": str(receiver.pk),
+            "organization": organization.pk,
+            "group": group.pk,
+            "message": message,
+            "content_type": "text",
+            "unique_identifier": "ada-bola",
+            "message_id": message_id,
+        }
+    )
+
+
+class TestPersistChatMessages:
+    def test_messages_are_stored_once_per_message_id(self, chat_scope, settings):
+        settings.SECI_ACTIVITY_ROLLUPS = True
+        _, _, sender, receiver = chat_scope
+        first = make_message(chat_scope, "a")
+
+        persist_chat_messages([first, make_message(chat_scope, "b")])
+        persist_chat_messages([first, make_message(chat_scope, "c")])
+
+        assert sorted(InAppChat.objects.values_list("message_id", flat=True)) == ["a", "b", "c"]
+        assert InAppChat.objects.get(message_id="a").message == "hello correct"
+        assert DailyActivityTally.objects.get(
+            user=sender, activity_key="send_chat_message"
+        ).count == 3
+        assert DailyActivityTally.objects.get(
+            user=receiver, activity_key="recieve_chat_message"
+        ).count == 3
+
+    def test_messages_of_one_conversation_are_all_stored(self, chat_scope):
+        persist_chat_messages([make_message(chat_scope, None, "first")])
+        persist_chat_messages([make_message(chat_scope, None, "second")])
+
+        assert sorted(
+            InAppChat.objects.filter(unique_identifier="ada-bola").values_list("message", flat=True)
+        ) == ["first correct", "second correct"]
+
+    def test_missing_message_id_gets_one(self, chat_scope):
+        first, second = make_message(chat_scope, None), make_message(chat_scope, None)
+
+        assert first["message_id"] and first["message_id"] != second["message_id"]
+        assert first["unique_identifier"] == "ada-bola"
+
+
+@pytest.mark.django_db(transaction=True)
+class TestChatBatcher:
+    def test_batch_is_flushed_when_full(self, chat_scope):
+        async def send_messages():
+            batcher = ChatBatcher(batch_size=3, interval=60)
+            for message_id in ["a", "b", "a", "c"]:
+                batcher.add(make_message(chat_scope, message_id))
+            await asyncio.wait_for(batcher.task, 5)
+
+        asyncio.run(send_messages())
+
+        assert InAppChat.objects.count() == 3
+
+    def test_messages_are_flushed_after_the_interval(self, chat_scope):
+        async def send_message():
+            batcher = ChatBatcher(batch_size=100, interval=0.01)
+            batcher.add(make_message(chat_scope, "a"))
+            await asyncio.wait_for(batcher.task, 5)
+
+        asyncio.run(send_message())
+
+        assert InAppChat.objects.filter(message_id="a").exists()
+
+    def test_lifespan_shutdown_stores_pending_messages(self, chat_scope, settings):
+        settings.CHAT_BATCH_INTERVAL_MS = 60000
+
+        async def shut_down():
+            get_chat_batcher().add(make_message(chat_scope, "a"))
+            events = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+            sent = []
+
+            async def receive():
+                return next(events)
+
+            async def send(message):
+                sent.append(message["type"])
+
+            await chat_lifespan({"type": "lifespan"}, receive, send)
+            return sent
+
+        sent = asyncio.run(shut_down())
+
+        assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+        assert InAppChat.objects.filter(message_id="a").exists()
+
+
+class TestKnownIds:
+    def test_known_ids_are_not_looked_up_again(self, chat_scope, django_assert_num_queries):
+        organization, _, sender, _ = chat_scope
+        ids = [(type(sender), sender.pk), (type(organization), organization.pk)]
+        known_ids.expiries.clear()
+
+        assert known_ids.find_missing(ids + [(type(sender), 0)]) == {(type(sender), 0)}
+        with django_assert_num_queries(0):
+            assert known_ids.find_missing(ids) == set()
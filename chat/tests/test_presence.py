@@ -0,0 +1,97 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from accounts.models import User
+from accounts.serializers import ListUserSerializer
+from accounts.tests.factories import UserFactory
+from chat.presence import LocalPresence, RedisPresence, get_presence
+
+pytestmark = pytest.mark.django_db
+
+
+class TestLocalPresence:
+    def test_connections_count_until_they_leave_or_expire(self):
+        presence = LocalPresence(ttl=60)
+        presence.heartbeat(1, "socket-a")
+        presence.heartbeat(1, "socket-b")
+        presence.heartbeat(2, "socket-c")
+        presence.leave(2, "socket-c")
+
+        assert presence.online_counts([1, 2, 3]) == {1: 2}
+
+        presence.ttl = -1
+        presence.heartbeat(1, "socket-a")
+        presence.heartbeat(1, "socket-b")
+        assert presence.online_counts() == {}
+
+        # Expired connections are dropped by the next heartbeat instead of piling up
+        presence.ttl = 60
+        presence.heartbeat(1, "socket-c")
+        assert list(presence.connections[1]) == ["socket-c"]
+
+
+class RecordingPipeline:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+
+class TestRedisPresence:
+    def test_heartbeat_prunes_expired_connections(self, monkeypatch):
+        presence = RedisPresence(ttl=60, url="127.0.0.1:6379")
+        calls = []
+        monkeypatch.setattr(presence.client, "pipeline", lambda: RecordingPipeline(calls))
+        monkeypatch.setattr("chat.presence.time.time", lambda: 1000.0)
+
+        presence.heartbeat(1, "socket-a")
+
+        assert calls == [
+            ("zremrangebyscore", ("presence:1", "-inf", 1000.0)),
+            ("zadd", ("presence:1", {"socket-a": 1060.0})),
+            ("expire", ("presence:1", 60)),
+            ("execute", ()),
+        ]
+
+
+class TestPresenceSnapshot:
+    def test_flush_copies_presence_to_online_count(self):
+        online, crashed, offline = UserFactory.create_batch(3)
+        User.objects.filter(pk=crashed.pk).update(online_count=4)
+        get_presence().heartbeat(online.pk, "socket-a")
+
+        call_command("flush_presence", stdout=open("/dev/null", "w"))
+
+        assert dict(User.objects.values_list("pk", "online_count")) == {
+            online.pk: 1,
+            crashed.pk: 0,
+            offline.pk: 0,
+        }
+
+
+class TestActiveForChat:
+    def test_user_lists_read_presence_in_one_lookup(self, monkeypatch):
+        online, offline = UserFactory.create_batch(2)
+        presence = get_presence()
+        presence.heartbeat(online.pk, "socket-a")
+        lookups = []
+        online_counts = presence.online_counts
+
+        def counting_online_counts(user_ids=None):
+            lookups.append(user_ids)
+            return online_counts(user_ids)
+
+        monkeypatch.setattr(presence, "online_counts", counting_online_counts)
+
+        data = ListUserSerializer(User.objects.order_by("pk"), many=True).data
+
+        assert [user["active_for_chat"] for user in data] == [True, False]
+        assert len(lookups) == 1
+        assert ListUserSerializer(offline).data["active_for_chat"] is False
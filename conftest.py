@@ -4,11 +4,48 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from accounts.tests.factories import UserFactory
 from accounts.models import User
 from django.urls import reverse
+from leader.weights import clear_weight_profiles
+from leader.events import get_view_event_buffer
+from chat.presence import get_presence
+from search.backends import install_search_index
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 AUTH_LOGIN_URL = reverse("user:login")
 
 
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker):
+    """The test database is built without migrations, so without their full-text indexes"""
+    with django_db_blocker.unblock():
+        install_search_index()
+
+
+@pytest.fixture(autouse=True)
+def weight_profiles():
+    """Cached SECI weights outlive the rolled back test database, drop them after each test"""
+    yield
+    clear_weight_profiles()
+
+
+@pytest.fixture(autouse=True)
+def view_event_buffer():
+    """Buffered view events would be written into the next test's database, drop them"""
+    yield
+    get_view_event_buffer().clear()
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@pytest.fixture(autouse=True)
+def local_presence(settings):
+    settings.PRESENCE_BACKEND = "local"
+    yield
+    get_presence().connections.clear()
+
+
 @pytest.fixture
 def verified_admin_user():
     admin = UserFactory(
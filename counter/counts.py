@@ -0,0 +1,133 @@
+from collections import Counter
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from accounts.models import User
+from blog.models import Blog
+from browser_history.models import BrowserHistory
+from forum.models import Forum
+from group.models import UserGroup
+from in_app_chat.models import InAppChat
+from resource.models import Resources
+from topics.models import Topic
+from .models import RecordCount
+
+# (model, fields it is counted by, field splitting the counts by type, whether its total over
+# every row is read) behind get-total-*. There is no counter of all rows, every insert would
+# wait on its lock: totals are summed from the counters of the first field, which then also
+# counts the rows without a value.
+COUNT_SOURCES = [
+    (Blog, ["organization", "group"], None, True),
+    (Forum, ["organization", "group"], None, True),
+    (Topic, ["organization", "group"], None, True),
+    (BrowserHistory, ["organization", "group"], None, True),
+    (InAppChat, ["organization", "group"], None, True),
+    (Resources, ["organization", "group"], "type", True),
+    (User, ["organization_id"], None, True),
+    (UserGroup.groups.through, ["group"], None, False),
+]
+
+
+def get_count_source(model):
+    return next(source for source in COUNT_SOURCES if source[0] is model)
+
+
+def get_count_fields(model):
+    """Attribute names whose change moves a row between counters"""
+
+    _, fields, type_field, _ = get_count_source(model)
+    names = {model._meta.get_field(field).attname for field in fields} | set(fields)
+    return names | {type_field} if type_field else names
+
+
+def get_scope(field, value):
+    return f"{field}={value}"
+
+
+def get_scopes(fields, totals, values):
+    """Scopes a row with values for fields is counted in, only the ones count_rows reads"""
+
+    scopes = []
+    for index, (field, value) in enumerate(zip(fields, values)):
+        if value not in (None, ""):
+            scopes.append(get_scope(field, value))
+        elif totals and index == 0:
+            scopes.append(get_scope(field, ""))
+    return scopes
+
+
+def get_count_keys(instance):
+    """(model label, scope, type) counters a row counts towards"""
+
+    model, fields, type_field, totals = get_count_source(type(instance))
+    row_type = (getattr(instance, type_field) or "") if type_field else ""
+    values = [getattr(instance, model._meta.get_field(field).attname) for field in fields]
+    return [
+        (model._meta.label_lower, scope, row_type) for scope in get_scopes(fields, totals, values)
+    ]
+
+
+def apply_count_changes(changes):
+    """Add a Counter of counter key -> change to the counter table, all or nothing
+
+    Nothing is written while RECORD_COUNTS is off, reconcile_record_counts rebuilds the
+    counters when it is turned on.
+    """
+    if not settings.RECORD_COUNTS:
+        return
+    with transaction.atomic():
+        for (model, scope, row_type), change in sorted(changes.items()):
+            if not change:
+                continue
+            counters = RecordCount.objects.filter(model=model, scope=scope, type=row_type)
+            if counters.update(count=F("count") + change):
+                continue
+            try:
+                with transaction.atomic():
+                    RecordCount.objects.create(
+                        model=model, scope=scope, type=row_type, count=change
+                    )
+            except IntegrityError:
+                counters.update(count=F("count") + change)
+
+
+def record_counts(instances, change=1):
+    """Count rows written without save(), e.g. through bulk_create"""
+
+    changes = Counter()
+    for instance in instances:
+        for key in get_count_keys(instance):
+            changes[key] += change
+    apply_count_changes(changes)
+
+
+def count_rows(model, **filters):
+    """Number of rows of model matching filters, read from the counter table when
+    RECORD_COUNTS is on
+
+    filters can hold the type and at most one of the fields the model is counted by, a
+    single counter is read for a field and the counters of the first field are summed
+    for a total.
+    """
+    if not settings.RECORD_COUNTS:
+        return model.objects.filter(**filters).count()
+
+    _, fields, type_field, totals = get_count_source(model)
+    row_type = str(filters.pop(type_field, "")) if type_field else ""
+    if len(filters) > 1 or not set(filters) <= set(fields):
+        raise ValueError(f"{model.__name__} is not counted by {', '.join(filters)}")
+
+    counters = RecordCount.objects.filter(model=model._meta.label_lower, type=row_type)
+    if filters:
+        count = (
+            counters.filter(scope=get_scope(*next(iter(filters.items()))))
+            .values_list("count", flat=True)
+            .first()
+        )
+    elif totals:
+        count = counters.filter(scope__startswith=get_scope(fields[0], "")).aggregate(
+            total=Sum("count")
+        )["total"]
+    else:
+        raise ValueError(f"{model.__name__} has no counted total")
+    return count or 0
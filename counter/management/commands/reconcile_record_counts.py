@@ -0,0 +1,67 @@
+from collections import Counter
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from counter.counts import COUNT_SOURCES, get_scope
+from counter.models import RecordCount
+
+
+class Command(BaseCommand):
+    help = "Recount the rows behind the get-total-* endpoints and repair counters that drifted"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only report the counters that drifted"
+        )
+
+    def get_expected_counts(self):
+        expected = Counter()
+        for model, fields, type_field, totals in COUNT_SOURCES:
+            label = model._meta.label_lower
+            for index, field in enumerate(fields):
+                group_by = [name for name in [field, type_field] if name]
+                rows = model.objects.order_by().values(*group_by).annotate(rows=Count("pk"))
+                for row in rows.iterator():
+                    value = row[field]
+                    # Rows without a value are only counted by the first field of a total
+                    if value in (None, ""):
+                        if not (totals and index == 0):
+                            continue
+                        value = ""
+                    row_type = (row[type_field] or "") if type_field else ""
+                    expected[(label, get_scope(field, value), row_type)] += row["rows"]
+        return expected
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            expected = self.get_expected_counts()
+            counters = {
+                (counter.model, counter.scope, counter.type): counter
+                for counter in RecordCount.objects.select_for_update()
+            }
+
+            drifted = []
+            for key in expected.keys() | counters.keys():
+                counter = counters.get(key)
+                if (counter.count if counter else 0) != expected[key]:
+                    drifted.append((key, counter))
+
+            for (model, scope, row_type), counter in sorted(drifted, key=lambda item: item[0]):
+                actual = counter.count if counter else 0
+                count = expected[(model, scope, row_type)]
+                self.stdout.write(f"{model} {scope or 'all'} {row_type}: {actual} -> {count}")
+                if options["dry_run"]:
+                    continue
+                if counter is None:
+                    RecordCount.objects.create(model=model, scope=scope, type=row_type, count=count)
+                elif (model, scope, row_type) not in expected:
+                    # A scope nothing reads any more, e.g. the former counters of all rows
+                    counter.delete()
+                else:
+                    counter.count = count
+                    counter.save(update_fields=["count"])
+
+        verb = "Found" if options["dry_run"] else "Repaired"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {len(drifted)} drifted counters of {len(expected)}")
+        )
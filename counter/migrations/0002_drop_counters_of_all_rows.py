@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def drop_counters_of_all_rows(apps, schema_editor):
+    """Totals are summed from the organization counters, run reconcile_record_counts after
+    this to count the rows without an organization"""
+
+    RecordCount = apps.get_model("counter", "RecordCount")
+    RecordCount.objects.filter(scope="").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("counter", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_counters_of_all_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class RecordCount(models.Model):
+    """Number of rows of a model, in total or within one organization or group, per type"""
+
+    model = models.CharField(max_length=100)
+    scope = models.CharField(max_length=100, blank=True, default="")
+    type = models.CharField(max_length=20, blank=True, default="")
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'scope', 'type'], name='unique_record_count')
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.model} {self.scope or 'all'} {self.type}: {self.count}"
@@ -0,0 +1,87 @@
+from collections import Counter
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from group.models import Group, UserGroup
+from simpleblog.saved_rows import get_saved_row, track_saved_rows
+from .counts import (
+    COUNT_SOURCES,
+    apply_count_changes,
+    get_count_fields,
+    get_count_keys,
+    record_counts,
+)
+
+Membership = UserGroup.groups.through
+
+
+def remember_counted_keys(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not settings.RECORD_COUNTS:
+        return
+    if instance._state.adding:
+        instance._counted_keys = []
+    elif update_fields is not None and not set(update_fields) & get_count_fields(sender):
+        instance._counted_keys = get_count_keys(instance)
+    elif not hasattr(instance, "_counted_keys"):
+        previous = get_saved_row(sender, instance)
+        instance._counted_keys = get_count_keys(previous) if previous else []
+
+
+def update_counts_on_save(sender, instance, raw=False, **kwargs):
+    # Keys counted so far are kept on the instance, a save nested in another post_save
+    # receiver (accounts sets organization_id that way) is then counted only once
+    if raw or not settings.RECORD_COUNTS:
+        return
+    keys = get_count_keys(instance)
+    changes = Counter(keys)
+    changes.subtract(getattr(instance, "_counted_keys", []))
+    apply_count_changes(changes)
+    instance._counted_keys = keys
+
+
+def update_counts_on_delete(sender, instance, **kwargs):
+    changes = Counter()
+    changes.subtract(get_count_keys(instance))
+    apply_count_changes(changes)
+
+
+def update_group_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    # Django sends no delete signals for membership rows, removals are counted from the rows
+    # about to go in pre_remove and pre_clear
+    if not settings.RECORD_COUNTS:
+        return
+    side, other_side = ("group", "usergroup") if reverse else ("usergroup", "group")
+
+    if action in ("pre_remove", "pre_clear"):
+        memberships = sender.objects.filter(**{side: instance})
+        if action == "pre_remove":
+            memberships = memberships.filter(**{f"{other_side}__in": pk_set})
+        instance._removed_memberships = list(memberships)
+    elif action in ("post_remove", "post_clear"):
+        record_counts(instance.__dict__.pop("_removed_memberships", []), change=-1)
+    elif action == "post_add" and pk_set:
+        record_counts(
+            [sender(**{f"{side}_id": instance.pk, f"{other_side}_id": pk}) for pk in pk_set]
+        )
+
+
+def remember_deleted_memberships(sender, instance, **kwargs):
+    if not settings.RECORD_COUNTS:
+        return
+    field = "group" if sender is Group else "usergroup"
+    instance._removed_memberships = list(Membership.objects.filter(**{field: instance}))
+
+
+def update_group_counts_on_delete(sender, instance, **kwargs):
+    record_counts(instance.__dict__.pop("_removed_memberships", []), change=-1)
+
+
+for model in [source[0] for source in COUNT_SOURCES if source[0] is not Membership]:
+    track_saved_rows(model)
+    pre_save.connect(remember_counted_keys, sender=model)
+    post_save.connect(update_counts_on_save, sender=model)
+    post_delete.connect(update_counts_on_delete, sender=model)
+
+m2m_changed.connect(update_group_counts, sender=Membership)
+for model in [UserGroup, Group]:
+    pre_delete.connect(remember_deleted_memberships, sender=model)
+    post_delete.connect(update_group_counts_on_delete, sender=model)
@@ -0,0 +1,166 @@
+from io import StringIO
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from accounts.models import User
+from accounts.tests.factories import UserFactory
+from blog.models import Blog
+from group.models import UserGroup
+from in_app_chat.models import InAppChat
+from resource.models import Resources
+from leader.tests.factories import OrganizationFactory, GroupFactory, UserGroupFactory
+from .counts import count_rows
+from .models import RecordCount
+
+pytestmark = pytest.mark.django_db
+
+Membership = UserGroup.groups.through
+
+
+@pytest.fixture
+def counted_scope(settings):
+    settings.RECORD_COUNTS = True
+    organization = OrganizationFactory()
+    groups = GroupFactory.create_batch(2, organization_id=organization.organization_id)
+    users = UserFactory.create_batch(2, role_id=3, organization_id=organization.organization_id)
+    return organization, groups, users
+
+
+def assert_counts_match(settings, model, **filters):
+    settings.RECORD_COUNTS = True
+    counted = count_rows(model, **filters)
+    settings.RECORD_COUNTS = False
+    assert counted == count_rows(model, **filters)
+    settings.RECORD_COUNTS = True
+    return counted
+
+
+class TestRecordCounts:
+    def test_writes_keep_counts_up_to_date(self, counted_scope, settings):
+        organization, (group, other_group), (sender, receiver) = counted_scope
+
+        blogs = [
+            Blog.objects.create(organization=organization, group=group, author=sender)
+            for _ in range(3)
+        ]
+        Blog.objects.create(organization=organization, group=other_group, author=sender)
+        InAppChat.objects.create(
+            organization=organization, group=group, sender=sender, receiver=receiver
+        )
+        assert assert_counts_match(settings, Blog) == 4
+        assert assert_counts_match(settings, Blog, organization=organization.pk) == 4
+        assert assert_counts_match(settings, Blog, group=group.pk) == 3
+        assert assert_counts_match(settings, InAppChat, group=group.pk) == 1
+
+        blogs[0].group = other_group
+        blogs[0].save()
+        blogs[1].delete()
+        assert assert_counts_match(settings, Blog, group=group.pk) == 1
+        assert assert_counts_match(settings, Blog, group=other_group.pk) == 2
+        assert assert_counts_match(settings, Blog, organization=organization.pk) == 3
+
+    def test_resources_are_counted_by_type(self, counted_scope, settings):
+        organization, (group, _), (sender, _) = counted_scope
+
+        resource = Resources.objects.create(
+            organization=organization, group=group, sender=sender, type="IMAGE"
+        )
+        resource.type = "VIDEO"
+        resource.save()
+
+        assert assert_counts_match(settings, Resources, group=group.pk, type="IMAGE") == 0
+        assert assert_counts_match(settings, Resources, group=group.pk, type="VIDEO") == 1
+
+    def test_members_are_counted_by_organization_and_group(self, counted_scope, settings):
+        organization, (group, other_group), (user, _) = counted_scope
+
+        admin = UserFactory(role_id=2, organization_id=None, organization_name="Acme")
+        membership = UserGroupFactory(user=user, groups=[group, other_group])
+        membership.groups.remove(other_group)
+        admin_membership = UserGroupFactory(user=admin, groups=[group, other_group])
+        admin_membership.groups.clear()
+        admin_membership.groups.add(group)
+
+        assert assert_counts_match(settings, User) == 3
+        assert (
+            assert_counts_match(settings, User, organization_id=organization.organization_id) == 2
+        )
+        assert assert_counts_match(settings, User, organization_id=admin.organization_id) == 1
+        assert assert_counts_match(settings, Membership, group=group.pk) == 2
+        assert assert_counts_match(settings, Membership, group=other_group.pk) == 0
+
+        membership.delete()
+        assert assert_counts_match(settings, Membership, group=group.pk) == 1
+
+    def test_totals_are_summed_without_a_counter_of_all_rows(self, counted_scope, settings):
+        organization, _, (sender, receiver) = counted_scope
+        UserFactory(role_id=3, organization_id=None)
+        InAppChat.objects.create(organization=organization, sender=sender, receiver=receiver)
+
+        assert assert_counts_match(settings, User) == 3
+        assert assert_counts_match(settings, InAppChat) == 1
+        assert not RecordCount.objects.filter(scope="").exists()
+        assert not RecordCount.objects.filter(scope="group=").exists()
+
+    def test_an_update_reads_the_stored_row_once(self, counted_scope, settings):
+        organization, (group, other_group), (sender, _) = counted_scope
+        blog = Blog.objects.create(organization=organization, group=group, author=sender)
+        blog = Blog.objects.get(pk=blog.pk)
+        blog.group = other_group
+
+        with CaptureQueriesContext(connection) as context:
+            blog.save()
+
+        reads = [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT") and 'FROM "blog_blog"' in query["sql"]
+        ]
+        assert len(reads) == 1
+        assert assert_counts_match(settings, Blog, group=other_group.pk) == 1
+
+    def test_counters_are_rebuilt_when_turned_on(self, counted_scope, settings):
+        organization, (group, _), (sender, _) = counted_scope
+        settings.RECORD_COUNTS = False
+
+        Blog.objects.create(organization=organization, group=group, author=sender)
+        assert not RecordCount.objects.filter(model="blog.blog").exists()
+
+        settings.RECORD_COUNTS = True
+        call_command("reconcile_record_counts", stdout=StringIO())
+        assert assert_counts_match(settings, Blog, group=group.pk) == 1
+
+    def test_reconcile_repairs_drift(self, counted_scope, settings):
+        organization, (group, other_group), (sender, _) = counted_scope
+        for _ in range(2):
+            Blog.objects.create(organization=organization, group=group, author=sender)
+        Blog.objects.update(group=other_group)
+        RecordCount.objects.filter(scope__startswith="organization").delete()
+        RecordCount.objects.create(model="blog.blog", scope="", count=7)
+
+        call_command("reconcile_record_counts", stdout=StringIO())
+
+        assert assert_counts_match(settings, Blog) == 2
+        assert assert_counts_match(settings, Blog, group=group.pk) == 0
+        assert assert_counts_match(settings, Blog, group=other_group.pk) == 2
+        assert assert_counts_match(settings, User) == 2
+        assert not RecordCount.objects.filter(scope="").exists()
+        output = StringIO()
+        call_command("reconcile_record_counts", "--dry-run", stdout=output)
+        assert "Found 0 drifted counters" in output.getvalue()
+
+    def test_totals_are_single_counter_reads(
+        self, api_client, counted_scope, django_assert_num_queries
+    ):
+        organization, (group, _), (sender, _) = counted_scope
+        Blog.objects.create(organization=organization, group=group, author=sender)
+        api_client.force_authenticate(user=sender)
+
+        with django_assert_num_queries(1):
+            response = api_client.get(
+                reverse("blog:blog-get-total-blogs-by-group"), {"group": group.pk}
+            )
+
+        assert response.json() == {"success": True, "total_blogs": 1}
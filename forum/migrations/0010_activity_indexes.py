@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("category", "0001_initial"),
+        ("forum", "0009_forum_end_time_forum_start_time_and_more"),
+        ("group", "0003_usergroup_unique_user_per_group"),
+        ("organization", "0002_alter_organization_organization_id_and_more"),
+        ("resource", "0007_activity_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="forum",
+            index=models.Index(
+                fields=["organization", "group", "created_at"],
+                name="forum_org_group_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="forum",
+            index=models.Index(
+                fields=["user", "created_at"], name="forum_user_created_idx"
+            ),
+        ),
+    ]
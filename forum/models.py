@@ -33,6 +33,13 @@ class Forum(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["organization", "group", "created_at"],
+                name="forum_org_group_created_idx",
+            ),
+            models.Index(fields=["user", "created_at"], name="forum_user_created_idx"),
+        ]
 
 
 class ForumComment(models.Model):
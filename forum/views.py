@@ -5,6 +5,7 @@ from rest_framework.permissions import AllowAny,IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from .models import Forum, ForumComment,CommentReplies
+from counter.counts import count_rows
 from .serializers import ForumSerializer,ForumCreateSerializer, ForumCommentSerializer,CommentReplySerializer
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, status, viewsets, filters
@@ -12,7 +13,8 @@ from rest_framework.decorators import action
 from accounts.permissions import IsAdmin, IsSuperAdmin, IsSuperAdminOrAdmin
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
-import cloudinary.uploader
+from resource.deletions import delete_with_media
+from leader.events import record_view
 from organization.models import Organization
 
 
@@ -37,10 +39,15 @@ class ForumViewSets(viewsets.ModelViewSet):
         return self.queryset.filter(organization=organization)
 
     def perform_destroy(self, instance):
+        # Attached files are removed by the purge_media_deletions worker once the forum is gone
+        cloud_ids = [resource.cloud_id for resource in instance.resources.all()]
+        delete_with_media(instance, cloud_ids, resource_type="raw")
 
-        for resource in instance.resources.all():
-            cloudinary.uploader.destroy(resource.cloud_id)
-        instance.delete()
+    def retrieve(self, request, *args, **kwargs):
+        forum = self.get_object()
+        # Buffered, counted as a read_forum SECI activity once its batch is written
+        record_view(request.user, "READ_FORUM", forum)
+        return Response(self.get_serializer(forum).data)
 
     def get_serializer_class(self):
         if self.action in ["retrieve", "list"]:
@@ -77,7 +84,7 @@ class ForumViewSets(viewsets.ModelViewSet):
 
         organization = request.query_params["organization"]
 
-        output = Forum.objects.filter(organization=organization).count()
+        output = count_rows(Forum, organization=organization)
         if not output:
             return Response(
                 {"success": False, "total_forums": 0},
@@ -97,7 +104,7 @@ class ForumViewSets(viewsets.ModelViewSet):
     )
     def get_total_forums(self, request, pk=None):
         """get total forums in the app"""
-        output = Forum.objects.count()
+        output = count_rows(Forum)
         if not output:
             return Response(
                 {"success": False, "total_forums": 0},
@@ -129,7 +136,7 @@ class ForumViewSets(viewsets.ModelViewSet):
         """Get total for an  organization forums by groups"""
 
         group = request.query_params["group"]
-        output = Forum.objects.filter(group=group).count()
+        output = count_rows(Forum, group=group)
         if not output:
             return Response(
                 {"success": False, "total_forums": 0},
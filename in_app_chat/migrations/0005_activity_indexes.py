@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("group", "0003_usergroup_unique_user_per_group"),
+        ("in_app_chat", "0004_inappchat_content_type"),
+        ("organization", "0002_alter_organization_organization_id_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inappchat",
+            index=models.Index(
+                fields=["organization", "group", "created_at"],
+                name="chat_org_group_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inappchat",
+            index=models.Index(
+                fields=["sender", "created_at"], name="chat_sender_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inappchat",
+            index=models.Index(
+                fields=["receiver", "created_at"], name="chat_receiver_created_idx"
+            ),
+        ),
+    ]
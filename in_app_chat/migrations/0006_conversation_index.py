@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("group", "0003_usergroup_unique_user_per_group"),
+        ("in_app_chat", "0005_activity_indexes"),
+        ("organization", "0002_alter_organization_organization_id_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inappchat",
+            index=models.Index(
+                fields=["unique_identifier", "created_at"],
+                name="chat_conversation_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,108 @@
+import re
+from django.conf import settings
+from django.db import migrations
+
+# The statements are frozen here rather than built by search.backends, so that later changes
+# to the backends never change what this migration did. Existing messages are indexed by
+# manage.py backfill_search_index, in batches outside a transaction so the table stays writable.
+
+POSTGRES_INSTALL = [
+    "ALTER TABLE in_app_chat_inappchat ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """
+    CREATE OR REPLACE FUNCTION in_app_chat_inappchat_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector(TG_ARGV[0]::regconfig, coalesce(NEW.message, '')), 'A');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS in_app_chat_inappchat_search_vector_update ON in_app_chat_inappchat",
+    """
+    CREATE TRIGGER in_app_chat_inappchat_search_vector_update
+    BEFORE INSERT OR UPDATE OF message ON in_app_chat_inappchat
+    FOR EACH ROW EXECUTE FUNCTION in_app_chat_inappchat_search_vector('{language}')
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS in_app_chat_inappchat_search_vector_idx
+    ON in_app_chat_inappchat USING GIN (search_vector)
+    """,
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS in_app_chat_inappchat_search_vector_update ON in_app_chat_inappchat",
+    "DROP FUNCTION IF EXISTS in_app_chat_inappchat_search_vector()",
+    "ALTER TABLE in_app_chat_inappchat DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS in_app_chat_inappchat_fts USING fts5(
+        message, content='in_app_chat_inappchat', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS in_app_chat_inappchat_fts_insert
+    AFTER INSERT ON in_app_chat_inappchat BEGIN
+        INSERT INTO in_app_chat_inappchat_fts(rowid, message) VALUES (new.id, new.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS in_app_chat_inappchat_fts_delete
+    AFTER DELETE ON in_app_chat_inappchat BEGIN
+        INSERT INTO in_app_chat_inappchat_fts(in_app_chat_inappchat_fts, rowid, message)
+        VALUES ('delete', old.id, old.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS in_app_chat_inappchat_fts_update
+    AFTER UPDATE ON in_app_chat_inappchat BEGIN
+        INSERT INTO in_app_chat_inappchat_fts(in_app_chat_inappchat_fts, rowid, message)
+        VALUES ('delete', old.id, old.message);
+        INSERT INTO in_app_chat_inappchat_fts(rowid, message) VALUES (new.id, new.message);
+    END
+    """,
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS in_app_chat_inappchat_fts_insert",
+    "DROP TRIGGER IF EXISTS in_app_chat_inappchat_fts_delete",
+    "DROP TRIGGER IF EXISTS in_app_chat_inappchat_fts_update",
+    "DROP TABLE IF EXISTS in_app_chat_inappchat_fts",
+]
+
+
+def get_language():
+    language = settings.SEARCH_LANGUAGE
+    if not re.fullmatch(r"\w+", language):
+        raise ValueError(f"Invalid SEARCH_LANGUAGE {language!r}")
+    return language
+
+
+def install_message_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        for statement in POSTGRES_INSTALL:
+            schema_editor.execute(statement.replace("{language}", get_language()))
+    elif vendor == "sqlite":
+        for statement in SQLITE_INSTALL:
+            schema_editor.execute(statement)
+
+
+def uninstall_message_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {"postgresql": POSTGRES_UNINSTALL, "sqlite": SQLITE_UNINSTALL}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("in_app_chat", "0006_conversation_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_message_index, uninstall_message_index),
+    ]
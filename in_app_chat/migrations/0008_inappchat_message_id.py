@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("group", "0003_usergroup_unique_user_per_group"),
+        ("in_app_chat", "0007_full_text_index"),
+        ("organization", "0002_alter_organization_organization_id_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="inappchat",
+            name="message_id",
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name="inappchat",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("message_id__isnull", False)),
+                fields=("message_id",),
+                name="chat_unique_message_id",
+            ),
+        ),
+    ]
@@ -14,14 +14,22 @@ class InAppChat(models.Model):
         Group, on_delete=models.CASCADE, null=True, related_name="group_chats"
     )
     content_type = models.CharField(max_length=255, null=True)
+    # Key of the conversation the message belongs to
     unique_identifier = models.CharField(max_length=255, null=True)
+    # Key of the message itself, a resent frame with the same message_id is stored once
+    message_id = models.CharField(max_length=64, null=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True)
     updated_at = models.DateTimeField(auto_now=True, null=True)
 
 
+    @staticmethod
+    def format_message(message):
+        if message and not message.endswith(" correct"):
+            return message + " correct"
+        return message
+
     def save(self, *args, **kwargs):
-        if self.message and not self.message.endswith(" correct"):
-            self.message = self.message + " correct"
+        self.message = self.format_message(self.message)
         super(InAppChat, self).save(*args, **kwargs)
 
     def __str__(self) -> str:
@@ -29,3 +37,23 @@ class InAppChat(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["organization", "group", "created_at"],
+                name="chat_org_group_created_idx",
+            ),
+            models.Index(fields=["sender", "created_at"], name="chat_sender_created_idx"),
+            models.Index(fields=["receiver", "created_at"], name="chat_receiver_created_idx"),
+            models.Index(
+                fields=["unique_identifier", "created_at"], name="chat_conversation_created_idx"
+            ),
+        ]
+        constraints = [
+            # Partial so that adding it creates an index instead of rebuilding the table, which
+            # would drop the full-text triggers on SQLite
+            models.UniqueConstraint(
+                fields=["message_id"],
+                condition=models.Q(message_id__isnull=False),
+                name="chat_unique_message_id",
+            ),
+        ]
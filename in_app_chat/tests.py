@@ -0,0 +1,181 @@
+from datetime import datetime, timezone
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from accounts.tests.factories import UserFactory
+from leader.tests.factories import OrganizationFactory
+from .models import InAppChat
+
+pytestmark = pytest.mark.django_db
+
+CHATS_URL = reverse("in_app_chat:inappchat-list")
+
+
+@pytest.fixture
+def chats():
+    organization = OrganizationFactory()
+    sender, receiver = UserFactory.create_batch(2, organization_id=organization.organization_id)
+    chats = [
+        InAppChat.objects.create(
+            organization=organization, sender=sender, receiver=receiver, message=str(number)
+        )
+        for number in range(7)
+    ]
+    # Ties on created_at are broken by id
+    InAppChat.objects.filter(pk__in=[chat.pk for chat in chats[2:5]]).update(
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc)
+    )
+    ordered = InAppChat.objects.order_by("-created_at", "-pk").values_list("pk", flat=True)
+    return sender, list(ordered)
+
+
+def get_page(api_client, url, params=None):
+    response = api_client.get(url, params)
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestCursorPagination:
+    def test_cursor_pages_walk_every_chat_once(self, api_client, chats):
+        user, chats = chats
+        api_client.force_authenticate(user=user)
+
+        page = get_page(api_client, CHATS_URL, {"cursor": "", "page_size": 3})
+        seen = [chat["id"] for chat in page["results"]]
+        assert page["links"]["previous"] is None
+        assert "total" not in page
+
+        while page["links"]["next"]:
+            page = get_page(api_client, page["links"]["next"])
+            seen += [chat["id"] for chat in page["results"]]
+
+        assert seen == chats
+
+        previous = get_page(api_client, page["links"]["previous"])
+        assert [chat["id"] for chat in previous["results"]] == chats[3:6]
+
+    def test_cursor_pages_skip_the_count(self, api_client, chats):
+        user, chats = chats
+        api_client.force_authenticate(user=user)
+        first = get_page(api_client, CHATS_URL, {"cursor": "", "page_size": 2})
+
+        with CaptureQueriesContext(connection) as context:
+            get_page(api_client, first["links"]["next"])
+
+        assert not [query for query in context.captured_queries if "COUNT(" in query["sql"]]
+        assert not [query for query in context.captured_queries if "OFFSET" in query["sql"]]
+
+    def test_page_numbers_keep_working(self, api_client, chats):
+        user, chats = chats
+        api_client.force_authenticate(user=user)
+
+        page = get_page(api_client, CHATS_URL, {"page": 2, "page_size": 3})
+
+        assert page["total"] == 7
+        assert page["current_page"] == 2
+        assert len(page["results"]) == 3
+
+    def test_invalid_cursor(self, api_client, chats):
+        user, chats = chats
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(CHATS_URL, {"cursor": "not-a-cursor"})
+
+        assert response.status_code == 404
+
+
+SEARCH_CHATS_URL = reverse("in_app_chat:inappchat-search-chats")
+
+
+@pytest.fixture
+def conversations():
+    organization = OrganizationFactory()
+    ada, bola, chidi = UserFactory.create_batch(3, organization_id=organization.organization_id)
+    scope = {"organization": organization}
+    InAppChat.objects.create(
+        sender=ada, receiver=bola, unique_identifier="ada-bola", message="Budget review", **scope
+    )
+    InAppChat.objects.create(
+        sender=bola, receiver=ada, unique_identifier="ada-bola", message="Reviewing it", **scope
+    )
+    # Written like the chat ingest does, without save()
+    InAppChat.objects.bulk_create(
+        InAppChat(
+            sender=ada,
+            receiver=chidi,
+            unique_identifier="ada-chidi",
+            message=f"Budget draft {number}",
+            **scope,
+        )
+        for number in range(3)
+    )
+    # Not visible to ada
+    InAppChat.objects.create(sender=bola, receiver=chidi, message="Budget secrets", **scope)
+    return ada, bola, chidi
+
+
+def search_chats(api_client, user, **params):
+    api_client.force_authenticate(user=user)
+    return get_page(api_client, SEARCH_CHATS_URL, params)
+
+
+def get_messages(page):
+    # InAppChat.save() appends " correct" to messages
+    return sorted(chat["message"].removesuffix(" correct") for chat in page["results"])
+
+
+class TestChatSearch:
+    def test_searches_only_the_users_conversations(self, api_client, conversations):
+        ada, bola, chidi = conversations
+
+        page = search_chats(api_client, ada, q="budget")
+
+        assert get_messages(page) == [
+            "Budget draft 0",
+            "Budget draft 1",
+            "Budget draft 2",
+            "Budget review",
+        ]
+        assert search_chats(api_client, chidi, q="budget secrets")["results"][0]["sender"] == (
+            bola.pk
+        )
+
+    def test_words_are_stemmed_and_scoped_to_a_conversation(self, api_client, conversations):
+        ada, bola, _ = conversations
+
+        page = search_chats(api_client, ada, q="review", unique_identifier="ada-bola")
+
+        assert get_messages(page) == ["Budget review", "Reviewing it"]
+        assert search_chats(api_client, ada, q="budget", participant=bola.pk)["results"] == [
+            page["results"][1]
+        ]
+
+    def test_pages_with_a_cursor(self, api_client, conversations):
+        ada, _, _ = conversations
+
+        page = search_chats(api_client, ada, q="budget", page_size=3)
+        seen = [chat["id"] for chat in page["results"]]
+        page = get_page(api_client, page["links"]["next"])
+        seen += [chat["id"] for chat in page["results"]]
+
+        assert "total" not in page
+        assert page["links"]["next"] is None
+        assert seen == list(
+            InAppChat.objects.filter(message__startswith="Budget", sender=ada)
+            .order_by("-created_at", "-pk")
+            .values_list("pk", flat=True)
+        )
+
+    def test_edited_messages_are_reindexed(self, api_client, conversations):
+        ada, _, _ = conversations
+        InAppChat.objects.filter(message__startswith="Reviewing").update(message="Approved")
+
+        assert get_messages(search_chats(api_client, ada, q="approved")) == ["Approved"]
+        assert get_messages(search_chats(api_client, ada, q="reviewing")) == ["Budget review"]
+
+    def test_requires_a_query(self, api_client, conversations):
+        ada, _, _ = conversations
+        api_client.force_authenticate(user=ada)
+
+        assert api_client.get(SEARCH_CHATS_URL).status_code == 400
@@ -5,6 +5,7 @@ from rest_framework.permissions import AllowAny
 from rest_framework.request import Request
 from rest_framework.response import Response
 from .models import InAppChat
+from counter.counts import count_rows
 from .serializers import InAppChatSerializer
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, status, viewsets, filters
@@ -13,6 +14,11 @@ from accounts.permissions import IsAdmin, IsSuperAdmin, IsSuperAdminOrAdmin
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from organization.models import Organization
+from search.backends import get_search_backend
+from simpleblog.pagination import KeysetPagination
 
 
 class InAppChatViewSets(
@@ -47,6 +53,56 @@ class InAppChatViewSets(
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="q", description="Words to search for", required=True, type=OpenApiTypes.STR
+            ),
+            OpenApiParameter(
+                name="unique_identifier",
+                description="Only search this conversation",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="participant",
+                description="Only search chats with this user",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+        ],
+    )
+    @action(
+        methods=['GET'],
+        detail=False,
+        pagination_class=KeysetPagination,
+        url_path='search-chats',
+    )
+    def search_chats(self, request, pk=None):
+        """Search the chats the user sent or received, newest first"""
+
+        query = request.query_params.get("q", "").strip()
+        participant = request.query_params.get("participant")
+        if not query:
+            raise ValidationError(detail="q is required", code=status.HTTP_400_BAD_REQUEST)
+        if participant is not None and not participant.isdigit():
+            raise ValidationError(
+                detail="participant must be a number", code=status.HTTP_400_BAD_REQUEST
+            )
+
+        organization = Organization.objects.filter(
+            organization_id=request.user.organization_id
+        ).first()
+        chats = InAppChat.objects.filter(
+            Q(sender=request.user) | Q(receiver=request.user), organization=organization
+        ).select_related("sender", "receiver", "group", "organization")
+        if request.query_params.get("unique_identifier"):
+            chats = chats.filter(unique_identifier=request.query_params["unique_identifier"])
+        if participant is not None:
+            chats = chats.filter(Q(sender=participant) | Q(receiver=participant))
+
+        return self.paginate_results(get_search_backend().filter_matches(chats, query))
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -69,7 +125,7 @@ class InAppChatViewSets(
 
         organization = request.query_params["organization"]
 
-        output = InAppChat.objects.filter(organization=organization).values('receiver').count()
+        output = count_rows(InAppChat, organization=organization)
         if not output:
             return Response(
                 {"success": False, "total_chats": 0},
@@ -103,7 +159,7 @@ class InAppChatViewSets(
 
         organization = request.query_params["organization"]
 
-        output = InAppChat.objects.filter(organization=organization).values('sender').count()
+        output = count_rows(InAppChat, organization=organization)
         if not output:
             return Response(
                 {"success": False, "total_chats": 0},
@@ -123,7 +179,7 @@ class InAppChatViewSets(
     )
     def get_total_incoming_chats(self, request, pk=None):
         """get total incoming chats in the app"""
-        output = InAppChat.objects.filter().values('receiver').count()
+        output = count_rows(InAppChat)
         if not output:
             return Response(
                 {"success": False, "total_chats": 0},
@@ -143,7 +199,7 @@ class InAppChatViewSets(
     )
     def get_total_outgoing_chats(self, request, pk=None):
         """get total outgoing in the app"""
-        output = InAppChat.objects.filter().values('sender').count()
+        output = count_rows(InAppChat)
         if not output:
             return Response(
                 {"success": False, "total_chats": 0},
@@ -175,7 +231,7 @@ class InAppChatViewSets(
         """Get total incoming chats by groups"""
 
         group = request.query_params["group"]
-        output = InAppChat.objects.filter(group=group).values('receiver').count()
+        output = count_rows(InAppChat, group=group)
         if not output:
             return Response(
                 {"success": False, "total_chats": 0},
@@ -207,7 +263,7 @@ class InAppChatViewSets(
         """Get total outgoing chats by groups"""
 
         group = request.query_params["group"]
-        output = InAppChat.objects.filter(group=group).values('sender').count()
+        output = count_rows(InAppChat, group=group)
         if not output:
             return Response(
                 {"success": False, "total_chats": 0},
@@ -0,0 +1,18 @@
+from .models import ActivityEvent
+
+
+def log_activity_changes(changes):
+    """Append a Counter of (organization, group, user, created_at, activity key) -> change"""
+
+    ActivityEvent.objects.bulk_create(
+        ActivityEvent(
+            organization_id=organization,
+            group_id=group,
+            user_id=user,
+            created_at=created_at,
+            activity_key=activity_key,
+            change=change,
+        )
+        for (organization, group, user, created_at, activity_key), change in changes.items()
+        if change
+    )
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Caches a process cannot share, a weight change made in one process never reaches the others
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Cached SECI weight profiles are invalidated across processes through the default cache"""
+
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+
+    message = (
+        f"The default cache {backend} is process-local, other processes keep scoring with "
+        "SECI weights changed after they cached them"
+    )
+    # Only a warning, a single process is fine without Redis and an error would block manage.py
+    hint = "Set CACHE_BACKEND=redis to share the cache through REDIS_URL"
+    return [Warning(message, hint=hint, id="leader.W001")]
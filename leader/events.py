@@ -0,0 +1,137 @@
+import atexit
+import logging
+import time
+from threading import Lock
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import ViewEvent
+from .rollups import record_activities
+
+logger = logging.getLogger(__name__)
+
+
+def persist_view_events(events):
+    """Append view events with one insert and add them to the daily tallies"""
+
+    with transaction.atomic():
+        ViewEvent.objects.bulk_create(events)
+        record_activities(events)
+    return events
+
+
+def persist_view_events_one_by_one(events):
+    """Store what can be stored of a batch that broke a constraint, dropping the bad events"""
+
+    stored = []
+    for event in events:
+        try:
+            stored += persist_view_events([event])
+        except IntegrityError:
+            logger.warning("Dropping view event %s", event)
+    return stored
+
+
+class ViewEventBuffer:
+    """Collects view events in memory and writes them in batches
+
+    A read or download costs an append to a list. The request that fills the buffer to
+    batch_size writes the batch, and every request writes it on request_finished once the
+    oldest event waited interval seconds. Events still buffered when the process exits are
+    written by an atexit hook, only a process that is killed loses them.
+
+    A batch that fails is kept and retried an interval later. While the database stays down
+    at most max_events are kept, the oldest are dropped past that.
+    """
+
+    def __init__(self, batch_size, interval, max_events):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_events = max_events
+        self.events = []
+        self.lock = Lock()
+        self.oldest_at = None
+
+    def add(self, event):
+        with self.lock:
+            if not self.events:
+                self.oldest_at = time.monotonic()
+            self.events.append(event)
+            full = len(self.events) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush_if_due(self):
+        with self.lock:
+            due = bool(self.events) and time.monotonic() - self.oldest_at >= self.interval
+        return self.flush() if due else []
+
+    def flush(self):
+        with self.lock:
+            events, self.events = self.events, []
+        if not events:
+            return []
+        try:
+            return persist_view_events(events)
+        except IntegrityError:
+            return persist_view_events_one_by_one(events)
+        except Exception:
+            logger.exception("Storing %s view events failed, retrying", len(events))
+            self.requeue(events)
+            return []
+
+    def requeue(self, events):
+        with self.lock:
+            self.events[:0] = events
+            self.oldest_at = time.monotonic()
+            dropped = len(self.events) - self.max_events
+            if dropped > 0:
+                del self.events[:dropped]
+        if dropped > 0:
+            logger.error("Dropping the %s oldest view events, the buffer is full", dropped)
+
+    def clear(self):
+        with self.lock:
+            self.events = []
+
+
+_buffer = None
+
+
+def get_view_event_buffer():
+    """The buffer of this process, flushed once more when the process exits"""
+
+    global _buffer
+    if _buffer is None:
+        _buffer = ViewEventBuffer(
+            settings.VIEW_EVENT_BATCH_SIZE,
+            settings.VIEW_EVENT_FLUSH_INTERVAL,
+            settings.VIEW_EVENT_MAX_BUFFERED,
+        )
+        atexit.register(_buffer.flush)
+    return _buffer
+
+
+def flush_due_view_events(sender=None, **kwargs):
+    """request_finished receiver writing the buffered view events once they are due"""
+
+    if _buffer is not None:
+        _buffer.flush_if_due()
+
+
+def record_view(user, kind, instance):
+    """Buffer a read or download of a blog, forum or resource by a user"""
+
+    if not user.is_authenticated:
+        return
+    get_view_event_buffer().add(
+        ViewEvent(
+            organization_id=instance.organization_id,
+            group_id=instance.group_id,
+            user_id=user.pk,
+            kind=kind,
+            object_id=instance.pk,
+            # Stamped now, the view counts for the day it happened whenever it is written
+            created_at=timezone.now(),
+        )
+    )
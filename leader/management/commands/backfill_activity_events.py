@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from leader import partitions
+from leader.models import ActivityEvent
+from leader.scoring import ACTIVITY_SOURCES
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Rebuild the SECI activity event log from the activity tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization", type=int, help="Only rebuild the events of this organization pk"
+        )
+
+    def create_partitions(self, scope):
+        """Partitions for every month holding activity, so no event lands in the default one"""
+
+        first = [
+            model.objects.filter(**scope).aggregate(first=Min("created_at"))["first"]
+            for model, _, _ in ACTIVITY_SOURCES
+        ]
+        first = [created_at for created_at in first if created_at is not None]
+        if first:
+            partitions.create_partitions(min(first), partitions.get_month(timezone.now()))
+
+    def handle(self, *args, **options):
+        organization = options["organization"]
+        scope = {"organization": organization} if organization else {}
+
+        if partitions.is_partitioned():
+            self.create_partitions(scope)
+
+        with transaction.atomic():
+            deleted, _ = ActivityEvent.objects.filter(**scope).delete()
+            created = 0
+            batch = []
+
+            for model, actor, activities in ACTIVITY_SOURCES:
+                lookup_fields = {field for lookups in activities.values() for field in lookups}
+                rows = (
+                    model.objects.filter(created_at__isnull=False, **scope)
+                    .order_by()
+                    .values("organization", "group", actor, "created_at", *lookup_fields)
+                )
+                for row in rows.iterator(chunk_size=BATCH_SIZE):
+                    for activity_key, lookups in activities.items():
+                        if any(row[field] != value for field, value in lookups.items()):
+                            continue
+                        batch.append(
+                            ActivityEvent(
+                                organization_id=row["organization"],
+                                group_id=row["group"],
+                                user_id=row[actor],
+                                created_at=row["created_at"],
+                                activity_key=activity_key,
+                            )
+                        )
+                    if len(batch) >= BATCH_SIZE:
+                        ActivityEvent.objects.bulk_create(batch)
+                        created += len(batch)
+                        batch = []
+
+            ActivityEvent.objects.bulk_create(batch)
+            created += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Replaced {deleted} activity events with {created} rebuilt ones")
+        )
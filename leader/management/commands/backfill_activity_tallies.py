@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from leader.models import DailyActivityTally
+from leader.scoring import ACTIVITY_SOURCES
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily SECI activity tallies from the activity tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization", type=int, help="Only rebuild the tallies of this organization pk"
+        )
+
+    def handle(self, *args, **options):
+        organization = options["organization"]
+        scope = {"organization": organization} if organization else {}
+
+        with transaction.atomic():
+            deleted, _ = DailyActivityTally.objects.filter(**scope).delete()
+            created = 0
+            batch = []
+
+            for model, actor, activities in ACTIVITY_SOURCES:
+                rows = (
+                    model.objects.filter(created_at__isnull=False, **scope)
+                    .annotate(day=TruncDate("created_at"))
+                    .order_by()
+                    .values("organization", "group", actor, "day")
+                    .annotate(
+                        **{
+                            key: Count("pk", filter=Q(**lookups) if lookups else None)
+                            for key, lookups in activities.items()
+                        }
+                    )
+                )
+                for row in rows.iterator():
+                    for activity_key in activities:
+                        if not row[activity_key]:
+                            continue
+                        batch.append(
+                            DailyActivityTally(
+                                organization_id=row["organization"],
+                                group_id=row["group"],
+                                user_id=row[actor],
+                                day=row["day"],
+                                activity_key=activity_key,
+                                count=row[activity_key],
+                            )
+                        )
+                    if len(batch) >= BATCH_SIZE:
+                        DailyActivityTally.objects.bulk_create(batch)
+                        created += len(batch)
+                        batch = []
+
+            DailyActivityTally.objects.bulk_create(batch)
+            created += len(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Replaced {deleted} activity tallies with {created} rebuilt ones")
+        )
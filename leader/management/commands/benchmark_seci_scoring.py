@@ -0,0 +1,75 @@
+import random
+import time
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from simpleblog.utils import (
+    SECI_ACTIVITY_KEYS,
+    build_weight_matrix,
+    calculate_batch_scores,
+    calculate_categorized_percentage,
+    calculate_category_score,
+    calculate_percentage,
+    calculate_total_engagement_score,
+)
+
+
+class Command(BaseCommand):
+    help = "Time per-user SECI scoring against the batch scoring core on random tallies"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10000, help="Number of users to score")
+        parser.add_argument("--seed", type=int, default=0, help="Seed for the random tallies")
+
+    def handle(self, *args, **options):
+        generator = random.Random(options["seed"])
+        weights = [
+            {key: Decimal(generator.randint(0, 50000)).scaleb(-5) for key in SECI_ACTIVITY_KEYS}
+            for _ in range(4)
+        ]
+        all_tallies = [
+            {key: generator.randint(0, 200) for key in SECI_ACTIVITY_KEYS}
+            for _ in range(options["users"])
+        ]
+        tally_matrix = [[tallies[key] for key in SECI_ACTIVITY_KEYS] for tallies in all_tallies]
+
+        started = time.perf_counter()
+        percentages = []
+        for tallies in all_tallies:
+            scores = [calculate_category_score(dimension, tallies) for dimension in weights]
+            tes = calculate_total_engagement_score(*scores)
+            percentages.append([round(calculate_percentage(score, tes), 2) for score in scores])
+        legacy_shares = [
+            calculate_categorized_percentage(
+                [{"user": user, "percentage": row[index]} for user, row in enumerate(percentages)]
+            )
+            for index in range(len(weights))
+        ]
+        legacy_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        fixed = calculate_batch_scores(tally_matrix, build_weight_matrix(*weights))
+        fixed_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        calculate_batch_scores(
+            tally_matrix, build_weight_matrix(*weights, fixed_point=False), fixed_point=False
+        )
+        float_elapsed = time.perf_counter() - started
+
+        if fixed["percentages"] != percentages:
+            raise CommandError("Fixed-point percentages differ from the per-user scoring")
+        for index, leaders in enumerate(legacy_shares):
+            for leader in leaders:
+                if "{:.2f}".format(fixed["shares"][leader["user"]][index]) != leader["percentage"]:
+                    raise CommandError("Fixed-point shares differ from the per-user scoring")
+
+        self.stdout.write(f"per-user scoring:    {legacy_elapsed:.3f}s")
+        self.stdout.write(
+            f"batch (fixed-point): {fixed_elapsed:.3f}s ({legacy_elapsed / fixed_elapsed:.1f}x)"
+        )
+        self.stdout.write(
+            f"batch (float):       {float_elapsed:.3f}s ({legacy_elapsed / float_elapsed:.1f}x)"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Scored {options['users']} users, fixed-point results match")
+        )
@@ -0,0 +1,54 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from leader import partitions
+
+
+def parse_month(value):
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise CommandError(f"Expected a YYYY-MM month, got {value!r}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly partitions of the SECI activity event log ahead of time "
+        "and detach old ones, meant to run from cron at least once a month"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Months after the current one to create partitions for",
+        )
+        parser.add_argument(
+            "--detach-before",
+            type=parse_month,
+            help="Detach the partitions of the months before this YYYY-MM month",
+        )
+        parser.add_argument(
+            "--drop", action="store_true", help="Drop the detached partitions as well"
+        )
+
+    def handle(self, *args, **options):
+        if not partitions.is_partitioned():
+            self.stdout.write("The activity event log is not partitioned on this database")
+            return
+
+        this_month = partitions.get_month(timezone.now())
+        created = partitions.create_partitions(
+            this_month, partitions.add_months(this_month, options["months_ahead"])
+        )
+        detached = []
+        if options["detach_before"]:
+            detached = partitions.detach_partitions(options["detach_before"], options["drop"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(created)} and {'dropped' if options['drop'] else 'detached'} "
+                f"{len(detached)} activity event partitions"
+            )
+        )
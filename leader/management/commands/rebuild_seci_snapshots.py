@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from leader.snapshots import build_snapshots
+
+
+class Command(BaseCommand):
+    help = "Rebuild the monthly SECI score snapshots from the daily activity tallies"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization", type=int, help="Only rebuild the snapshots of this organization pk"
+        )
+
+    def handle(self, *args, **options):
+        organization = options["organization"]
+        deleted, created = build_snapshots({"organization": organization} if organization else {})
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Replaced {deleted} SECI snapshots with {created} rebuilt ones")
+        )
@@ -0,0 +1,119 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+TABLE = "leader_activityevent"
+
+
+def create_activity_event_table(apps, schema_editor):
+    """A table partitioned by month of created_at on PostgreSQL, a plain one elsewhere"""
+
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.create_model(apps.get_model("leader", "ActivityEvent"))
+        return
+
+    # The partition key has to be part of the primary key of a partitioned table
+    schema_editor.execute(
+        f"""
+        CREATE TABLE {TABLE} (
+            id bigint GENERATED BY DEFAULT AS IDENTITY,
+            organization_id bigint NULL,
+            group_id bigint NULL,
+            user_id bigint NULL,
+            activity_key varchar(50) NOT NULL,
+            change integer NOT NULL,
+            created_at timestamp with time zone NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    schema_editor.execute(
+        f"""
+        CREATE INDEX event_org_group_created_idx ON {TABLE} (organization_id, group_id, created_at)
+        """
+    )
+    schema_editor.execute(f"CREATE INDEX event_user_created_idx ON {TABLE} (user_id, created_at)")
+    # Holds events of months without a partition until manage_activity_partitions moves them
+    schema_editor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+
+def drop_activity_event_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model("leader", "ActivityEvent"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("group", "0003_usergroup_unique_user_per_group"),
+        ("leader", "0005_viewevent"),
+        ("organization", "0002_alter_organization_organization_id_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="ActivityEvent",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        ("activity_key", models.CharField(max_length=50)),
+                        ("change", models.IntegerField(default=1)),
+                        ("created_at", models.DateTimeField()),
+                        (
+                            "group",
+                            models.ForeignKey(
+                                db_constraint=False,
+                                null=True,
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="group_activity_events",
+                                to="group.group",
+                            ),
+                        ),
+                        (
+                            "organization",
+                            models.ForeignKey(
+                                db_constraint=False,
+                                null=True,
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="organization_activity_events",
+                                to="organization.organization",
+                            ),
+                        ),
+                        (
+                            "user",
+                            models.ForeignKey(
+                                db_constraint=False,
+                                null=True,
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="user_activity_events",
+                                to=settings.AUTH_USER_MODEL,
+                            ),
+                        ),
+                    ],
+                    options={
+                        "indexes": [
+                            models.Index(
+                                fields=["organization", "group", "created_at"],
+                                name="event_org_group_created_idx",
+                            ),
+                            models.Index(
+                                fields=["user", "created_at"], name="event_user_created_idx"
+                            ),
+                        ],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_activity_event_table, drop_activity_event_table),
+    ]
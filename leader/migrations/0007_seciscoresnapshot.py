@@ -0,0 +1,123 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("group", "0003_usergroup_unique_user_per_group"),
+        ("leader", "0006_activityevent"),
+        ("organization", "0002_alter_organization_organization_id_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeciScoreSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("period", models.DateField()),
+                (
+                    "socialization",
+                    models.DecimalField(decimal_places=5, default=0, max_digits=20),
+                ),
+                (
+                    "externalization",
+                    models.DecimalField(decimal_places=5, default=0, max_digits=20),
+                ),
+                (
+                    "combination",
+                    models.DecimalField(decimal_places=5, default=0, max_digits=20),
+                ),
+                (
+                    "internalization",
+                    models.DecimalField(decimal_places=5, default=0, max_digits=20),
+                ),
+                (
+                    "total",
+                    models.DecimalField(decimal_places=5, default=0, max_digits=20),
+                ),
+                (
+                    "socialization_percentage",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=5),
+                ),
+                (
+                    "externalization_percentage",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=5),
+                ),
+                (
+                    "combination_percentage",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=5),
+                ),
+                (
+                    "internalization_percentage",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=5),
+                ),
+                (
+                    "weights_fingerprint",
+                    models.CharField(blank=True, default="", max_length=40),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="group_snapshots",
+                        to="group.group",
+                    ),
+                ),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="organization_snapshots",
+                        to="organization.organization",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="user_snapshots",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["group", "period", "-socialization_percentage"],
+                        name="snapshot_soc_rank_idx",
+                    ),
+                    models.Index(
+                        fields=["group", "period", "-externalization_percentage"],
+                        name="snapshot_ext_rank_idx",
+                    ),
+                    models.Index(
+                        fields=["group", "period", "-combination_percentage"],
+                        name="snapshot_comb_rank_idx",
+                    ),
+                    models.Index(
+                        fields=["group", "period", "-internalization_percentage"],
+                        name="snapshot_int_rank_idx",
+                    ),
+                    models.Index(
+                        fields=["user", "period"], name="snapshot_user_period_idx"
+                    ),
+                ],
+                "unique_together": {("group", "user", "period")},
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:14
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_tallies(apps, schema_editor):
+    """Fold tally rows written twice by concurrent first writes into one"""
+
+    DailyActivityTally = apps.get_model("leader", "DailyActivityTally")
+    key = ["organization", "group", "user", "day", "activity_key"]
+    duplicates = (
+        DailyActivityTally.objects.order_by()
+        .values(*key)
+        .annotate(rows=Count("pk"), keep=Min("pk"), total=Sum("count"))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates:
+        # filter(group=None) matches NULL
+        rows = DailyActivityTally.objects.filter(**{field: duplicate[field] for field in key})
+        rows.exclude(pk=duplicate["keep"]).delete()
+        rows.filter(pk=duplicate["keep"]).update(count=duplicate["total"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("group", "0003_usergroup_unique_user_per_group"),
+        ("leader", "0007_seciscoresnapshot"),
+        ("organization", "0002_alter_organization_organization_id_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tallies, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="dailyactivitytally",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.comparison.Coalesce(
+                    "organization", models.Value(0)
+                ),
+                django.db.models.functions.comparison.Coalesce(
+                    "group", models.Value(0)
+                ),
+                django.db.models.functions.comparison.Coalesce("user", models.Value(0)),
+                models.F("day"),
+                models.F("activity_key"),
+                name="tally_unique_key",
+            ),
+        ),
+    ]
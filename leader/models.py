@@ -1,7 +1,10 @@
 from django.db import models
 from group.models import Group
 from organization.models import Organization
+from accounts.models import User
 from django.core.validators import MinValueValidator
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from simpleblog.utils import (
     calculate_percentage,
     calculate_category_score,
@@ -180,3 +183,173 @@ class Internalization(models.Model):
     def calculate_internalization_percentage(self, iec, tes):
         score = iec
         return calculate_percentage(score, tes)
+
+
+class DailyActivityTally(models.Model):
+    """Number of times a user performed a SECI activity on a day within a group"""
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="organization_activity_tallies",
+    )
+    group = models.ForeignKey(
+        Group, on_delete=models.CASCADE, null=True, related_name="group_activity_tallies"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, related_name="user_activity_tallies"
+    )
+    day = models.DateField()
+    activity_key = models.CharField(max_length=50)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', 'group', 'day'], name='tally_org_group_day_idx'),
+            models.Index(fields=['user', 'day'], name='tally_user_day_idx'),
+        ]
+        constraints = [
+            # NULL never equals NULL in a unique index, so the nullable keys are coalesced
+            models.UniqueConstraint(
+                Coalesce("organization", models.Value(0)),
+                Coalesce("group", models.Value(0)),
+                Coalesce("user", models.Value(0)),
+                "day",
+                "activity_key",
+                name="tally_unique_key",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} {self.activity_key} on {self.day}: {self.count}"
+
+
+VIEW_EVENT_KINDS = (
+    ("READ_BLOG", "READ_BLOG"),
+    ("READ_FORUM", "READ_FORUM"),
+    ("DOWNLOAD_RESOURCE", "DOWNLOAD_RESOURCE"),
+)
+
+
+class ViewEvent(models.Model):
+    """A blog or forum read or a resource download, appended in batches and never updated"""
+
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, null=True, related_name="organization_view_events"
+    )
+    group = models.ForeignKey(
+        Group, on_delete=models.CASCADE, null=True, related_name="group_view_events"
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="user_view_events")
+    kind = models.CharField(max_length=20, choices=VIEW_EVENT_KINDS)
+    object_id = models.PositiveBigIntegerField()
+    # Set when the event happened rather than when its batch was written
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', 'created_at'], name='view_event_org_created_idx'),
+            models.Index(fields=['user', 'created_at'], name='view_event_user_created_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} {self.kind} {self.object_id} at {self.created_at}"
+
+
+class ActivityEvent(models.Model):
+    """One change to the SECI activity count of a user, the log every scoring path can read
+
+    Rows are only ever appended, a deleted or changed activity appends a -1 change at the
+    time of the activity it undoes. On PostgreSQL the table is partitioned by month of
+    created_at, see leader.partitions, so the references are kept without constraints
+    for partitions to be attached and detached without checks.
+    """
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        null=True,
+        db_constraint=False,
+        related_name="organization_activity_events",
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        null=True,
+        db_constraint=False,
+        related_name="group_activity_events",
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        db_constraint=False,
+        related_name="user_activity_events",
+    )
+    activity_key = models.CharField(max_length=50)
+    change = models.IntegerField(default=1)
+    # When the activity happened, the partition key
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['organization', 'group', 'created_at'], name='event_org_group_created_idx'
+            ),
+            models.Index(fields=['user', 'created_at'], name='event_user_created_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} {self.activity_key} {self.change:+} at {self.created_at}"
+
+
+class SeciScoreSnapshot(models.Model):
+    """Running SECI scores of a user within a group for one calendar month
+
+    Kept up to date as activities are recorded, weights_fingerprint names the weights the
+    scores were computed with so a weight change is caught and rescored when next read.
+    """
+
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, null=True, related_name="organization_snapshots"
+    )
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name="group_snapshots")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="user_snapshots")
+    # First day of the month
+    period = models.DateField()
+    socialization = models.DecimalField(default=0, decimal_places=5, max_digits=20)
+    externalization = models.DecimalField(default=0, decimal_places=5, max_digits=20)
+    combination = models.DecimalField(default=0, decimal_places=5, max_digits=20)
+    internalization = models.DecimalField(default=0, decimal_places=5, max_digits=20)
+    total = models.DecimalField(default=0, decimal_places=5, max_digits=20)
+    socialization_percentage = models.DecimalField(default=0, decimal_places=2, max_digits=5)
+    externalization_percentage = models.DecimalField(default=0, decimal_places=2, max_digits=5)
+    combination_percentage = models.DecimalField(default=0, decimal_places=2, max_digits=5)
+    internalization_percentage = models.DecimalField(default=0, decimal_places=2, max_digits=5)
+    weights_fingerprint = models.CharField(max_length=40, blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['group', 'user', 'period']
+        indexes = [
+            models.Index(
+                fields=['group', 'period', '-socialization_percentage'],
+                name='snapshot_soc_rank_idx',
+            ),
+            models.Index(
+                fields=['group', 'period', '-externalization_percentage'],
+                name='snapshot_ext_rank_idx',
+            ),
+            models.Index(
+                fields=['group', 'period', '-combination_percentage'], name='snapshot_comb_rank_idx'
+            ),
+            models.Index(
+                fields=['group', 'period', '-internalization_percentage'],
+                name='snapshot_int_rank_idx',
+            ),
+            models.Index(fields=['user', 'period'], name='snapshot_user_period_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"SECI of {self.user_id} in group {self.group_id} for {self.period:%Y-%m}"
@@ -0,0 +1,111 @@
+import re
+from datetime import date
+from django.db import connection, transaction
+from .models import ActivityEvent
+
+TABLE = ActivityEvent._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_NAME = re.compile(rf"{TABLE}_(\d{{4}})_(\d{{2}})")
+
+
+def get_month(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_partition_name(month):
+    return f"{TABLE}_{month:%Y_%m}"
+
+
+def get_bound(month):
+    # Months are cut in UTC, the dates are generated here so they are safe to inline
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def is_partitioned():
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def get_partition_months():
+    """Months with their own partition, oldest first"""
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s)
+            """,
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return sorted(
+        date(int(match[1]), int(match[2]), 1)
+        for match in map(PARTITION_NAME.fullmatch, names)
+        if match
+    )
+
+
+def create_partition(month):
+    """Give a month its own partition, moving its events out of the default partition"""
+
+    name = get_partition_name(month)
+    start, end = get_bound(month), get_bound(add_months(month, 1))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)")
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION}
+                WHERE created_at >= {start} AND created_at < {end}
+                RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+            """
+        )
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM ({start}) TO ({end})"
+        )
+    return name
+
+
+def create_partitions(first_month, last_month):
+    """Create the missing partitions of the months from first_month to last_month"""
+
+    existing = set(get_partition_months())
+    created = []
+    month = get_month(first_month)
+    while month <= last_month:
+        if month not in existing:
+            created.append(create_partition(month))
+        month = add_months(month, 1)
+    return created
+
+
+def detach_partitions(before, drop=False):
+    """Detach, and drop if asked, the partitions of the months before a month
+
+    Events of detached months no longer count towards scores, whole days of them are still
+    counted from the daily tallies when SECI_ACTIVITY_ROLLUPS is enabled.
+    """
+    detached = []
+    with connection.cursor() as cursor:
+        for month in get_partition_months():
+            if month >= before:
+                break
+            name = get_partition_name(month)
+            cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {name}")
+            if drop:
+                cursor.execute(f"DROP TABLE {name}")
+            detached.append(name)
+    return detached
@@ -0,0 +1,94 @@
+from collections import Counter
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .activity_log import log_activity_changes
+from .models import DailyActivityTally
+from .scoring import ACTIVITY_SOURCES
+from .snapshots import update_score_snapshots
+
+
+def get_activity_day(created_at):
+    if timezone.is_aware(created_at):
+        created_at = timezone.localtime(created_at)
+    return created_at.date()
+
+
+def get_activity_keys(instance):
+    """(organization, group, user, created_at, activity key) activities an activity row counts as"""
+
+    if instance.created_at is None:
+        return []
+
+    keys = []
+    for model, actor, activities in ACTIVITY_SOURCES:
+        if not isinstance(instance, model):
+            continue
+        for activity_key, lookups in activities.items():
+            if all(getattr(instance, field) == value for field, value in lookups.items()):
+                keys.append(
+                    (
+                        instance.organization_id,
+                        instance.group_id,
+                        getattr(instance, f"{actor}_id"),
+                        instance.created_at,
+                        activity_key,
+                    )
+                )
+    return keys
+
+
+def apply_tally_changes(changes):
+    """Add a Counter of tally key -> change to the daily rollup table
+
+    A row is created on the first change of its key, a concurrent first write losing the
+    race on tally_unique_key adds its change to the row the other one created.
+    """
+    for (organization, group, user, day, activity_key), change in changes.items():
+        if not change:
+            continue
+        key = {
+            "organization_id": organization,
+            "group_id": group,
+            "user_id": user,
+            "day": day,
+            "activity_key": activity_key,
+        }
+        if DailyActivityTally.objects.filter(**key).update(count=F("count") + change):
+            continue
+        try:
+            with transaction.atomic():
+                DailyActivityTally.objects.create(count=change, **key)
+        except IntegrityError:
+            DailyActivityTally.objects.filter(**key).update(count=F("count") + change)
+
+
+def apply_activity_changes(changes):
+    """Append a Counter of activity key -> change to the activity log, the daily tallies and
+    the SECI score snapshots
+
+    Each is only written while its setting is enabled, the snapshots are scored from the
+    daily tallies so those are kept for either SECI_ACTIVITY_ROLLUPS or SECI_SCORE_SNAPSHOTS.
+    """
+    if settings.SECI_ACTIVITY_LOG:
+        log_activity_changes(changes)
+    if not (settings.SECI_ACTIVITY_ROLLUPS or settings.SECI_SCORE_SNAPSHOTS):
+        return
+    tally_changes = Counter()
+    for (organization, group, user, created_at, activity_key), change in changes.items():
+        tally_changes[
+            (organization, group, user, get_activity_day(created_at), activity_key)
+        ] += change
+    apply_tally_changes(tally_changes)
+    update_score_snapshots(tally_changes)
+
+
+def record_activities(instances, change=1):
+    """Count activity rows written without save(), e.g. through bulk_create"""
+
+    changes = Counter()
+    for instance in instances:
+        for key in get_activity_keys(instance):
+            changes[key] += change
+    apply_activity_changes(changes)
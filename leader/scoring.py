@@ -0,0 +1,275 @@
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from accounts.models import User
+from blog.models import Blog, Comment
+from browser_history.models import BrowserHistory
+from forum.models import Forum
+from group.models import UserGroup
+from in_app_chat.models import InAppChat
+from resource.models import Resources
+from topics.models import Topic
+from simpleblog.utils import (
+    SECI_ACTIVITY_KEYS,
+    calculate_batch_scores,
+    calculate_category_score,
+    calculate_percentage,
+    calculate_total_engagement_score,
+)
+from .models import ActivityEvent, DailyActivityTally, ViewEvent
+from .weights import get_organization_weight_profiles, get_weight_profile
+
+
+ACTIVITY_KEYS = SECI_ACTIVITY_KEYS
+
+# (model, actor field, {activity key: field lookups}) for every table a tally is counted from
+ACTIVITY_SOURCES = (
+    (Blog, "author", {"post_blog": {}}),
+    (InAppChat, "sender", {"send_chat_message": {}}),
+    (InAppChat, "receiver", {"recieve_chat_message": {}}),
+    (Forum, "user", {"post_forum": {}}),
+    (
+        Resources,
+        "sender",
+        {
+            "image_sharing": {"type": "IMAGE"},
+            "video_sharing": {"type": "VIDEO"},
+            "text_resource_sharing": {"type": "DOCUMENT"},
+        },
+    ),
+    (Topic, "author", {"created_topic": {}}),
+    (Comment, "user", {"comment": {}}),
+    (BrowserHistory, "user", {"used_in_app_browser": {}}),
+    (
+        ViewEvent,
+        "user",
+        {
+            "read_blog": {"kind": "READ_BLOG"},
+            "read_forum": {"kind": "READ_FORUM"},
+            "download_resources": {"kind": "DOWNLOAD_RESOURCE"},
+        },
+    ),
+)
+
+# Order of the rows in a weight matrix and of the scores calculate_batch_scores returns
+DIMENSIONS = ["socialization", "externalization", "combination", "internalization"]
+
+
+def empty_tallies():
+    return dict.fromkeys(ACTIVITY_KEYS, 0)
+
+
+def get_seci_details(sec, eec, cec, iec):
+    """The seci_details of a response from the four dimension scores"""
+
+    tes = calculate_total_engagement_score(sec, eec, cec, iec)
+    return {
+        "socialization_engagement_score": sec,
+        "externalization_engagement_score": eec,
+        "combination_engagement_score": cec,
+        "internalization_engagement_score": iec,
+        "total_engagement_score": tes,
+        "socialization_engagement_percentage": round(calculate_percentage(sec, tes), 2),
+        "externalization_engagement_percentage": round(calculate_percentage(eec, tes), 2),
+        "combination_engagement_percentage": round(calculate_percentage(cec, tes), 2),
+        "internalization_engagement_percentage": round(calculate_percentage(iec, tes), 2),
+    }
+
+
+def get_group_members(group):
+    """Members of a group in the order UserGroup lists them"""
+    return list(
+        User.objects.filter(user_groups__groups=group)
+        .order_by("-user_groups__created_at")
+        .only("id", "first_name", "last_name")
+    )
+
+
+def split_date_range(date_range):
+    """Split a datetime range into whole days and the partial days at its edges
+
+    Returns a Q matching the partial edges on created_at and the (first, last exclusive)
+    whole days, or None when the range covers no whole day.
+    """
+    start, end = date_range
+    first_day = start.date() if start.time() == time.min else start.date() + timedelta(days=1)
+    last_day = (end + timedelta(microseconds=1)).date()
+
+    if first_day >= last_day:
+        return Q(created_at__range=date_range), None
+
+    first_midnight = datetime.combine(first_day, time.min, tzinfo=start.tzinfo)
+    last_midnight = datetime.combine(last_day, time.min, tzinfo=end.tzinfo)
+    edges = Q(created_at__gte=start, created_at__lt=first_midnight) | Q(
+        created_at__gte=last_midnight, created_at__lte=end
+    )
+    return edges, (first_day, last_day)
+
+
+def scope_filters(actor, organization=None, group=None, users=None):
+    filters = {}
+    if organization is not None:
+        filters["organization"] = organization
+    if group is not None:
+        filters["group"] = group
+    if users is not None:
+        filters[f"{actor}__in"] = users
+    return filters
+
+
+def count_raw_activities(tallies, period, by, **scope):
+    for model, actor, activities in ACTIVITY_SOURCES:
+        queryset = model.objects.filter(period, **scope_filters(actor, **scope)).order_by()
+        annotations = {
+            key: Count("pk", filter=Q(**lookups) if lookups else None)
+            for key, lookups in activities.items()
+        }
+
+        field = actor if by == "user" else by
+        if field:
+            rows = queryset.values(field).annotate(**annotations)
+        else:
+            rows = [queryset.aggregate(**annotations)]
+
+        for row in rows:
+            keyed_tallies = tallies.setdefault(row.get(field), empty_tallies())
+            for key in activities:
+                keyed_tallies[key] += row[key]
+
+
+def add_keyed_counts(tallies, rows, by):
+    """Add rows of activity_key, total and, when counted by user or group, that field to
+    the tallies"""
+
+    for row in rows:
+        if row["activity_key"] in ACTIVITY_KEYS:
+            keyed_tallies = tallies.setdefault(row.get(by), empty_tallies())
+            keyed_tallies[row["activity_key"]] += row["total"]
+
+
+def count_logged_activities(tallies, period, by, **scope):
+    queryset = ActivityEvent.objects.filter(period, **scope_filters("user", **scope))
+    group_by = [by, "activity_key"] if by else ["activity_key"]
+    add_keyed_counts(
+        tallies, queryset.order_by().values(*group_by).annotate(total=Sum("change")), by
+    )
+
+
+def count_rolled_up_activities(tallies, days, by, organization=None, group=None, users=None):
+    queryset = DailyActivityTally.objects.filter(day__gte=days[0], day__lt=days[1])
+    if organization is not None:
+        queryset = queryset.filter(organization=organization)
+    if group is not None:
+        queryset = queryset.filter(group=group)
+    if users is not None:
+        queryset = queryset.filter(user__in=users)
+
+    group_by = [by, "activity_key"] if by else ["activity_key"]
+    add_keyed_counts(
+        tallies, queryset.order_by().values(*group_by).annotate(total=Sum("count")), by
+    )
+
+
+def collect_tallies(date_range, by, **scope):
+    """Count activities within a date range, keyed by actor when by is "user", by group
+    when it is "group", or under None for totals
+
+    Whole days are read from the daily rollup table when SECI_ACTIVITY_ROLLUPS is enabled,
+    only the partial days at the edges of the range are counted from the activity tables,
+    or from the activity event log alone when SECI_ACTIVITY_LOG is enabled.
+    """
+    tallies = {}
+    if settings.SECI_ACTIVITY_ROLLUPS:
+        edges, days = split_date_range(date_range)
+    else:
+        edges, days = Q(created_at__range=date_range), None
+
+    if settings.SECI_ACTIVITY_LOG:
+        count_logged_activities(tallies, edges, by, **scope)
+    else:
+        count_raw_activities(tallies, edges, by, **scope)
+    if days is not None:
+        count_rolled_up_activities(tallies, days, by, **scope)
+    return tallies
+
+
+def count_activities_by_user(date_range, **scope):
+    """Tallies per actor within a date range"""
+    return collect_tallies(date_range, "user", **scope)
+
+
+def count_activities_by_group(date_range, **scope):
+    """Tallies per group within a date range, activity outside any group under None"""
+    return collect_tallies(date_range, "group", **scope)
+
+
+def count_activities(date_range, **scope):
+    """Tallies summed over every actor within a date range"""
+    return collect_tallies(date_range, None, **scope).get(None) or empty_tallies()
+
+
+def get_group_member_tallies(organization, group, date_range):
+    """Tallies for every member of a group, one grouped count per activity table"""
+
+    members = UserGroup.objects.filter(groups=group).values("user")
+    return count_activities_by_user(date_range, organization=organization, group=group, users=members)
+
+
+def get_group_weights(organization, organization_id, group):
+    """The cached weight profile of a group, raising when a dimension is missing"""
+
+    weights = get_weight_profile(organization, group)
+    if weights.missing:
+        raise ValidationError(
+            detail=f"Group- {group.title} belonging to organization- {organization_id} have no {weights.missing.capitalize()} activity score ",
+            code=status.HTTP_400_BAD_REQUEST,
+        )
+    return weights
+
+
+def get_group_activity_scores(organization, organization_id, group, date_range):
+    """SECI scores and percentages of every group member, scored in one batch"""
+
+    weights = get_group_weights(organization, organization_id, group)
+    members = get_group_members(group)
+    tallies = get_group_member_tallies(organization, group, date_range)
+
+    tally_matrix = [
+        [tallies.get(member.pk, {}).get(key, 0) for key in ACTIVITY_KEYS] for member in members
+    ]
+
+    return {
+        "weights": weights,
+        "members": members,
+        **calculate_batch_scores(tally_matrix, weights.matrix, with_shares=False),
+    }
+
+
+def get_organization_seci_details(organization, groups, date_range):
+    """seci_details of every group of an organization and of the organization as a whole
+
+    Activity is counted with one query per table grouped by group and the weights of every
+    group are loaded together. Returns ({group pk: seci_details or None}, {group pk:
+    missing dimension}, organization seci_details); a group without a complete weight
+    profile gets None and is left out of the organization totals.
+    """
+    tallies = count_activities_by_group(date_range, organization=organization)
+    profiles = get_organization_weight_profiles(organization, groups)
+
+    details, missing = {}, {}
+    totals = [0] * len(DIMENSIONS)
+    for group in groups:
+        weights = profiles[group.pk]
+        if weights.missing:
+            details[group.pk], missing[group.pk] = None, weights.missing
+            continue
+        group_tallies = tallies.get(group.pk) or empty_tallies()
+        scores = [
+            calculate_category_score(getattr(weights, dimension), group_tallies)
+            for dimension in DIMENSIONS
+        ]
+        details[group.pk] = get_seci_details(*scores)
+        totals = [total + score for total, score in zip(totals, scores)]
+    return details, missing, get_seci_details(*totals)
@@ -0,0 +1,62 @@
+from collections import Counter
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal
+from simpleblog.saved_rows import get_saved_row, track_saved_rows
+from .events import flush_due_view_events
+from .rollups import apply_activity_changes, get_activity_keys
+from .scoring import ACTIVITY_SOURCES
+from .weights import WEIGHT_MODELS, invalidate_weight_profiles
+
+# Sent with an organization after its weight rows were changed by a queryset update
+weights_updated = Signal()
+
+
+def remember_previous_activity_keys(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    previous = get_saved_row(sender, instance)
+    instance._previous_activity_keys = get_activity_keys(previous) if previous else []
+
+
+def update_tallies_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    changes = Counter(get_activity_keys(instance))
+    if not created:
+        changes.subtract(getattr(instance, "_previous_activity_keys", []))
+    apply_activity_changes(changes)
+
+
+def update_tallies_on_delete(sender, instance, **kwargs):
+    changes = Counter()
+    changes.subtract(get_activity_keys(instance))
+    apply_activity_changes(changes)
+
+
+for model in {source[0] for source in ACTIVITY_SOURCES}:
+    track_saved_rows(model)
+    pre_save.connect(remember_previous_activity_keys, sender=model)
+    post_save.connect(update_tallies_on_save, sender=model)
+    post_delete.connect(update_tallies_on_delete, sender=model)
+
+
+# Invalidated once the change is committed, a process reloading the weights before that
+# would cache the old rows under the new generation
+def invalidate_group_weights(sender, instance, raw=False, **kwargs):
+    organization, group = instance.organization_id, instance.group_id
+    transaction.on_commit(lambda: invalidate_weight_profiles(organization, group))
+
+
+def invalidate_organization_weights(sender, organization, **kwargs):
+    transaction.on_commit(lambda: invalidate_weight_profiles(organization))
+
+
+for model in WEIGHT_MODELS.values():
+    post_save.connect(invalidate_group_weights, sender=model)
+    post_delete.connect(invalidate_group_weights, sender=model)
+
+weights_updated.connect(invalidate_organization_weights)
+
+request_finished.connect(flush_due_view_events)
@@ -0,0 +1,261 @@
+from collections import Counter, defaultdict
+from decimal import Decimal
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from accounts.models import User
+from simpleblog.utils import calculate_category_score, calculate_percentage, divide_half_even
+from .models import DailyActivityTally, SeciScoreSnapshot
+from .partitions import add_months
+from .scoring import ACTIVITY_KEYS, DIMENSIONS, empty_tallies
+from .weights import get_weight_profile
+
+PERCENTAGE_FIELDS = [f"{dimension}_percentage" for dimension in DIMENSIONS]
+SCORE_FIELDS = [*DIMENSIONS, "total", *PERCENTAGE_FIELDS, "weights_fingerprint"]
+
+
+def get_period(day):
+    return day.replace(day=1)
+
+
+def get_period_range(period):
+    """The datetime range covering a month, end inclusive like the start_date/end_date params"""
+    start = timezone.make_aware(datetime.combine(period, time.min))
+    end = timezone.make_aware(datetime.combine(add_months(period, 1), time.min))
+    return start, end - timedelta(microseconds=1)
+
+
+def parse_period(value):
+    """The month of a period query param read from the snapshots, YYYY-MM or current"""
+
+    if not settings.SECI_SCORE_SNAPSHOTS:
+        raise ValidationError(
+            detail="period is not available, SECI score snapshots are disabled",
+            code=status.HTTP_400_BAD_REQUEST,
+        )
+    return parse_month(value)
+
+
+def parse_month(value):
+    """The month of a YYYY-MM or current query param"""
+
+    if value == "current":
+        return get_period(timezone.localdate())
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise ValidationError(
+            detail="period must be a YYYY-MM month or current", code=status.HTTP_400_BAD_REQUEST
+        )
+
+
+def set_percentages(snapshot):
+    snapshot.total = sum(getattr(snapshot, dimension) for dimension in DIMENSIONS)
+    for dimension in DIMENSIONS:
+        percentage = calculate_percentage(getattr(snapshot, dimension), snapshot.total)
+        setattr(snapshot, f"{dimension}_percentage", round(percentage, 2))
+
+
+def score_snapshot(snapshot, tallies, weights):
+    """Score a snapshot from scratch from the activity tallies of its month"""
+
+    for dimension in DIMENSIONS:
+        setattr(snapshot, dimension, calculate_category_score(getattr(weights, dimension), tallies))
+    set_percentages(snapshot)
+    snapshot.weights_fingerprint = weights.fingerprint
+
+
+def add_to_snapshot(snapshot, changes, weights):
+    """Add a Counter of activity key -> change to the scores of a snapshot"""
+
+    for dimension in DIMENSIONS:
+        dimension_weights = getattr(weights, dimension)
+        setattr(
+            snapshot,
+            dimension,
+            getattr(snapshot, dimension)
+            + sum(dimension_weights.get(key, 0) * change for key, change in changes.items()),
+        )
+    set_percentages(snapshot)
+
+
+def update_score_snapshots(tally_changes):
+    """Add a Counter of (organization, group, user, day, activity key) -> change to the
+    running scores of the months they fall in, while SECI_SCORE_SNAPSHOTS is enabled
+
+    The snapshots of a batch are created, locked and saved together, in key order so that
+    concurrent batches wait for each other rather than deadlock. A snapshot scored with other
+    weights than the current ones, or without weights, is left for rescore_snapshots to
+    recompute when it is next read.
+    """
+    if not settings.SECI_SCORE_SNAPSHOTS:
+        return
+
+    by_snapshot = defaultdict(Counter)
+    organizations = {}
+    for (organization, group, user, day, activity_key), change in tally_changes.items():
+        if change and group is not None and user is not None:
+            key = (group, user, get_period(day))
+            by_snapshot[key][activity_key] += change
+            organizations[key] = organization
+    if not by_snapshot:
+        return
+
+    keys = sorted(by_snapshot)
+    weights = {key: get_weight_profile(organizations[key], key[0]) for key in keys}
+    matches = Q()
+    for group, user, period in keys:
+        matches |= Q(group_id=group, user_id=user, period=period)
+
+    with transaction.atomic():
+        # A new snapshot starts from zero scored with the current weights
+        SeciScoreSnapshot.objects.bulk_create(
+            [
+                SeciScoreSnapshot(
+                    organization_id=organizations[key],
+                    group_id=key[0],
+                    user_id=key[1],
+                    period=key[2],
+                    weights_fingerprint=weights[key].fingerprint,
+                )
+                for key in keys
+            ],
+            ignore_conflicts=True,
+        )
+        snapshots = list(
+            SeciScoreSnapshot.objects.select_for_update()
+            .filter(matches)
+            .order_by("group", "user", "period")
+        )
+        now = timezone.now()
+        for snapshot in snapshots:
+            key = (snapshot.group_id, snapshot.user_id, snapshot.period)
+            key_weights = weights[key]
+            if key_weights.missing or snapshot.weights_fingerprint != key_weights.fingerprint:
+                snapshot.weights_fingerprint = ""
+            else:
+                add_to_snapshot(snapshot, by_snapshot[key], key_weights)
+            snapshot.updated_at = now
+        SeciScoreSnapshot.objects.bulk_update(snapshots, [*SCORE_FIELDS, "updated_at"])
+
+
+def rescore_snapshots(snapshots, weights):
+    """Recompute snapshots of one group and month from the daily tallies, in one query"""
+
+    if not snapshots:
+        return
+    group, period = snapshots[0].group_id, snapshots[0].period
+    rows = (
+        DailyActivityTally.objects.filter(
+            group=group,
+            day__gte=period,
+            day__lt=add_months(period, 1),
+            user__in=[snapshot.user_id for snapshot in snapshots],
+        )
+        .order_by()
+        .values("user", "activity_key")
+        .annotate(total=Sum("count"))
+    )
+    tallies = defaultdict(empty_tallies)
+    for row in rows:
+        if row["activity_key"] in ACTIVITY_KEYS:
+            tallies[row["user"]][row["activity_key"]] += row["total"]
+
+    for snapshot in snapshots:
+        score_snapshot(snapshot, tallies[snapshot.user_id], weights)
+    SeciScoreSnapshot.objects.bulk_update(snapshots, SCORE_FIELDS)
+
+
+def refresh_group_snapshots(group, period, weights):
+    """Rescore the snapshots of a group and month scored with other weights"""
+
+    stale = list(
+        SeciScoreSnapshot.objects.filter(group=group, period=period).exclude(
+            weights_fingerprint=weights.fingerprint
+        )
+    )
+    rescore_snapshots(stale, weights)
+
+
+def get_snapshot_leaders(group, period, weights, dimension, top, offset=0):
+    """Ranks offset to offset + top of the members of a group by their share of the
+    summed dimension percentages of a month, as (user, share) pairs
+
+    Ranked straight from the snapshot index, members without a share follow in the
+    order UserGroup lists them.
+    """
+    refresh_group_snapshots(group, period, weights)
+
+    field = f"{dimension}_percentage"
+    members = User.objects.filter(user_groups__groups=group)
+    ranked = SeciScoreSnapshot.objects.filter(
+        group=group, period=period, user__in=members.values("pk"), **{f"{field}__gt": 0}
+    )
+    total = ranked.aggregate(total=Sum(field))["total"] or 0
+    ranked_count = ranked.count()
+
+    leaders = [
+        (snapshot.user, getattr(snapshot, field))
+        for snapshot in ranked.select_related("user").order_by(f"-{field}", "user")[
+            offset:offset + top
+        ]
+    ]
+    if len(leaders) < top:
+        start = max(offset - ranked_count, 0)
+        unranked = (
+            members.exclude(pk__in=ranked.values("user"))
+            .order_by("-user_groups__created_at")
+            .only("id", "first_name", "last_name")
+        )
+        leaders += [(user, 0) for user in unranked[start:start + top - len(leaders)]]
+
+    # Shares are rounded like select_top_shares rounds them
+    total_hundredths = int(total * 100)
+    return [
+        (
+            user,
+            Decimal(divide_half_even(int(percentage * 100) * 10000, total_hundredths)).scaleb(-2)
+            if total_hundredths
+            else 0,
+        )
+        for user, percentage in leaders
+    ]
+
+
+def build_snapshots(scope=None, batch_size=1000):
+    """Replace the snapshots within a scope with ones scored from the daily tallies
+
+    Returns (deleted, created).
+    """
+    scope = scope or {}
+    tallies = defaultdict(empty_tallies)
+    rows = (
+        DailyActivityTally.objects.filter(group__isnull=False, user__isnull=False, **scope)
+        .annotate(period=TruncMonth("day"))
+        .order_by()
+        .values("organization", "group", "user", "period", "activity_key")
+        .annotate(total=Sum("count"))
+    )
+    for row in rows.iterator(chunk_size=batch_size):
+        key = (row["organization"], row["group"], row["user"], row["period"])
+        if row["activity_key"] in ACTIVITY_KEYS:
+            tallies[key][row["activity_key"]] += row["total"]
+
+    with transaction.atomic():
+        deleted, _ = SeciScoreSnapshot.objects.filter(**scope).delete()
+        snapshots = []
+        for (organization, group, user, period), user_tallies in tallies.items():
+            snapshot = SeciScoreSnapshot(
+                organization_id=organization, group_id=group, user_id=user, period=period
+            )
+            weights = get_weight_profile(organization, group)
+            if not weights.missing:
+                score_snapshot(snapshot, user_tallies, weights)
+            snapshots.append(snapshot)
+        SeciScoreSnapshot.objects.bulk_create(snapshots, batch_size=batch_size)
+    return deleted, len(snapshots)
@@ -0,0 +1,84 @@
+from decimal import Decimal
+import factory
+from organization.models import Organization
+from group.models import Group, UserGroup
+from leader.models import Socialization, Externalization, Combination, Internalization
+
+
+class OrganizationFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Organization
+
+    name = factory.Sequence(lambda n: "ORG{}".format(n))
+    organization_id = factory.Sequence(lambda n: "ORG-{:011d}".format(n))
+
+
+class GroupFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Group
+
+    title = factory.Sequence(lambda n: "group {}".format(n))
+    content = "group content"
+
+
+class UserGroupFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = UserGroup
+
+    @factory.post_generation
+    def groups(self, create, extracted, **kwargs):
+        if create and extracted:
+            self.groups.set(extracted)
+
+
+class SocializationFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Socialization
+
+    post_blog = Decimal("0.50000")
+    send_chat_message = Decimal("0.01000")
+    post_forum = Decimal("0.25000")
+    image_sharing = Decimal("0.00200")
+    video_sharing = Decimal("0.00200")
+    text_resource_sharing = Decimal("0.00200")
+    created_topic = Decimal("0.02500")
+
+
+class ExternalizationFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Externalization
+
+    post_blog = Decimal("0.50000")
+    send_chat_message = Decimal("0.00100")
+    post_forum = Decimal("0.25000")
+    created_topic = Decimal("0.02500")
+    comment = Decimal("0.00200")
+
+
+class CombinationFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Combination
+
+    created_topic = Decimal("0.02500")
+    post_blog = Decimal("0.50000")
+
+
+class InternalizationFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Internalization
+
+    used_in_app_browser = Decimal("0.00100")
+    read_blog = Decimal("0.00100")
+    read_forum = Decimal("0.00100")
+    recieve_chat_message = Decimal("0.00100")
+    download_resources = Decimal("0.00100")
+
+
+def create_group_weights(organization, group):
+    """Create all four SECI weight rows for a group"""
+    return {
+        "socialization": SocializationFactory(organization=organization, group=group),
+        "externalization": ExternalizationFactory(organization=organization, group=group),
+        "combination": CombinationFactory(organization=organization, group=group),
+        "internalization": InternalizationFactory(organization=organization, group=group),
+    }
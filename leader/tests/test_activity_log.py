@@ -0,0 +1,166 @@
+from datetime import date, datetime, timedelta, timezone
+from importlib import import_module
+from io import StringIO
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from accounts.tests.factories import UserFactory
+from blog.models import Blog
+from in_app_chat.models import InAppChat
+from resource.models import Resources
+from leader.models import ActivityEvent
+from leader.partitions import (
+    DEFAULT_PARTITION,
+    add_months,
+    create_partition,
+    create_partitions,
+    detach_partitions,
+    get_partition_months,
+    get_partition_name,
+)
+from leader.scoring import count_activities, count_activities_by_user
+from .factories import OrganizationFactory, GroupFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def activity_scope():
+    organization = OrganizationFactory()
+    group = GroupFactory(organization_id=organization.organization_id)
+    users = UserFactory.create_batch(2, role_id=3, organization_id=organization.organization_id)
+    return organization, group, users
+
+
+def logged_changes(user):
+    return list(
+        ActivityEvent.objects.filter(user=user).order_by("pk").values_list("activity_key", "change")
+    )
+
+
+def log_events(*created_ats):
+    ActivityEvent.objects.bulk_create(
+        ActivityEvent(activity_key="post_blog", change=1, created_at=created_at)
+        for created_at in created_ats
+    )
+
+
+def select_created_ats(table):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT created_at FROM {table} ORDER BY created_at")
+        return [row[0] for row in cursor.fetchall()]
+
+
+@pytest.fixture
+def partitioned_log():
+    """The test database is built without migrations, partition the log like 0006 does"""
+    migration = import_module("leader.migrations.0006_activityevent")
+    with connection.schema_editor() as schema_editor:
+        schema_editor.delete_model(ActivityEvent)
+        migration.create_activity_event_table(apps, schema_editor)
+
+
+class TestActivityEventLog:
+    def test_nothing_is_logged_while_disabled(self, activity_scope, settings):
+        organization, group, (sender, _) = activity_scope
+        settings.SECI_ACTIVITY_LOG = False
+
+        Blog.objects.create(author=sender, organization=organization, group=group)
+
+        assert not ActivityEvent.objects.exists()
+
+    def test_writes_append_events(self, activity_scope, settings):
+        settings.SECI_ACTIVITY_LOG = True
+        organization, group, (sender, receiver) = activity_scope
+        scope = {"organization": organization, "group": group}
+
+        blog = Blog.objects.create(author=sender, **scope)
+        resource = Resources.objects.create(sender=sender, type="IMAGE", **scope)
+        resource.type = "VIDEO"
+        resource.save()
+        blog.delete()
+        InAppChat.objects.create(sender=sender, receiver=receiver, **scope)
+
+        assert logged_changes(sender) == [
+            ("post_blog", 1),
+            ("image_sharing", 1),
+            ("video_sharing", 1),
+            ("image_sharing", -1),
+            ("post_blog", -1),
+            ("send_chat_message", 1),
+        ]
+        assert logged_changes(receiver) == [("recieve_chat_message", 1)]
+        # A deletion is logged at the time of the activity it undoes
+        blog_events = ActivityEvent.objects.filter(activity_key="post_blog")
+        assert {event.created_at for event in blog_events} == {blog.created_at}
+
+    @pytest.mark.parametrize("rollups", [False, True])
+    def test_log_counts_match_raw_counts(self, activity_scope, settings, rollups):
+        organization, group, (sender, receiver) = activity_scope
+        start = datetime(2024, 3, 1, 6)
+
+        for hours in range(0, 24 * 4, 7):
+            chat = InAppChat.objects.create(
+                organization=organization, group=group, sender=sender, receiver=receiver
+            )
+            resource = Resources.objects.create(
+                organization=organization, group=group, sender=receiver, type="DOCUMENT"
+            )
+            created_at = start + timedelta(hours=hours)
+            InAppChat.objects.filter(pk=chat.pk).update(created_at=created_at)
+            Resources.objects.filter(pk=resource.pk).update(created_at=created_at)
+
+        # Rows moved with update() are only logged again by the backfill
+        call_command("backfill_activity_events", stdout=StringIO())
+        call_command("backfill_activity_tallies", stdout=StringIO())
+        settings.SECI_ACTIVITY_ROLLUPS = rollups
+
+        date_ranges = [
+            (datetime(2024, 3, 1), datetime(2024, 3, 8)),
+            (datetime(2024, 3, 1, 13, 30), datetime(2024, 3, 3, 21, 59, 59, 999000)),
+        ]
+        for date_range in date_ranges:
+            settings.SECI_ACTIVITY_LOG = False
+            raw_totals = count_activities(date_range, organization=organization, group=group)
+            raw_by_user = count_activities_by_user(date_range, users=[sender, receiver])
+
+            settings.SECI_ACTIVITY_LOG = True
+            assert count_activities(date_range, organization=organization, group=group) == raw_totals
+            assert count_activities_by_user(date_range, users=[sender, receiver]) == raw_by_user
+            assert raw_totals["text_resource_sharing"]
+
+    def test_partitions_are_monthly(self):
+        assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+        assert get_partition_name(date(2025, 2, 1)) == "leader_activityevent_2025_02"
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="Partitions need PostgreSQL")
+@pytest.mark.usefixtures("partitioned_log")
+class TestActivityEventPartitions:
+    march = datetime(2024, 3, 9, tzinfo=timezone.utc)
+    april = datetime(2024, 4, 2, tzinfo=timezone.utc)
+
+    def test_create_partition_moves_events_out_of_the_default(self):
+        log_events(self.march, self.april)
+
+        name = create_partition(date(2024, 3, 1))
+
+        assert get_partition_months() == [date(2024, 3, 1)]
+        assert select_created_ats(name) == [self.march]
+        assert select_created_ats(DEFAULT_PARTITION) == [self.april]
+        assert ActivityEvent.objects.count() == 2
+
+    @pytest.mark.parametrize("drop", [False, True])
+    def test_detach_partitions_before_a_month(self, drop):
+        create_partitions(date(2024, 3, 1), date(2024, 4, 1))
+        log_events(self.march, self.april)
+
+        detached = detach_partitions(date(2024, 4, 1), drop=drop)
+
+        assert detached == [get_partition_name(date(2024, 3, 1))]
+        assert get_partition_months() == [date(2024, 4, 1)]
+        assert list(ActivityEvent.objects.values_list("created_at", flat=True)) == [self.april]
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [detached[0]])
+            assert cursor.fetchone()[0] is not drop
@@ -0,0 +1,138 @@
+import pytest
+from django.urls import reverse
+from accounts.tests.factories import UserFactory
+from blog.models import Blog
+from in_app_chat.models import InAppChat
+from .factories import OrganizationFactory, GroupFactory, UserGroupFactory, create_group_weights
+
+pytestmark = pytest.mark.django_db
+
+SOCIALIZATION_LEADERS_URL = (
+    "leaders-table:socialization-get-organization-socialization-activity-scores"
+)
+SECI_LEADERS_URL = "leaders-table:seci-get-organization-seci-activity-scores"
+DIMENSION_LEADERS_URLS = {
+    dimension: f"leaders-table:{dimension}-get-organization-{dimension}-activity-scores"
+    for dimension in ["socialization", "externalization", "combination", "internalization"]
+}
+DATE_RANGE = {"start_date": "2000-01-01T00:00:00.000Z", "end_date": "2100-01-01T00:00:00.000Z"}
+
+
+def create_members(organization, group, count):
+    members = UserFactory.create_batch(
+        count, is_verified=True, role_id=3, organization_id=organization.organization_id
+    )
+    for member in members:
+        UserGroupFactory(user=member, groups=[group])
+    return members
+
+
+@pytest.fixture
+def seci_group():
+    organization = OrganizationFactory()
+    group = GroupFactory(organization_id=organization.organization_id)
+    create_group_weights(organization, group)
+    return organization, group
+
+
+def get_leaders(api_client, organization, group, user, url=SOCIALIZATION_LEADERS_URL, **extra):
+    api_client.force_authenticate(user=user)
+    params = {"organization_id": organization.organization_id, "group_pk": group.pk, **DATE_RANGE}
+    return api_client.get(reverse(url), {**params, **extra})
+
+
+class TestSocializationLeaders:
+    def test_leaders_are_ranked_by_share_of_socialization(self, api_client, seci_group):
+        organization, group = seci_group
+        blogger, chatter = create_members(organization, group, 2)
+
+        for _ in range(2):
+            Blog.objects.create(organization=organization, group=group, author=blogger, topic="t")
+        for _ in range(10):
+            InAppChat.objects.create(
+                organization=organization, group=group, sender=chatter, receiver=blogger
+            )
+
+        response = get_leaders(api_client, organization, group, blogger)
+
+        assert response.status_code == 200
+        leaders = response.json()["leaders"]
+        assert [leader["user"] for leader in leaders] == [chatter.full_name, blogger.full_name]
+        assert sum(float(leader["percentage"]) for leader in leaders) == pytest.approx(100, 0.01)
+
+    def test_query_count_does_not_grow_with_group_size(
+        self, api_client, seci_group, django_assert_max_num_queries
+    ):
+        organization, group = seci_group
+        members = create_members(organization, group, 3)
+        get_leaders(api_client, organization, group, members[0])
+
+        members += create_members(organization, group, 30)
+        for member in members:
+            Blog.objects.create(organization=organization, group=group, author=member, topic="t")
+
+        with django_assert_max_num_queries(20):
+            response = get_leaders(api_client, organization, group, members[0])
+
+        assert response.status_code == 200
+        assert len(response.json()["leaders"]) == 5
+
+    def test_cursor_pages_through_the_ranks(self, api_client, seci_group):
+        organization, group = seci_group
+        members = create_members(organization, group, 7)
+        for count, member in enumerate(members, start=1):
+            for _ in range(count):
+                Blog.objects.create(organization=organization, group=group, author=member)
+
+        first = get_leaders(api_client, organization, group, members[0], top=3).json()
+        second = get_leaders(
+            api_client, organization, group, members[0], top=3, cursor=first["next_cursor"]
+        ).json()
+        last = get_leaders(
+            api_client, organization, group, members[0], top=3, cursor=second["next_cursor"]
+        ).json()
+        everyone = get_leaders(api_client, organization, group, members[0], top=10).json()
+
+        paged = first["leaders"] + second["leaders"] + last["leaders"]
+        assert paged == everyone["leaders"]
+        assert [leader["rank"] for leader in paged] == list(range(1, 8))
+        assert [leader["user"] for leader in paged] == [m.full_name for m in reversed(members)]
+        assert last["next_cursor"] is None
+
+    @pytest.mark.parametrize("params", [{"top": 0}, {"top": "many"}, {"cursor": "rank=3"}])
+    def test_invalid_window(self, api_client, seci_group, params):
+        organization, group = seci_group
+        member = create_members(organization, group, 1)[0]
+
+        response = get_leaders(api_client, organization, group, member, **params)
+
+        assert response.status_code == 400
+
+    def test_group_without_members(self, api_client, seci_group):
+        organization, group = seci_group
+        user = UserFactory(is_verified=True, role_id=3)
+
+        response = get_leaders(api_client, organization, group, user)
+
+        assert response.status_code == 404
+
+
+class TestSECILeaders:
+    def test_all_dimensions_match_the_single_dimension_endpoints(self, api_client, seci_group):
+        organization, group = seci_group
+        blogger, chatter, reader = create_members(organization, group, 3)
+
+        Blog.objects.create(organization=organization, group=group, author=blogger, topic="t")
+        for _ in range(4):
+            InAppChat.objects.create(
+                organization=organization, group=group, sender=chatter, receiver=reader
+            )
+
+        response = get_leaders(api_client, organization, group, blogger, SECI_LEADERS_URL)
+
+        assert response.status_code == 200
+        leaderboards = response.json()["leaders"]
+        assert set(leaderboards) == set(DIMENSION_LEADERS_URLS)
+        for dimension, url in DIMENSION_LEADERS_URLS.items():
+            single = get_leaders(api_client, organization, group, blogger, url).json()["leaders"]
+            assert leaderboards[dimension] == single
@@ -0,0 +1,105 @@
+from io import StringIO
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from accounts.tests.factories import UserFactory
+from blog.models import Blog
+from in_app_chat.models import InAppChat
+from leader.weights import clear_weight_profiles
+from .factories import OrganizationFactory, GroupFactory, UserGroupFactory, create_group_weights
+
+pytestmark = pytest.mark.django_db
+
+ORGANIZATION_DETAILS_URL = reverse("leaders-table:seci-get-organization-seci-details")
+GROUP_DETAILS_URL = reverse("user:user-get-group-seci-details")
+DATE_RANGE = {"start_date": "2000-01-01T00:00:00.000Z", "end_date": "2100-01-01T00:00:00.000Z"}
+
+
+def add_active_group(organization, blogs, chats):
+    group = GroupFactory(organization_id=organization.organization_id)
+    create_group_weights(organization, group)
+    blogger, chatter = UserFactory.create_batch(
+        2, is_verified=True, role_id=3, organization_id=organization.organization_id
+    )
+    for member in (blogger, chatter):
+        UserGroupFactory(user=member, groups=[group])
+
+    scope = {"organization": organization, "group": group}
+    for _ in range(blogs):
+        Blog.objects.create(author=blogger, topic="t", **scope)
+    for _ in range(chats):
+        InAppChat.objects.create(sender=chatter, receiver=blogger, **scope)
+    return group, blogger
+
+
+@pytest.fixture
+def organization(api_client):
+    organization = OrganizationFactory()
+    _, blogger = add_active_group(organization, blogs=2, chats=7)
+    add_active_group(organization, blogs=5, chats=1)
+    api_client.force_authenticate(user=blogger)
+    return organization
+
+
+def get_organization_details(api_client, organization):
+    return api_client.get(
+        ORGANIZATION_DETAILS_URL, {"organization_id": organization.organization_id, **DATE_RANGE}
+    )
+
+
+class TestOrganizationSeciDetails:
+    def test_groups_match_group_details(self, api_client, organization):
+        response = get_organization_details(api_client, organization)
+
+        assert response.status_code == 200
+        groups = response.json()["groups"]
+        assert len(groups) == 2
+        for entry in groups:
+            details = api_client.get(GROUP_DETAILS_URL, {"group_id": entry["group"], **DATE_RANGE})
+            assert entry["seci_details"] == details.json()["seci_details"]
+
+        totals = response.json()["seci_details"]
+        assert totals["total_engagement_score"] == pytest.approx(
+            sum(entry["seci_details"]["total_engagement_score"] for entry in groups)
+        )
+
+    def test_rollups_and_log_give_the_same_details(self, api_client, organization, settings):
+        call_command("backfill_activity_tallies", stdout=StringIO())
+        call_command("backfill_activity_events", stdout=StringIO())
+
+        responses = []
+        for rollups, log in [(False, False), (True, False), (False, True), (True, True)]:
+            settings.SECI_ACTIVITY_ROLLUPS = rollups
+            settings.SECI_ACTIVITY_LOG = log
+            response = get_organization_details(api_client, organization).json()
+            responses.append((response["groups"], response["seci_details"]))
+
+        assert all(other == responses[0] for other in responses)
+
+    def test_group_without_weights_is_left_out_of_the_totals(self, api_client, organization):
+        before = get_organization_details(api_client, organization).json()["seci_details"]
+        group = GroupFactory(organization_id=organization.organization_id)
+
+        response = get_organization_details(api_client, organization)
+
+        assert response.status_code == 200
+        entry = response.json()["groups"][-1]
+        assert entry["group"] == group.pk
+        assert entry["seci_details"] is None
+        assert "socialization" in entry["message"]
+        assert response.json()["seci_details"] == before
+
+    def test_query_count_does_not_grow_with_groups(self, api_client, organization):
+        def count_queries():
+            clear_weight_profiles()
+            with CaptureQueriesContext(connection) as context:
+                response = get_organization_details(api_client, organization)
+            assert response.status_code == 200
+            return len(context.captured_queries)
+
+        two_groups = count_queries()
+        for _ in range(3):
+            add_active_group(organization, blogs=1, chats=1)
+        assert count_queries() == two_groups
@@ -0,0 +1,176 @@
+import re
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from accounts.models import User
+from accounts.tests.factories import UserFactory
+from blog.models import Blog, Comment
+from browser_history.models import BrowserHistory
+from forum.models import Forum
+from in_app_chat.models import InAppChat
+from platforms.models import Platform
+from resource.models import Resources
+from topics.models import Topic
+from leader.models import ActivityEvent, DailyActivityTally, ViewEvent
+from .factories import OrganizationFactory, GroupFactory, UserGroupFactory, create_group_weights
+
+pytestmark = pytest.mark.django_db
+
+ACTIVITY_TABLES = {
+    model._meta.db_table
+    for model in [
+        Blog,
+        Comment,
+        BrowserHistory,
+        Forum,
+        InAppChat,
+        Resources,
+        Topic,
+        User,
+        DailyActivityTally,
+        ViewEvent,
+        ActivityEvent,
+    ]
+}
+DATE_RANGE = {"start_date": "2000-01-01T00:00:00.000Z", "end_date": "2100-01-01T00:00:00.000Z"}
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # Tables this small are always cheaper to scan, only a missing index should force one
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN {sql}")
+            return [row[0] for row in cursor.fetchall()]
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def find_full_scans(plan):
+    """Activity tables a query plan reads in full"""
+
+    if connection.vendor == "postgresql":
+        pattern = re.compile(r"Seq Scan on (\w+)")
+    else:
+        pattern = re.compile(r"^SCAN (\w+)")
+    return {
+        match.group(1)
+        for line in plan
+        for match in [pattern.search(line)]
+        if match and match.group(1) in ACTIVITY_TABLES
+    }
+
+
+def assert_no_full_scans(queries):
+    explained = 0
+    for query in queries:
+        if not query["sql"].startswith("SELECT"):
+            continue
+        plan = explain(query["sql"])
+        assert not find_full_scans(plan), "{}\n{}".format(query["sql"], "\n".join(plan))
+        explained += 1
+    assert explained
+
+
+@pytest.fixture
+def seeded_group():
+    organization = OrganizationFactory()
+    group = GroupFactory(organization_id=organization.organization_id)
+    create_group_weights(organization, group)
+    platform = Platform.objects.create(name="platform")
+
+    members = UserFactory.create_batch(
+        3, is_verified=True, role_id=3, organization_id=organization.organization_id
+    )
+    for member in members:
+        UserGroupFactory(user=member, groups=[group])
+
+    scope = {"organization": organization, "group": group}
+    for sender, receiver in zip(members, members[1:] + members[:1]):
+        blog = Blog.objects.create(author=sender, topic="t", **scope)
+        Comment.objects.create(blog=blog, user=receiver, content="c", **scope)
+        InAppChat.objects.create(sender=sender, receiver=receiver, **scope)
+        Forum.objects.create(user=sender, **scope)
+        Topic.objects.create(author=sender, platform=platform, **scope)
+        BrowserHistory.objects.create(user=sender, **scope)
+        for resource_type in ["IMAGE", "VIDEO", "TEXT"]:
+            Resources.objects.create(sender=sender, receiver=receiver, type=resource_type, **scope)
+    return organization, group, members
+
+
+def capture_seci_queries(api_client, organization, group, user):
+    api_client.force_authenticate(user=user)
+    params = {"organization_id": organization.organization_id, "group_pk": group.pk}
+    with CaptureQueriesContext(connection) as context:
+        responses = [
+            api_client.get(
+                reverse("leaders-table:seci-get-organization-seci-activity-scores"),
+                {**params, **DATE_RANGE},
+            ),
+            api_client.get(
+                reverse("user:user-get-group-seci-details"),
+                {"group_id": group.pk, **DATE_RANGE},
+            ),
+            api_client.get(
+                reverse("user:user-get-user-seci-details"),
+                {"user_id": user.pk, "group_id": group.pk, **DATE_RANGE},
+            ),
+        ]
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    return context.captured_queries
+
+
+class TestQueryPlans:
+    @pytest.mark.parametrize("rollups", [False, True])
+    @pytest.mark.parametrize("log", [False, True])
+    def test_seci_queries_use_indexes(self, api_client, seeded_group, settings, rollups, log):
+        settings.SECI_ACTIVITY_ROLLUPS = rollups
+        settings.SECI_ACTIVITY_LOG = log
+        organization, group, members = seeded_group
+
+        assert_no_full_scans(capture_seci_queries(api_client, organization, group, members[0]))
+
+    def test_total_queries_use_indexes(self, api_client, seeded_group, verified_super_user):
+        organization, group, _ = seeded_group
+        api_client.force_authenticate(user=verified_super_user)
+
+        by_organization = {"organization": organization.pk}
+        by_group = {"group": group.pk}
+        # The unscoped get-total-* endpoints count whole tables by design and are left out
+        requests = [
+            ("blog:blog-get-total-blogs-by-organization", by_organization),
+            ("blog:blog-get-total-blogs-by-group", by_group),
+            ("forum:forum-get-total-forums-by-organization", by_organization),
+            ("forum:forum-get-total-forums-by-group", by_group),
+            ("topics:topic-get-total-topics-by-organization", by_organization),
+            ("topics:topic-get-total-topics-by-group", by_group),
+            (
+                "browser_histroy:browserhistory-get-total-browser-histories-by-organization",
+                by_organization,
+            ),
+            ("browser_histroy:browserhistory-get-total-browser-histories-by-group", by_group),
+            (
+                "resource:resources-get-total-resources-by-organization",
+                {**by_organization, "type": "IMAGE"},
+            ),
+            ("resource:resources-get-total-resources-by-group", {**by_group, "type": "IMAGE"}),
+            ("in_app_chat:inappchat-get-total-incoming-chats-by-organization", by_organization),
+            ("in_app_chat:inappchat-get-total-outgoing-chats-by-organization", by_organization),
+            ("in_app_chat:inappchat-get-total-incoming-chats-by-group", by_group),
+            ("in_app_chat:inappchat-get-total-outgoing-chats-by-group", by_group),
+            ("user:user-get-total-members-by-organization", by_organization),
+        ]
+
+        for url, params in requests:
+            with CaptureQueriesContext(connection) as context:
+                response = api_client.get(reverse(url), params)
+            assert response.status_code == 200, url
+            assert_no_full_scans(context.captured_queries)
+
+    def test_full_scans_are_detected(self, seeded_group):
+        with CaptureQueriesContext(connection) as context:
+            list(Blog.objects.filter(topic="t").values_list("pk", flat=True))
+
+        with pytest.raises(AssertionError):
+            assert_no_full_scans(context.captured_queries)
@@ -0,0 +1,114 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+import pytest
+from django.core.management import call_command
+from django.db.models import QuerySet, Sum
+from accounts.tests.factories import UserFactory
+from blog.models import Blog
+from in_app_chat.models import InAppChat
+from resource.models import Resources
+from leader.models import DailyActivityTally
+from leader.rollups import apply_tally_changes
+from leader.scoring import count_activities, count_activities_by_user
+from .factories import OrganizationFactory, GroupFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def tally_count(**filters):
+    return DailyActivityTally.objects.filter(**filters).aggregate(total=Sum("count"))["total"] or 0
+
+
+@pytest.fixture
+def activity_scope(settings):
+    settings.SECI_ACTIVITY_ROLLUPS = True
+    organization = OrganizationFactory()
+    group = GroupFactory(organization_id=organization.organization_id)
+    users = UserFactory.create_batch(2, role_id=3, organization_id=organization.organization_id)
+    return organization, group, users
+
+
+class TestDailyActivityTally:
+    def test_nothing_is_tallied_while_disabled(self, activity_scope, settings):
+        organization, group, (sender, _) = activity_scope
+        settings.SECI_ACTIVITY_ROLLUPS = False
+
+        Blog.objects.create(organization=organization, group=group, author=sender)
+
+        assert not DailyActivityTally.objects.exists()
+
+    def test_writes_keep_tallies_up_to_date(self, activity_scope):
+        organization, group, (sender, receiver) = activity_scope
+
+        blog = Blog.objects.create(organization=organization, group=group, author=sender)
+        InAppChat.objects.create(
+            organization=organization, group=group, sender=sender, receiver=receiver
+        )
+        assert tally_count(user=sender, activity_key="post_blog") == 1
+        assert tally_count(user=sender, activity_key="send_chat_message") == 1
+        assert tally_count(user=receiver, activity_key="recieve_chat_message") == 1
+
+        blog.delete()
+        assert tally_count(user=sender, activity_key="post_blog") == 0
+
+    def test_resource_type_change_moves_the_tally(self, activity_scope):
+        organization, group, (sender, _) = activity_scope
+
+        resource = Resources.objects.create(
+            organization=organization, group=group, sender=sender, type="IMAGE"
+        )
+        resource.type = "VIDEO"
+        resource.save()
+
+        assert tally_count(user=sender, activity_key="image_sharing") == 0
+        assert tally_count(user=sender, activity_key="video_sharing") == 1
+
+    def test_concurrent_first_writes_share_one_row(self, activity_scope, monkeypatch):
+        organization, _, (sender, _) = activity_scope
+        change = Counter({(organization.pk, None, sender.pk, date(2024, 3, 1), "post_blog"): 1})
+        apply_tally_changes(change)
+
+        # The second writer looked for the row before the first one had created it
+        update = QuerySet.update
+        calls = []
+
+        def late_update(queryset, **kwargs):
+            calls.append(kwargs)
+            return 0 if len(calls) == 1 else update(queryset, **kwargs)
+
+        monkeypatch.setattr(QuerySet, "update", late_update)
+        apply_tally_changes(change)
+
+        tally = DailyActivityTally.objects.get(user=sender, activity_key="post_blog")
+        assert tally.group is None
+        assert tally.count == 2
+
+    def test_rollup_counts_match_raw_counts(self, activity_scope, settings):
+        organization, group, (sender, receiver) = activity_scope
+        start = datetime(2024, 3, 1, 6)
+
+        for hours in range(0, 24 * 6, 5):
+            chat = InAppChat.objects.create(
+                organization=organization, group=group, sender=sender, receiver=receiver
+            )
+            blog = Blog.objects.create(organization=organization, group=group, author=receiver)
+            created_at = start + timedelta(hours=hours)
+            InAppChat.objects.filter(pk=chat.pk).update(created_at=created_at)
+            Blog.objects.filter(pk=blog.pk).update(created_at=created_at)
+
+        call_command("backfill_activity_tallies", stdout=open("/dev/null", "w"))
+
+        date_ranges = [
+            (datetime(2024, 3, 1), datetime(2024, 3, 8)),
+            (datetime(2024, 3, 1, 13, 30), datetime(2024, 3, 4, 21, 59, 59, 999000)),
+            (datetime(2024, 3, 2, 1), datetime(2024, 3, 2, 23)),
+            (datetime(2024, 3, 3), datetime(2024, 3, 4, 23, 59, 59, 999999)),
+        ]
+        for date_range in date_ranges:
+            settings.SECI_ACTIVITY_ROLLUPS = False
+            raw_totals = count_activities(date_range, organization=organization, group=group)
+            raw_by_user = count_activities_by_user(date_range, users=[sender, receiver])
+
+            settings.SECI_ACTIVITY_ROLLUPS = True
+            assert count_activities(date_range, organization=organization, group=group) == raw_totals
+            assert count_activities_by_user(date_range, users=[sender, receiver]) == raw_by_user
@@ -0,0 +1,97 @@
+import random
+from decimal import Decimal
+from simpleblog.utils import (
+    SECI_ACTIVITY_KEYS,
+    build_weight_matrix,
+    calculate_batch_scores,
+    calculate_categorized_percentage,
+    calculate_category_score,
+    calculate_percentage,
+    calculate_total_engagement_score,
+    select_top_shares,
+)
+
+WEIGHTS = [
+    {"post_blog": Decimal("0.50000"), "send_chat_message": Decimal("0.01000"),
+     "post_forum": Decimal("0.25000"), "image_sharing": Decimal("0.00200"),
+     "video_sharing": Decimal("0.00200"), "text_resource_sharing": Decimal("0.00200"),
+     "created_topic": Decimal("0.02500")},
+    {"post_blog": Decimal("0.50000"), "send_chat_message": Decimal("0.00100"),
+     "post_forum": Decimal("0.25000"), "created_topic": Decimal("0.02500"),
+     "comment": Decimal("0.00200")},
+    {"created_topic": Decimal("0.02500"), "post_blog": Decimal("0.50000")},
+    {"used_in_app_browser": Decimal("0.00100"), "read_blog": Decimal("0.00100"),
+     "read_forum": Decimal("0.00100"), "recieve_chat_message": Decimal("0.00137"),
+     "download_resources": Decimal("0.00100")},
+]
+
+
+def legacy_scores(all_tallies):
+    """Score users one at a time the way the per-user helpers do"""
+    scores, percentages = [], []
+    for tallies in all_tallies:
+        user_scores = [calculate_category_score(weights, tallies) for weights in WEIGHTS]
+        tes = calculate_total_engagement_score(*user_scores)
+        scores.append(user_scores + [tes])
+        percentages.append([round(calculate_percentage(score, tes), 2) for score in user_scores])
+
+    shares = []
+    for index in range(len(WEIGHTS)):
+        leaders = [
+            {"user": user, "percentage": user_percentages[index]}
+            for user, user_percentages in enumerate(percentages)
+        ]
+        by_user = {
+            leader["user"]: leader["percentage"]
+            for leader in calculate_categorized_percentage(leaders)
+        }
+        shares.append([by_user[user] for user in range(len(all_tallies))])
+    return scores, percentages, shares
+
+
+class TestBatchScoring:
+    def test_fixed_point_matches_the_per_user_functions(self):
+        generator = random.Random(4)
+        all_tallies = [
+            {key: generator.choice([0, 0, 1, 3, 17, 250]) for key in SECI_ACTIVITY_KEYS}
+            for _ in range(300)
+        ]
+        all_tallies.append(dict.fromkeys(SECI_ACTIVITY_KEYS, 0))
+        tally_matrix = [[tallies[key] for key in SECI_ACTIVITY_KEYS] for tallies in all_tallies]
+
+        batch = calculate_batch_scores(tally_matrix, build_weight_matrix(*WEIGHTS))
+        scores, percentages, shares = legacy_scores(all_tallies)
+
+        for user, user_scores in enumerate(scores):
+            assert batch["scores"][user] == user_scores[:4]
+            assert batch["tes"][user] == user_scores[4]
+            assert batch["percentages"][user] == percentages[user]
+            for index in range(len(WEIGHTS)):
+                assert "{:.2f}".format(batch["shares"][user][index]) == shares[index][user]
+
+    def test_float_mode_approximates_fixed_point(self):
+        tally_matrix = [[1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13], [0] * 13]
+
+        fixed = calculate_batch_scores(tally_matrix, build_weight_matrix(*WEIGHTS))
+        approximate = calculate_batch_scores(
+            tally_matrix, build_weight_matrix(*WEIGHTS, fixed_point=False), fixed_point=False
+        )
+
+        assert approximate["tes"][0] == float(fixed["tes"][0])
+        assert approximate["percentages"][0] == [float(value) for value in fixed["percentages"][0]]
+        assert approximate["shares"][1] == [0, 0, 0, 0]
+
+    def test_top_shares_match_the_full_ranking(self):
+        generator = random.Random(6)
+        percentages = [
+            Decimal(generator.choice([0, 1, 1, 250, 3333, 5000])).scaleb(-2) for _ in range(200)
+        ]
+        ranked = calculate_categorized_percentage(
+            [{"user": user, "percentage": percentage} for user, percentage in enumerate(percentages)]
+        )
+
+        top = select_top_shares(percentages, 10) + select_top_shares(percentages, 10, offset=10)
+
+        assert [(user, "{:.2f}".format(share)) for user, share in top] == [
+            (leader["user"], leader["percentage"]) for leader in ranked[:20]
+        ]
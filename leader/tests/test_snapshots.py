@@ -0,0 +1,149 @@
+from collections import Counter
+from io import StringIO
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from accounts.tests.factories import UserFactory
+from blog.models import Blog
+from group.models import UserGroup
+from in_app_chat.models import InAppChat
+from leader.models import SeciScoreSnapshot, Socialization
+from leader.signals import weights_updated
+from leader.snapshots import SCORE_FIELDS, update_score_snapshots
+from .factories import OrganizationFactory, GroupFactory, UserGroupFactory, create_group_weights
+
+pytestmark = pytest.mark.django_db
+
+SECI_LEADERS_URL = reverse("leaders-table:seci-get-organization-seci-activity-scores")
+USER_DETAILS_URL = reverse("user:user-get-user-seci-details")
+DATE_RANGE = {"start_date": "2000-01-01T00:00:00.000Z", "end_date": "2100-01-01T00:00:00.000Z"}
+
+
+@pytest.fixture
+def active_group(settings):
+    settings.SECI_SCORE_SNAPSHOTS = True
+    organization = OrganizationFactory()
+    group = GroupFactory(organization_id=organization.organization_id)
+    create_group_weights(organization, group)
+    members = UserFactory.create_batch(
+        3, is_verified=True, role_id=3, organization_id=organization.organization_id
+    )
+    for member in members:
+        UserGroupFactory(user=member, groups=[group])
+
+    blogger, chatter, _ = members
+    scope = {"organization": organization, "group": group}
+    for _ in range(2):
+        Blog.objects.create(author=blogger, topic="t", **scope)
+    for _ in range(7):
+        InAppChat.objects.create(sender=chatter, receiver=blogger, **scope)
+    return organization, group, members
+
+
+def get_leaders(api_client, organization, group, user, **params):
+    api_client.force_authenticate(user=user)
+    return api_client.get(
+        SECI_LEADERS_URL,
+        {"organization_id": organization.organization_id, "group_pk": group.pk, **params},
+    )
+
+
+def get_user_details(api_client, user, **params):
+    api_client.force_authenticate(user=user)
+    return api_client.get(USER_DETAILS_URL, {"user_id": user.pk, **params})
+
+
+def snapshot_scores():
+    return list(SeciScoreSnapshot.objects.order_by("user").values_list(*SCORE_FIELDS))
+
+
+class TestSeciScoreSnapshots:
+    def test_period_leaders_match_date_range_leaders(self, api_client, active_group):
+        organization, group, members = active_group
+
+        by_period = get_leaders(api_client, organization, group, members[0], period="current")
+        by_range = get_leaders(api_client, organization, group, members[0], **DATE_RANGE)
+
+        assert by_period.status_code == 200
+        assert by_period.json()["leaders"] == by_range.json()["leaders"]
+        assert by_period.json()["leaders"]["socialization"][2]["percentage"] == "0.00"
+
+    def test_user_details_follow_a_weight_change(
+        self, api_client, active_group, django_capture_on_commit_callbacks
+    ):
+        organization, group, (blogger, *_) = active_group
+        before = get_user_details(api_client, blogger, period="current").json()["seci_details"]
+        with django_capture_on_commit_callbacks(execute=True):
+            Socialization.objects.filter(organization=organization).update(post_blog="2.00000")
+            weights_updated.send(sender=Socialization, organization=organization)
+
+        after = get_user_details(api_client, blogger, period="current")
+
+        assert after.status_code == 200
+        assert after.json()["seci_details"] != before
+
+    def test_user_details_for_a_period_match_the_month_range(self, api_client, active_group):
+        organization, group, (blogger, *_) = active_group
+        other_group = GroupFactory(organization_id=organization.organization_id)
+        create_group_weights(organization, other_group)
+        UserGroup.objects.get(user=blogger).groups.add(other_group)
+
+        by_period = get_user_details(api_client, blogger, period="current")
+        by_range = get_user_details(api_client, blogger, **DATE_RANGE)
+
+        assert by_period.status_code == 200
+        # Every activity counts for each group, whichever group it was recorded in
+        assert by_period.json()["seci_details"] == by_range.json()["seci_details"]
+
+    def test_user_details_for_a_period_need_no_snapshots(self, api_client, active_group, settings):
+        _, _, (blogger, *_) = active_group
+        settings.SECI_SCORE_SNAPSHOTS = False
+
+        response = get_user_details(api_client, blogger, period="current")
+
+        assert response.status_code == 200
+        assert response.json()["seci_details"]["total_engagement_score"] > 0
+
+    def test_rebuild_matches_running_scores(self, active_group):
+        running = snapshot_scores()
+
+        call_command("rebuild_seci_snapshots", stdout=StringIO())
+
+        assert snapshot_scores() == running
+        assert len(running) == 2
+
+    def test_periods_need_snapshots_enabled(self, api_client, active_group, settings):
+        organization, group, members = active_group
+        settings.SECI_SCORE_SNAPSHOTS = False
+
+        response = get_leaders(api_client, organization, group, members[0], period="current")
+
+        assert response.status_code == 400
+
+    def test_nothing_is_kept_while_disabled(self, active_group, settings):
+        organization, group, (blogger, *_) = active_group
+        settings.SECI_SCORE_SNAPSHOTS = False
+        before = snapshot_scores()
+
+        Blog.objects.create(author=blogger, topic="t", organization=organization, group=group)
+
+        assert snapshot_scores() == before
+
+    def test_a_batch_takes_the_same_queries_for_any_number_of_members(self, active_group):
+        organization, group, members = active_group
+        today = timezone.localdate()
+
+        def count_queries(users):
+            changes = Counter(
+                {(organization.pk, group.pk, user.pk, today, "post_blog"): 1 for user in users}
+            )
+            with CaptureQueriesContext(connection) as context:
+                update_score_snapshots(changes)
+            return len(context.captured_queries)
+
+        one_member = count_queries(members[:1])
+        assert count_queries(members) == one_member
+        assert SeciScoreSnapshot.objects.filter(group=group).count() == 3
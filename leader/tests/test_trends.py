@@ -0,0 +1,131 @@
+from datetime import datetime, timezone
+from io import StringIO
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from accounts.tests.factories import UserFactory
+from blog.models import Blog
+from in_app_chat.models import InAppChat
+from leader.weights import clear_weight_profiles
+from .factories import OrganizationFactory, GroupFactory, UserGroupFactory, create_group_weights
+
+pytestmark = pytest.mark.django_db
+
+TRENDS_URL = reverse("leaders-table:seci-get-seci-trends")
+GROUP_DETAILS_URL = reverse("user:user-get-group-seci-details")
+
+
+@pytest.fixture
+def active_group(api_client):
+    organization = OrganizationFactory()
+    group = GroupFactory(organization_id=organization.organization_id)
+    create_group_weights(organization, group)
+    blogger, chatter = UserFactory.create_batch(
+        2, is_verified=True, role_id=3, organization_id=organization.organization_id
+    )
+    for member in (blogger, chatter):
+        UserGroupFactory(user=member, groups=[group])
+
+    scope = {"organization": organization, "group": group}
+    for day, hour in [(4, 9), (4, 18), (6, 12), (12, 23)]:
+        created_at = datetime(2024, 3, day, hour, tzinfo=timezone.utc)
+        blog = Blog.objects.create(author=blogger, topic="t", **scope)
+        chat = InAppChat.objects.create(sender=chatter, receiver=blogger, **scope)
+        Blog.objects.filter(pk=blog.pk).update(created_at=created_at)
+        InAppChat.objects.filter(pk=chat.pk).update(created_at=created_at)
+
+    # The rows above were moved with update(), bring the tallies and the log in line
+    call_command("backfill_activity_tallies", stdout=StringIO())
+    call_command("backfill_activity_events", stdout=StringIO())
+    api_client.force_authenticate(user=blogger)
+    return organization, group, blogger
+
+
+def get_trend(api_client, organization, start, end, **params):
+    return api_client.get(
+        TRENDS_URL,
+        {
+            "organization_id": organization.organization_id,
+            "start_date": start,
+            "end_date": end,
+            **params,
+        },
+    )
+
+
+class TestSeciTrends:
+    def test_days_match_group_details(self, api_client, active_group):
+        organization, group, _ = active_group
+
+        response = get_trend(
+            api_client,
+            organization,
+            "2024-03-04T00:00:00.000Z",
+            "2024-03-06T23:59:59.999Z",
+            group_pk=group.pk,
+        )
+
+        assert response.status_code == 200
+        series = response.json()["series"]
+        assert [point["period_start"] for point in series] == [
+            "2024-03-04",
+            "2024-03-05",
+            "2024-03-06",
+        ]
+        for point in series:
+            details = api_client.get(
+                GROUP_DETAILS_URL,
+                {
+                    "group_id": group.pk,
+                    "start_date": f"{point['period_start']}T00:00:00.000Z",
+                    "end_date": f"{point['period_start']}T23:59:59.999Z",
+                },
+            ).json()["seci_details"]
+            assert {key: point[key] for key in details} == details
+        assert series[1]["total_engagement_score"] == 0
+
+    @pytest.mark.parametrize("interval", ["week", "month"])
+    def test_rollups_and_log_give_the_same_series(
+        self, api_client, active_group, settings, interval
+    ):
+        organization, _, blogger = active_group
+        dates = ("2024-03-04T10:00:00.000Z", "2024-03-31T00:00:00.000Z")
+
+        series = []
+        for rollups, log in [(False, False), (True, False), (False, True), (True, True)]:
+            settings.SECI_ACTIVITY_ROLLUPS = rollups
+            settings.SECI_ACTIVITY_LOG = log
+            response = get_trend(
+                api_client, organization, *dates, interval=interval, user_id=blogger.pk
+            )
+            series.append(response.json()["series"])
+
+        assert all(other == series[0] for other in series)
+        first_bucket = series[0][0]
+        expected_start = "2024-03-04" if interval == "week" else "2024-03-01"
+        assert first_bucket["period_start"] == expected_start
+        assert first_bucket["socialization_engagement_score"] > 0
+
+    def test_query_count_does_not_grow_with_buckets(self, api_client, active_group):
+        organization, _, _ = active_group
+
+        def count_queries(end):
+            clear_weight_profiles()
+            with CaptureQueriesContext(connection) as context:
+                response = get_trend(api_client, organization, "2024-03-01T00:00:00.000Z", end)
+            assert response.status_code == 200
+            return len(context.captured_queries)
+
+        few_buckets = count_queries("2024-03-05T00:00:00.000Z")
+        assert count_queries("2024-05-30T00:00:00.000Z") == few_buckets
+
+    @pytest.mark.parametrize("params", [{"interval": "hour"}, {"interval": "day", "end": "2026"}])
+    def test_rejects_bad_parameters(self, api_client, active_group, params):
+        organization, _, _ = active_group
+        end = f"{params.pop('end', '2024')}-03-05T00:00:00.000Z"
+
+        response = get_trend(api_client, organization, "2024-03-01T00:00:00.000Z", end, **params)
+
+        assert response.status_code == 400
@@ -0,0 +1,145 @@
+from datetime import timedelta
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from accounts.tests.factories import UserFactory
+from blog.models import Blog
+from forum.models import Forum
+from resource.models import Resources
+from leader import events
+from leader.events import ViewEventBuffer, get_view_event_buffer
+from leader.models import DailyActivityTally, ViewEvent
+from leader.scoring import count_activities
+from .factories import OrganizationFactory, GroupFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def reader(api_client):
+    organization = OrganizationFactory()
+    group = GroupFactory(organization_id=organization.organization_id)
+    user = UserFactory(organization_id=organization.organization_id)
+    api_client.force_authenticate(user=user)
+    return user, group, organization
+
+
+def make_event(reader, kind="READ_BLOG", object_id=1):
+    user, group, organization = reader
+    return ViewEvent(
+        organization=organization, group=group, user=user, kind=kind, object_id=object_id
+    )
+
+
+class TestViewEvents:
+    def test_reads_and_downloads_are_counted_once_flushed(
+        self, api_client, reader, monkeypatch, settings
+    ):
+        user, group, organization = reader
+        settings.SECI_ACTIVITY_ROLLUPS = True
+        monkeypatch.setattr(get_view_event_buffer(), "interval", 3600)
+        scope = {"organization": organization, "group": group}
+        blog = Blog.objects.create(author=user, topic="Pairing", **scope)
+        forum = Forum.objects.create(user=user, topic="Onboarding", **scope)
+        resource = Resources.objects.create(
+            sender=user, media_url="https://files.example.com/guide.pdf", **scope
+        )
+
+        assert api_client.get(reverse("blog:blog-detail", args=[blog.pk])).status_code == 200
+        api_client.get(reverse("blog:blog-detail", args=[blog.pk]))
+        assert api_client.get(reverse("forum:forum-detail", args=[forum.pk])).status_code == 200
+        response = api_client.get(reverse("resource:resources-download", args=[resource.pk]))
+        assert response.status_code == 302
+        assert response["Location"] == resource.media_url
+
+        # Nothing is written until the buffer is flushed
+        assert not ViewEvent.objects.exists()
+        assert len(get_view_event_buffer().flush()) == 4
+
+        assert DailyActivityTally.objects.get(user=user, activity_key="read_blog").count == 2
+        day_range = (timezone.now() - timedelta(days=1), timezone.now() + timedelta(days=1))
+        tallies = count_activities(day_range, **scope)
+        assert (tallies["read_blog"], tallies["read_forum"], tallies["download_resources"]) == (
+            2,
+            1,
+            1,
+        )
+
+    def test_events_keep_the_time_they_were_buffered(self, api_client, reader, monkeypatch):
+        user, group, organization = reader
+        scope = {"organization": organization, "group": group}
+        blog = Blog.objects.create(author=user, topic="Pairing", **scope)
+        viewed_at = timezone.now() - timedelta(days=1)
+        monkeypatch.setattr(events.timezone, "now", lambda: viewed_at)
+        api_client.get(reverse("blog:blog-detail", args=[blog.pk]))
+        monkeypatch.undo()
+
+        get_view_event_buffer().flush()
+
+        assert ViewEvent.objects.get().created_at == viewed_at
+
+    def test_writes_a_batch_once_full(self, reader):
+        buffer = ViewEventBuffer(batch_size=3, interval=60, max_events=100)
+
+        buffer.add(make_event(reader, object_id=1))
+        buffer.add(make_event(reader, object_id=2))
+        assert not ViewEvent.objects.exists()
+
+        buffer.add(make_event(reader, "READ_FORUM", object_id=3))
+        assert ViewEvent.objects.count() == 3
+        assert buffer.events == []
+
+    def test_writes_due_events_when_a_request_finishes(self, api_client, reader, monkeypatch):
+        user, group, organization = reader
+        buffer = get_view_event_buffer()
+        monkeypatch.setattr(buffer, "interval", 3600)
+        scope = {"organization": organization, "group": group}
+        blog = Blog.objects.create(author=user, topic="Pairing", **scope)
+
+        api_client.get(reverse("blog:blog-detail", args=[blog.pk]))
+        assert not ViewEvent.objects.exists()
+
+        # The next request to finish writes the events, whatever it was
+        monkeypatch.setattr(buffer, "interval", 0)
+        api_client.get(reverse("blog:blog-detail", args=[blog.pk]))
+        assert ViewEvent.objects.count() == 2
+        assert buffer.events == []
+
+    def test_keeps_at_most_max_events_while_writes_fail(self, reader, monkeypatch):
+        def fail(events):
+            raise OSError("database is down")
+
+        monkeypatch.setattr(events, "persist_view_events", fail)
+        buffer = ViewEventBuffer(batch_size=2, interval=60, max_events=3)
+
+        for object_id in range(1, 7):
+            buffer.add(make_event(reader, object_id=object_id))
+
+        assert [event.object_id for event in buffer.events] == [4, 5, 6]
+        assert buffer.flush_if_due() == []
+        assert len(buffer.events) == 3
+
+    # Foreign keys are only checked when a real transaction commits
+    @pytest.mark.django_db(transaction=True)
+    def test_drops_only_events_that_cannot_be_stored(self, reader):
+        buffer = ViewEventBuffer(batch_size=10, interval=60, max_events=100)
+        gone = UserFactory()
+        buffer.add(make_event(reader, object_id=1))
+        buffer.add(ViewEvent(user_id=gone.pk, kind="READ_BLOG", object_id=2))
+        gone.delete()
+
+        stored = buffer.flush()
+
+        assert [event.object_id for event in stored] == [1]
+        assert list(ViewEvent.objects.values_list("object_id", flat=True)) == [1]
+
+    def test_download_waits_for_the_upload(self, api_client, reader):
+        user, group, organization = reader
+        resource = Resources.objects.create(
+            sender=user, organization=organization, group=group, upload_status="PENDING"
+        )
+
+        response = api_client.get(reverse("resource:resources-download", args=[resource.pk]))
+
+        assert response.status_code == 409
+        assert get_view_event_buffer().events == []
@@ -0,0 +1,106 @@
+from decimal import Decimal
+import pytest
+from django.urls import reverse
+from accounts.tests.factories import UserFactory
+from leader.models import Socialization
+from leader.checks import check_shared_cache
+from leader.weights import get_weight_profile
+from .factories import OrganizationFactory, GroupFactory, CombinationFactory, create_group_weights
+
+pytestmark = pytest.mark.django_db
+
+SET_SOCIALIZATION_URL = (
+    "leaders-table:socialization-set-general-activities-score-for-organization-socialization"
+)
+
+
+@pytest.fixture
+def weighted_group():
+    organization = OrganizationFactory()
+    group = GroupFactory(organization_id=organization.organization_id)
+    create_group_weights(organization, group)
+    return organization, group
+
+
+class TestWeightProfile:
+    def test_profile_is_read_once(self, weighted_group, django_assert_num_queries):
+        organization, group = weighted_group
+        profile = get_weight_profile(organization, group)
+
+        with django_assert_num_queries(0):
+            assert get_weight_profile(organization.pk, group.pk) is profile
+
+        assert profile.missing is None
+        assert profile.socialization["post_blog"] == Decimal("0.50000")
+        with pytest.raises(TypeError):
+            profile.socialization["post_blog"] = Decimal("1")
+
+    def test_missing_dimension(self):
+        organization = OrganizationFactory()
+        group = GroupFactory(organization_id=organization.organization_id)
+        CombinationFactory(organization=organization, group=group)
+
+        profile = get_weight_profile(organization, group)
+
+        assert profile.missing == "socialization"
+        assert profile.matrix is None
+
+    def test_saving_a_weight_row_invalidates_the_profile_on_commit(
+        self, weighted_group, django_capture_on_commit_callbacks
+    ):
+        organization, group = weighted_group
+        get_weight_profile(organization, group)
+
+        socialization = Socialization.objects.get(organization=organization, group=group)
+        socialization.post_blog = Decimal("0.75000")
+        with django_capture_on_commit_callbacks(execute=True):
+            socialization.save()
+            assert get_weight_profile(organization, group).socialization["post_blog"] == Decimal(
+                "0.50000"
+            )
+
+        assert get_weight_profile(organization, group).socialization["post_blog"] == Decimal(
+            "0.75000"
+        )
+
+    def test_bulk_update_invalidates_the_profile(
+        self, api_client, weighted_group, django_capture_on_commit_callbacks
+    ):
+        organization, group = weighted_group
+        get_weight_profile(organization, group)
+        admin = UserFactory(
+            is_verified=True, role_id=2, organization_id=organization.organization_id
+        )
+        api_client.force_authenticate(user=admin)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(
+                reverse(SET_SOCIALIZATION_URL) + f"?organization_id={organization.organization_id}",
+                {"post_blog": "0.12345"},
+            )
+
+        assert response.status_code == 200
+        assert get_weight_profile(organization, group).socialization["post_blog"] == Decimal(
+            "0.12345"
+        )
+
+
+class TestSharedCacheCheck:
+    LOCAL_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+    @pytest.mark.parametrize("debug", [False, True])
+    def test_process_local_cache_warns(self, settings, debug):
+        settings.CACHES = self.LOCAL_CACHE
+        settings.DEBUG = debug
+
+        assert [error.id for error in check_shared_cache(None)] == ["leader.W001"]
+
+    def test_redis_cache_passes(self, settings):
+        settings.CACHES = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://127.0.0.1:6379",
+            }
+        }
+
+        assert check_shared_cache(None) == []
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Trunc
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from simpleblog.utils import calculate_category_score
+from .models import ActivityEvent, DailyActivityTally
+from .partitions import add_months
+from .scoring import (
+    ACTIVITY_KEYS,
+    ACTIVITY_SOURCES,
+    DIMENSIONS,
+    empty_tallies,
+    get_seci_details,
+    scope_filters,
+    split_date_range,
+)
+from .weights import get_weight_profile
+
+INTERVALS = ["day", "week", "month"]
+
+
+def get_bucket(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def truncate(day, interval):
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    return day
+
+
+def get_buckets(date_range, interval):
+    """Start day of every bucket a date range touches"""
+
+    bucket, last = truncate(date_range[0].date(), interval), date_range[1].date()
+    buckets = []
+    while bucket <= last:
+        buckets.append(bucket)
+        if interval == "month":
+            bucket = add_months(bucket, 1)
+        else:
+            bucket += timedelta(days=7 if interval == "week" else 1)
+    return buckets
+
+
+def add_bucket_rows(tallies, rows):
+    for row in rows:
+        if row["activity_key"] in ACTIVITY_KEYS:
+            key = (get_bucket(row["bucket"]), row["group"])
+            tallies.setdefault(key, empty_tallies())[row["activity_key"]] += row["total"]
+
+
+def count_raw_activities_by_bucket(tallies, period, interval, **scope):
+    for model, actor, activities in ACTIVITY_SOURCES:
+        rows = (
+            model.objects.filter(period, **scope_filters(actor, **scope))
+            .annotate(bucket=Trunc("created_at", interval))
+            .order_by()
+            .values("bucket", "group")
+            .annotate(
+                **{
+                    key: Count("pk", filter=Q(**lookups) if lookups else None)
+                    for key, lookups in activities.items()
+                }
+            )
+        )
+        for row in rows:
+            bucket_key = (get_bucket(row["bucket"]), row["group"])
+            bucket_tallies = tallies.setdefault(bucket_key, empty_tallies())
+            for key in activities:
+                bucket_tallies[key] += row[key]
+
+
+def count_logged_activities_by_bucket(tallies, period, interval, **scope):
+    rows = (
+        ActivityEvent.objects.filter(period, **scope_filters("user", **scope))
+        .annotate(bucket=Trunc("created_at", interval))
+        .order_by()
+        .values("bucket", "group", "activity_key")
+        .annotate(total=Sum("change"))
+    )
+    add_bucket_rows(tallies, rows)
+
+
+def count_rolled_up_activities_by_bucket(tallies, days, interval, **scope):
+    rows = (
+        DailyActivityTally.objects.filter(
+            day__gte=days[0], day__lt=days[1], **scope_filters("user", **scope)
+        )
+        .annotate(bucket=Trunc("day", interval))
+        .order_by()
+        .values("bucket", "group", "activity_key")
+        .annotate(total=Sum("count"))
+    )
+    add_bucket_rows(tallies, rows)
+
+
+def collect_bucket_tallies(date_range, interval, **scope):
+    """Tallies per (bucket start day, group) within a date range, one grouped query per
+    table whatever the number of buckets, read the way collect_tallies reads them"""
+
+    tallies = {}
+    if settings.SECI_ACTIVITY_ROLLUPS:
+        edges, days = split_date_range(date_range)
+    else:
+        edges, days = Q(created_at__range=date_range), None
+
+    if settings.SECI_ACTIVITY_LOG:
+        count_logged_activities_by_bucket(tallies, edges, interval, **scope)
+    else:
+        count_raw_activities_by_bucket(tallies, edges, interval, **scope)
+    if days is not None:
+        count_rolled_up_activities_by_bucket(tallies, days, interval, **scope)
+    return tallies
+
+
+def get_seci_trend(date_range, interval, organization, **scope):
+    """SEC, EEC, CEC, IEC and TES of every bucket of a date range
+
+    Each group's activity is weighed with that group's weights, a user or an organization
+    spanning several groups gets the sum of its groups' scores.
+    """
+    tallies = collect_bucket_tallies(date_range, interval, organization=organization, **scope)
+
+    scores = {bucket: [0] * len(DIMENSIONS) for bucket in get_buckets(date_range, interval)}
+    for (bucket, group), bucket_tallies in tallies.items():
+        # Activity outside any group has no weights to be scored with
+        if group is None:
+            continue
+        weights = get_weight_profile(organization, group)
+        if weights.missing:
+            raise ValidationError(
+                detail=f"Group {group} has no {weights.missing} activities constants",
+                code=status.HTTP_400_BAD_REQUEST,
+            )
+        bucket_scores = scores.setdefault(bucket, [0] * len(DIMENSIONS))
+        for index, dimension in enumerate(DIMENSIONS):
+            bucket_scores[index] += calculate_category_score(
+                getattr(weights, dimension), bucket_tallies
+            )
+
+    return [
+        {"period_start": bucket, **get_seci_details(*scores[bucket])} for bucket in sorted(scores)
+    ]
@@ -5,6 +5,7 @@ from .views import (
     InternalizationViewSets,
     SocializationViewSets,
     ExternalizationViewSets,
+    SECIViewSets,
 )
 
 app_name = 'leaders-table'
@@ -14,6 +15,7 @@ router.register('soicalization', SocializationViewSets)
 router.register('externalization', ExternalizationViewSets)
 router.register('internalization', InternalizationViewSets)
 router.register('combination', CombinationViewSets)
+router.register('seci', SECIViewSets, basename='seci')
 
 
 urlpatterns = [
@@ -21,23 +21,154 @@ from rest_framework.decorators import action
 from accounts.permissions import IsAdmin, IsSuperAdmin, IsSuperAdminOrAdmin, IsAdminOrUser
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
+from accounts.models import User
 from organization.models import Organization
 from group.models import Group, UserGroup
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils import timezone
-from blog.models import Blog, Comment
-from in_app_chat.models import InAppChat
-from resource.models import Resources
-from browser_history.models import BrowserHistory
-from forum.models import Forum
-from topics.models import Topic
 from django.utils import timezone
-from simpleblog.utils import calculate_total_engagement_score,calculate_categorized_percentage
-from accounts.models import User
-from rest_framework.exceptions import ValidationError
 from datetime import datetime
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from rest_framework.exceptions import ValidationError
+from .scoring import (
+    DIMENSIONS,
+    get_group_activity_scores,
+    get_group_weights,
+    get_organization_seci_details,
+)
+from .snapshots import get_snapshot_leaders, parse_period
+from .trends import INTERVALS, get_buckets, get_seci_trend
+from simpleblog.utils import select_top_shares
+from .signals import weights_updated
+
+
+class LeaderboardMixin:
+    default_leaders = 5
+    max_leaders = 100
+
+    def encode_leader_cursor(self, offset):
+        return urlsafe_b64encode(f"rank={offset}".encode()).decode()
+
+    def get_leader_window(self, request):
+        """Number of leaders to return and the rank offset from the top and cursor params"""
+
+        try:
+            top = int(request.query_params.get("top", self.default_leaders))
+        except ValueError:
+            top = 0
+        if not 0 < top <= self.max_leaders:
+            raise ValidationError(
+                detail=f"top must be a number between 1 and {self.max_leaders}",
+                code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        cursor = request.query_params.get("cursor")
+        if not cursor:
+            return top, 0
+        try:
+            key, offset = urlsafe_b64decode(cursor.encode()).decode().split("=")
+            offset = int(offset)
+        except ValueError:
+            key, offset = None, -1
+        if key != "rank" or offset < 0:
+            raise ValidationError(detail="Invalid cursor", code=status.HTTP_400_BAD_REQUEST)
+        return top, offset
+
+    def get_group_leaders(self, request, dimension=None):
+        """Rank the members of a group by their share of a SECI dimension, or of all four"""
+
+        organization_id = request.query_params["organization_id"]
+        group_pk = request.query_params["group_pk"]
+
+        period = request.query_params.get("period")
+        if period:
+            period = parse_period(period)
+            window = {"period": f"{period:%Y-%m}"}
+        else:
+            start_date = datetime.strptime(
+                request.query_params["start_date"], "%Y-%m-%dT%H:%M:%S.%fZ"
+            )
+            end_date = datetime.strptime(request.query_params["end_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
+            window = {"start_date": start_date, "end_date": end_date}
+
+        try:
+            group = Group.objects.get(pk=group_pk)
+        except ObjectDoesNotExist:
+            return Response(
+                {
+                    'success': False,
+                    'message': "group not found",
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        if not UserGroup.objects.filter(groups=group.pk, user__isnull=False).exists():
+            return Response(
+                {
+                    'success': True,
+                    'message': f"{group.title} group has no member(s) attached",
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        top, offset = self.get_leader_window(request)
+        organization = get_object_or_404(Organization, organization_id=organization_id).pk
+        dimensions = [dimension] if dimension else DIMENSIONS
+
+        if period:
+            # Ranked from the monthly snapshots, one indexed ORDER BY per dimension
+            weights = get_group_weights(organization, organization_id, group)
+            ranked = {
+                name: get_snapshot_leaders(group, period, weights, name, top, offset)
+                for name in dimensions
+            }
+            member_count = UserGroup.objects.filter(groups=group, user__isnull=False).count()
+        else:
+            activity_scores = get_group_activity_scores(
+                organization, organization_id, group, (start_date, end_date)
+            )
+            members = activity_scores["members"]
+            percentages = list(zip(*activity_scores["percentages"]))
+            ranked = {
+                name: [
+                    (members[member], share)
+                    for member, share in select_top_shares(
+                        percentages[DIMENSIONS.index(name)], top, offset
+                    )
+                ]
+                for name in dimensions
+            }
+            member_count = len(members)
+
+        leaderboards = {
+            name: [
+                {
+                    "rank": rank,
+                    "user": user.full_name,
+                    "percentage": "{:.2f}".format(share),
+                }
+                for rank, (user, share) in enumerate(leaders, start=offset + 1)
+            ]
+            for name, leaders in ranked.items()
+        }
+
+        next_offset = offset + top
+        next_cursor = self.encode_leader_cursor(next_offset) if next_offset < member_count else None
+
+        return Response(
+            {
+                "success": True,
+                "leaders": leaderboards[dimension] if dimension else leaderboards,
+                "next_cursor": next_cursor,
+                "organization_id": organization_id,
+                "group": group.pk,
+                **window,
+            },
+            status=status.HTTP_200_OK,
+        )
 
-class BaseViewSet(viewsets.ModelViewSet):
+
+class BaseViewSet(LeaderboardMixin, viewsets.ModelViewSet):
     http_method_names = ["get", "patch", "post", "put", "delete"]
     permission_classes = [IsSuperAdminOrAdmin]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -60,138 +191,6 @@ class BaseViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
-    def get_count_model_instances(self, model, organization, group, date_range, kwargs):
-        filters = {'organization': organization, 'group': group.pk, 'created_at__range': date_range}
-
-        if kwargs:
-            filters.update(**kwargs)
-
-        count = model.objects.filter(**filters).count()
-        return count
-
-    def receive_model_instance(self, model, organization_id, group, organization, model_name):
-        try:
-            model_instance = model.objects.get(organization=organization, group=group.pk)
-            return model_instance
-        except model.DoesNotExist:
-            raise ValidationError(
-                detail=f"Group- {group.title} belonging to organization- {organization_id} have no {model_name} activity score ",
-                code=status.HTTP_400_BAD_REQUEST,
-            )
-
-    def get_organization_activity_scores(
-        self, organization_id, group_pk, user, date_range, pk=None
-    ):
-        """Get activity score"""
-
-        organization = get_object_or_404(Organization, organization_id=organization_id).pk
-        group = get_object_or_404(Group, pk=group_pk)
-
-        post_blog = self.get_count_model_instances(
-            Blog, organization, group, date_range, {'author': user}
-        )
-        send_chat_message = self.get_count_model_instances(
-            InAppChat, organization, group, date_range, {'sender': user}
-        )
-        post_forum = self.get_count_model_instances(
-            Forum, organization, group, date_range, {'user': user}
-        )
-        image_sharing = self.get_count_model_instances(
-            Resources,
-            organization,
-            group,
-            date_range,
-            {'type': 'IMAGE', 'sender': user},
-        )
-        video_sharing = self.get_count_model_instances(
-            Resources,
-            organization,
-            group,
-            date_range,
-            {'type': 'VIDEO', 'sender': user},
-        )
-        text_resource_sharing = self.get_count_model_instances(
-            Resources,
-            organization,
-            group,
-            date_range,
-            {'type': 'DOCUMENT', 'sender': user},
-        )
-        created_topic = self.get_count_model_instances(
-            Topic, organization, group, date_range, {'author': user}
-        )
-        comment = self.get_count_model_instances(
-            Comment,
-            organization,
-            group,
-            date_range,
-            {'user': user},
-        )
-        used_in_app_browser = self.get_count_model_instances(
-            BrowserHistory,
-            organization,
-            group,
-            date_range,
-            {'user': user},
-        )
-        recieve_chat_message = self.get_count_model_instances(
-            InAppChat,
-            organization,
-            group,
-            date_range,
-            {'receiver': user},
-        )
-
-        tallies = {
-            "post_blog": post_blog,
-            "send_chat_message": send_chat_message,
-            "post_forum": post_forum,
-            "image_sharing": image_sharing,
-            "video_sharing": video_sharing,
-            "text_resource_sharing": text_resource_sharing,
-            "created_topic": created_topic,
-            "comment": comment,
-            "used_in_app_browser": used_in_app_browser,
-            "read_blog": 0,
-            "read_forum": 0,
-            "recieve_chat_message": recieve_chat_message,
-            "download_resources": 0,
-        }
-
-        socialization_instance = self.receive_model_instance(
-            Socialization, organization_id, group, organization, "Socialization"
-        )
-
-        externalization_instance = self.receive_model_instance(
-            Externalization, organization_id, group, organization, "Externalization"
-        )
-
-        internalization_instance = self.receive_model_instance(
-            Internalization, organization_id, group, organization, "Internalization"
-        )
-        combination_instance = self.receive_model_instance(
-            Combination, organization_id, group, organization, "Combination"
-        )
-
-        cec = combination_instance.calculate_combination_score(tallies)
-        sec = socialization_instance.calculate_socialization_score(tallies)
-        iec = internalization_instance.calculate_internalization_score(tallies)
-        eec = externalization_instance.calculate_externalization_score(tallies)
-
-        tes = calculate_total_engagement_score(sec, eec, cec, iec)
-
-        return {
-            "socialization_instance": socialization_instance,
-            "externalization_instance": externalization_instance,
-            "combination_instance": combination_instance,
-            "internalization_instance": internalization_instance,
-            "tes": tes,
-            "sec": sec,
-            "eec": eec,
-            "cec": cec,
-            "iec": iec,
-        }
-
 
 class SocializationViewSets(BaseViewSet):
     serializer_class = SocializationSerializer
@@ -214,13 +213,32 @@ class SocializationViewSets(BaseViewSet):
             OpenApiParameter(
                 name="start_date",
                 description="Start date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
-                required=True,
+                required=False,
                 type=OpenApiTypes.STR,
             ),
             OpenApiParameter(
                 name="end_date",
                 description="End date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
-                required=True,
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="period",
+                description="YYYY-MM month or current, ranks from the score snapshots "
+                "instead of start_date and end_date",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="top",
+                description="Number of leaders to return, 5 by default",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="cursor",
+                description="next_cursor of the previous response, to continue down the ranks",
+                required=False,
                 type=OpenApiTypes.STR,
             ),
         ],
@@ -234,65 +252,7 @@ class SocializationViewSets(BaseViewSet):
     def get_organization_socialization_activity_scores(self, request, pk=None):
         """Get organization activity leaders for socialization"""
 
-        organization_id = request.query_params["organization_id"]
-        group_pk = request.query_params["group_pk"]
-
-        start_date = datetime.strptime(request.query_params["start_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
-        end_date = datetime.strptime(request.query_params["end_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
-
-        date_range = (start_date, end_date)
-
-        try:
-            group = Group.objects.get(pk=group_pk)
-        except ObjectDoesNotExist:
-            return Response(
-                {
-                    'success': False,
-                    'message': "group not found",
-                },
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        users_in_group = UserGroup.objects.filter(groups=group.pk).values_list("user", flat=True)
-
-        if not users_in_group:
-            return Response(
-                {
-                    'success': True,
-                    'message': f"{group.title} group has no member(s) attached",
-                },
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        leaders = []
-        for user in users_in_group:
-            organization_activity_scores = self.get_organization_activity_scores(
-                organization_id, group.pk, user, date_range
-            )
-            sec = organization_activity_scores["sec"]
-            tes = organization_activity_scores["tes"]
-
-            socialization_instance = organization_activity_scores["socialization_instance"]
-
-            socialization_percentage = round(
-                socialization_instance.calculate_socialization_percentage(sec, tes), 2
-            )
-
-            user, percentage = user, socialization_percentage
-
-            leaders.append({"user": User.objects.get(pk=user).full_name, "percentage": percentage})
-        
-        leaders_sorted = calculate_categorized_percentage(leaders)
-        return Response(
-            {
-                "success": True,
-                "leaders": leaders_sorted[:5],
-                "organization_id": organization_id,
-                "group": group.pk,
-                "start_date": start_date,
-                "end_date": end_date,
-            },
-            status=status.HTTP_200_OK,
-        )
+        return self.get_group_leaders(request, "socialization")
 
     @extend_schema(
         parameters=[
@@ -318,6 +278,7 @@ class SocializationViewSets(BaseViewSet):
         if serializer.is_valid(raise_exception=True):
             socialization_instances = Socialization.objects.filter(organization=organization)
             socialization_instances.update(**serializer.validated_data)
+            weights_updated.send(sender=Socialization, organization=organization)
 
             return Response(
                 {
@@ -350,13 +311,32 @@ class ExternalizationViewSets(BaseViewSet):
             OpenApiParameter(
                 name="start_date",
                 description="Start date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
-                required=True,
+                required=False,
                 type=OpenApiTypes.STR,
             ),
             OpenApiParameter(
                 name="end_date",
                 description="End date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
-                required=True,
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="period",
+                description="YYYY-MM month or current, ranks from the score snapshots "
+                "instead of start_date and end_date",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="top",
+                description="Number of leaders to return, 5 by default",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="cursor",
+                description="next_cursor of the previous response, to continue down the ranks",
+                required=False,
                 type=OpenApiTypes.STR,
             ),
         ],
@@ -370,63 +350,7 @@ class ExternalizationViewSets(BaseViewSet):
     def get_organization_externalization_activity_scores(self, request, pk=None):
         """Get organization activity leaders for externalization"""
 
-        organization_id = request.query_params["organization_id"]
-        group_pk = request.query_params["group_pk"]
-
-        start_date = datetime.strptime(request.query_params["start_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
-        end_date = datetime.strptime(request.query_params["end_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
-
-        date_range = (start_date, end_date)
-
-        try:
-            group = Group.objects.get(pk=group_pk)
-        except ObjectDoesNotExist:
-            return Response(
-                {
-                    'success': False,
-                    'message': "group not found",
-                },
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        users_in_group = UserGroup.objects.filter(groups=group.pk).values_list("user", flat=True)
-
-        if not users_in_group:
-            return Response(
-                {
-                    'success': True,
-                    'message': f"{group.title} group has no member(s) attached",
-                },
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        leaders = []
-        for user in users_in_group:
-            organization_activity_scores = self.get_organization_activity_scores(
-                organization_id, group.pk, user, date_range
-            )
-            eec = organization_activity_scores["eec"]
-            tes = organization_activity_scores["tes"]
-
-            externalization_instance = organization_activity_scores["externalization_instance"]
-            externalization_percentage = round(
-                externalization_instance.calculate_externalization_percentage(eec, tes), 2
-            )
-
-            user, percentage = user, externalization_percentage
-
-            leaders.append({"user": User.objects.get(pk=user).full_name, "percentage": percentage})
-        
-        leaders_sorted = calculate_categorized_percentage(leaders)
-        return Response(
-            {
-                "success": True,
-                "leaders": leaders_sorted[:5],
-                "organization_id": organization_id,
-                "group": group.pk,
-                "start_date": start_date,
-                "end_date": end_date,
-            },
-            status=status.HTTP_200_OK,
-        )
+        return self.get_group_leaders(request, "externalization")
 
     @extend_schema(
         parameters=[
@@ -452,6 +376,7 @@ class ExternalizationViewSets(BaseViewSet):
         if serializer.is_valid(raise_exception=True):
             externalization_instance = Externalization.objects.filter(organization=organization)
             externalization_instance.update(**serializer.validated_data)
+            weights_updated.send(sender=Externalization, organization=organization)
 
             return Response(
                 {
@@ -484,13 +409,32 @@ class CombinationViewSets(BaseViewSet):
             OpenApiParameter(
                 name="start_date",
                 description="Start date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
-                required=True,
+                required=False,
                 type=OpenApiTypes.STR,
             ),
             OpenApiParameter(
                 name="end_date",
                 description="End date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
-                required=True,
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="period",
+                description="YYYY-MM month or current, ranks from the score snapshots "
+                "instead of start_date and end_date",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="top",
+                description="Number of leaders to return, 5 by default",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="cursor",
+                description="next_cursor of the previous response, to continue down the ranks",
+                required=False,
                 type=OpenApiTypes.STR,
             ),
         ],
@@ -504,66 +448,7 @@ class CombinationViewSets(BaseViewSet):
     def get_organization_combination_activity_scores(self, request, pk=None):
         """Get organization activity leaders for combination"""
 
-        organization_id = request.query_params["organization_id"]
-        group_pk = request.query_params["group_pk"]
-
-        start_date = datetime.strptime(request.query_params["start_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
-        end_date = datetime.strptime(request.query_params["end_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
-
-        date_range = (start_date, end_date)
-
-        try:
-            group = Group.objects.get(pk=group_pk)
-        except ObjectDoesNotExist:
-            return Response(
-                {
-                    'success': False,
-                    'message': "group not found",
-                },
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        users_in_group = UserGroup.objects.filter(groups=group.pk).values_list("user", flat=True)
-
-        if not users_in_group:
-            return Response(
-                {
-                    'success': True,
-                    'message': f"{group.title} group has no member(s) attached",
-                },
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        leaders = []
-        for user in users_in_group:
-            organization_activity_scores = self.get_organization_activity_scores(
-                organization_id, group.pk, user, date_range
-            )
-            cec = organization_activity_scores["cec"]
-            tes = organization_activity_scores["tes"]
-
-            combination_instance = organization_activity_scores["combination_instance"]
-
-            combination_percentage = round(
-                combination_instance.calculate_combination_percentage(cec, tes), 2
-            )
-
-            user, percentage = user, combination_percentage
-
-            leaders.append({"user": User.objects.get(pk=user).full_name, "percentage": percentage})
-        
-        leaders_sorted=calculate_categorized_percentage(leaders)
-
-        return Response(
-            {
-                "success": True,
-                "leaders": leaders_sorted[:5],
-                "organization_id": organization_id,
-                "group": group.pk,
-                "start_date": start_date,
-                "end_date": end_date,
-            },
-            status=status.HTTP_200_OK,
-        )
+        return self.get_group_leaders(request, "combination")
 
     @extend_schema(
         parameters=[
@@ -589,6 +474,7 @@ class CombinationViewSets(BaseViewSet):
         if serializer.is_valid(raise_exception=True):
             combination_instances = Combination.objects.filter(organization=organization)
             combination_instances.update(**serializer.validated_data)
+            weights_updated.send(sender=Combination, organization=organization)
 
             return Response(
                 {
@@ -621,13 +507,32 @@ class InternalizationViewSets(BaseViewSet):
             OpenApiParameter(
                 name="start_date",
                 description="Start date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
-                required=True,
+                required=False,
                 type=OpenApiTypes.STR,
             ),
             OpenApiParameter(
                 name="end_date",
                 description="End date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
-                required=True,
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="period",
+                description="YYYY-MM month or current, ranks from the score snapshots "
+                "instead of start_date and end_date",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="top",
+                description="Number of leaders to return, 5 by default",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="cursor",
+                description="next_cursor of the previous response, to continue down the ranks",
+                required=False,
                 type=OpenApiTypes.STR,
             ),
         ],
@@ -641,60 +546,195 @@ class InternalizationViewSets(BaseViewSet):
     def get_organization_internalization_activity_scores(self, request, pk=None):
         """Get organization activity leaders for internalization"""
 
-        organization_id = request.query_params["organization_id"]
-        group_pk = request.query_params["group_pk"]
+        return self.get_group_leaders(request, "internalization")
 
-        start_date = datetime.strptime(request.query_params["start_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
-        end_date = datetime.strptime(request.query_params["end_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
-
-        date_range = (start_date, end_date)
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="organization_id",
+                description="organization_id",
+                required=True,
+                type=OpenApiTypes.STR,
+            ),
+        ],
+    )
+    @action(
+        methods=['POST'],
+        detail=False,
+        permission_classes=[IsAdminOrUser],
+        serializer_class=InternalizationUpdaterSerializer,
+        url_path="set-general-internalization-activities-score",
+    )
+    def set_general_activities_score_for_organization_externalization(self, request, pk=None):
+        organization_id = request.query_params["organization_id"]
+        organization = get_object_or_404(Organization, organization_id=organization_id)
+        serializer = InternalizationUpdaterSerializer(data=request.data)
+        if serializer.is_valid(raise_exception=True):
+            internalization_instances = Internalization.objects.filter(organization=organization)
+            internalization_instances.update(**serializer.validated_data)
+            weights_updated.send(sender=Internalization, organization=organization)
 
-        try:
-            group = Group.objects.get(pk=group_pk)
-        except ObjectDoesNotExist:
             return Response(
                 {
-                    'success': False,
-                    'message': "group not found",
+                    "success": True,
+                    "data": InternalizationSerializer(internalization_instances, many=True).data,
                 },
-                status=status.HTTP_404_NOT_FOUND,
+                status=status.HTTP_200_OK,
             )
+        return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        users_in_group = UserGroup.objects.filter(groups=group.pk).values_list("user", flat=True)
 
-        if not users_in_group:
-            return Response(
-                {
-                    'success': True,
-                    'message': f"{group.title} group has no member(s) attached",
-                },
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        leaders = []
+class SECIViewSets(LeaderboardMixin, viewsets.GenericViewSet):
+    permission_classes = [IsAdminOrUser]
+    max_trend_buckets = 400
 
-        for user in users_in_group:
-            organization_activity_scores = self.get_organization_activity_scores(
-                organization_id, group.pk, user, date_range
-            )
-            iec = organization_activity_scores["iec"]
-            tes = organization_activity_scores["tes"]
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="organization_id",
+                description="organization_id",
+                required=True,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="group_pk",
+                description="group_pk",
+                required=True,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="start_date",
+                description="Start date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="end_date",
+                description="End date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="period",
+                description="YYYY-MM month or current, ranks from the score snapshots "
+                "instead of start_date and end_date",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="top",
+                description="Number of leaders to return per dimension, 5 by default",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+            OpenApiParameter(
+                name="cursor",
+                description="next_cursor of the previous response, to continue down the ranks",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+        ],
+        responses={200: None},
+    )
+    @action(
+        methods=['GET'],
+        detail=False,
+        serializer_class=None,
+    )
+    def get_organization_seci_activity_scores(self, request, pk=None):
+        """Get organization activity leaders for all four SECI dimensions at once"""
+
+        return self.get_group_leaders(request)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="organization_id",
+                description="organization_id",
+                required=True,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="group_pk",
+                description="Only the activity within this group",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="user_id",
+                description="Only the activity of this user",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="start_date",
+                description="Start date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
+                required=True,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="end_date",
+                description="End date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
+                required=True,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="interval",
+                description="day, week or month, day by default",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+        ],
+        responses={200: None},
+    )
+    @action(
+        methods=['GET'],
+        detail=False,
+        serializer_class=None,
+        url_path='get-seci-trends',
+    )
+    def get_seci_trends(self, request, pk=None):
+        """SECI scores and percentages of an organization, group or user per day, week or month"""
+
+        organization_id = request.query_params["organization_id"]
+        start_date = datetime.strptime(request.query_params["start_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
+        end_date = datetime.strptime(request.query_params["end_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
+        date_range = (start_date, end_date)
 
-            internalization_instance = organization_activity_scores["internalization_instance"]
-            internalization_percentage = round(
-                internalization_instance.calculate_internalization_percentage(iec, tes), 2
+        interval = request.query_params.get("interval", "day")
+        if interval not in INTERVALS:
+            raise ValidationError(
+                detail=f"interval must be one of {', '.join(INTERVALS)}",
+                code=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(get_buckets(date_range, interval)) > self.max_trend_buckets:
+            raise ValidationError(
+                detail=f"A trend has at most {self.max_trend_buckets} {interval}s, "
+                "narrow the dates or widen the interval",
+                code=status.HTTP_400_BAD_REQUEST,
             )
 
-            user, percentage = user, internalization_percentage
+        organization = get_object_or_404(Organization, organization_id=organization_id).pk
+        scope = {}
+        if request.query_params.get("group_pk"):
+            scope["group"] = get_object_or_404(
+                Group, pk=request.query_params["group_pk"], organization_id=organization_id
+            )
+        if request.query_params.get("user_id"):
+            scope["users"] = [
+                get_object_or_404(
+                    User, pk=request.query_params["user_id"], organization_id=organization_id
+                )
+            ]
 
-            leaders.append({"user": User.objects.get(pk=user).full_name, "percentage": percentage})
-        
-        leaders_sorted = calculate_categorized_percentage(leaders)
         return Response(
             {
                 "success": True,
-                "leaders": leaders_sorted[:5],
                 "organization_id": organization_id,
-                "group": group.pk,
+                "group": request.query_params.get("group_pk"),
+                "user": request.query_params.get("user_id"),
+                "interval": interval,
+                "series": get_seci_trend(date_range, interval, organization, **scope),
                 "start_date": start_date,
                 "end_date": end_date,
             },
@@ -709,28 +749,58 @@ class InternalizationViewSets(BaseViewSet):
                 required=True,
                 type=OpenApiTypes.STR,
             ),
+            OpenApiParameter(
+                name="start_date",
+                description="Start date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
+                required=True,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="end_date",
+                description="End date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
+                required=True,
+                type=OpenApiTypes.STR,
+            ),
         ],
+        responses={200: None},
     )
     @action(
-        methods=['POST'],
+        methods=['GET'],
         detail=False,
-        permission_classes=[IsAdminOrUser],
-        serializer_class=InternalizationUpdaterSerializer,
-        url_path="set-general-internalization-activities-score",
+        serializer_class=None,
+        url_path='get-organization-seci-details',
     )
-    def set_general_activities_score_for_organization_externalization(self, request, pk=None):
+    def get_organization_seci_details(self, request, pk=None):
+        """SECI scores and percentages of every group of an organization and of the
+        organization as a whole"""
+
         organization_id = request.query_params["organization_id"]
+        start_date = datetime.strptime(request.query_params["start_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
+        end_date = datetime.strptime(request.query_params["end_date"], "%Y-%m-%dT%H:%M:%S.%fZ")
+
         organization = get_object_or_404(Organization, organization_id=organization_id)
-        serializer = InternalizationUpdaterSerializer(data=request.data)
-        if serializer.is_valid(raise_exception=True):
-            internalization_instances = Internalization.objects.filter(organization=organization)
-            internalization_instances.update(**serializer.validated_data)
+        groups = list(Group.objects.filter(organization_id=organization_id).order_by("pk"))
+        details, missing, totals = get_organization_seci_details(
+            organization, groups, (start_date, end_date)
+        )
 
-            return Response(
-                {
-                    "success": True,
-                    "data": InternalizationSerializer(internalization_instances, many=True).data,
-                },
-                status=status.HTTP_200_OK,
-            )
-        return Response(data=serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        group_details = []
+        for group in groups:
+            entry = {"group": group.pk, "title": group.title, "seci_details": details[group.pk]}
+            if group.pk in missing:
+                entry["message"] = (
+                    f"Group {group.pk} have no {missing[group.pk]} activities constants"
+                )
+            group_details.append(entry)
+
+        return Response(
+            {
+                "success": True,
+                "organization_id": organization_id,
+                "groups": group_details,
+                "seci_details": totals,
+                "start_date": start_date,
+                "end_date": end_date,
+            },
+            status=status.HTTP_200_OK,
+        )
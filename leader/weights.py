@@ -0,0 +1,150 @@
+import hashlib
+from threading import Lock
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
+from uuid import uuid4
+from django.core.cache import cache
+from django.db import models
+from simpleblog.utils import build_weight_matrix
+from .models import Socialization, Externalization, Combination, Internalization
+
+WEIGHT_MODELS = {
+    "socialization": Socialization,
+    "externalization": Externalization,
+    "combination": Combination,
+    "internalization": Internalization,
+}
+
+
+class WeightProfile(NamedTuple):
+    """The four SECI weight rows of a group, None for a dimension that has no row"""
+
+    socialization: Optional[Mapping]
+    externalization: Optional[Mapping]
+    combination: Optional[Mapping]
+    internalization: Optional[Mapping]
+    matrix: Optional[tuple]
+
+    @property
+    def missing(self):
+        """Name of the first dimension without weights, None when the profile is complete"""
+        return next((name for name in WEIGHT_MODELS if getattr(self, name) is None), None)
+
+    @property
+    def fingerprint(self):
+        """Digest of the weight matrix, empty when the profile is incomplete"""
+        if self.matrix is None:
+            return ""
+        return hashlib.sha1(repr(self.matrix).encode()).hexdigest()
+
+
+# (organization pk, group pk) -> (generation, WeightProfile), shared by every thread of a process
+_profiles = {}
+_profiles_lock = Lock()
+
+
+def get_pk(value):
+    return getattr(value, "pk", value)
+
+
+def get_generation_key(organization):
+    return f"seci-weight-profiles:{organization}"
+
+
+def get_weight_fields(model):
+    return [field.name for field in model._meta.fields if isinstance(field, models.DecimalField)]
+
+
+def build_weight_profile(dimensions):
+    matrix = None
+    if all(weights is not None for weights in dimensions.values()):
+        matrix = tuple(tuple(row) for row in build_weight_matrix(*dimensions.values()))
+    return WeightProfile(matrix=matrix, **dimensions)
+
+
+def load_weight_profile(organization, group):
+    dimensions = {}
+    for name, model in WEIGHT_MODELS.items():
+        weights = (
+            model.objects.filter(organization=organization, group=group)
+            .values(*get_weight_fields(model))
+            .first()
+        )
+        dimensions[name] = MappingProxyType(weights) if weights is not None else None
+    return build_weight_profile(dimensions)
+
+
+def load_organization_weight_profiles(organization, groups):
+    """Weight profiles of several groups of an organization, one query per weight table"""
+
+    dimensions = {group: dict.fromkeys(WEIGHT_MODELS) for group in groups}
+    for name, model in WEIGHT_MODELS.items():
+        fields = get_weight_fields(model)
+        rows = model.objects.filter(organization=organization, group__in=groups).order_by("pk")
+        for row in rows.values("group", *fields):
+            # The first row of a group wins, like the .first() of load_weight_profile
+            group = row.pop("group")
+            if dimensions[group][name] is None:
+                dimensions[group][name] = MappingProxyType(row)
+    return {group: build_weight_profile(dimensions[group]) for group in groups}
+
+
+def get_weight_profile(organization, group):
+    """Cached weight profile of a group, loaded from the database only after a change
+
+    Every process keeps its own copy, a generation stamp in the Django cache lets
+    invalidate_weight_profiles reach the other processes sharing that cache, which
+    leader.checks requires to be shared between processes.
+    """
+    organization, group = get_pk(organization), get_pk(group)
+    generation = cache.get(get_generation_key(organization))
+
+    cached = _profiles.get((organization, group))
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+
+    profile = load_weight_profile(organization, group)
+    with _profiles_lock:
+        _profiles[(organization, group)] = (generation, profile)
+    return profile
+
+
+def get_organization_weight_profiles(organization, groups):
+    """Cached weight profiles of several groups of an organization as {group pk: profile},
+    the ones not cached are loaded together in one query per weight table"""
+
+    organization, groups = get_pk(organization), [get_pk(group) for group in groups]
+    generation = cache.get(get_generation_key(organization))
+
+    profiles, stale = {}, []
+    for group in groups:
+        cached = _profiles.get((organization, group))
+        if cached is not None and cached[0] == generation:
+            profiles[group] = cached[1]
+        else:
+            stale.append(group)
+
+    if stale:
+        loaded = load_organization_weight_profiles(organization, stale)
+        with _profiles_lock:
+            for group, profile in loaded.items():
+                _profiles[(organization, group)] = (generation, profile)
+        profiles.update(loaded)
+    return profiles
+
+
+def invalidate_weight_profiles(organization, group=None):
+    """Drop the cached profiles of a group, or of every group of an organization"""
+    organization, group = get_pk(organization), get_pk(group)
+
+    with _profiles_lock:
+        for key in list(_profiles):
+            if key[0] == organization and (group is None or key[1] == group):
+                del _profiles[key]
+    cache.set(get_generation_key(organization), uuid4().hex, None)
+
+
+def clear_weight_profiles():
+    """Forget every cached profile of this process"""
+    with _profiles_lock:
+        _profiles.clear()
@@ -0,0 +1,102 @@
+from django.db.models import CharField, Count, F, IntegerField, Value
+from accounts.models import User
+from blog.models import Blog
+from browser_history.models import BrowserHistory
+from forum.models import Forum
+from group.models import Group, UserGroup
+from in_app_chat.models import InAppChat
+from resource.models import RESOURCE_TYPES, Resources
+from topics.models import Topic
+
+# (total name, model, field splitting the total by type) of the activity totals
+ACTIVITY_TOTALS = [
+    ("total_blogs", Blog, None),
+    ("total_forums", Forum, None),
+    ("total_topics", Topic, None),
+    ("total_browser_histories", BrowserHistory, None),
+    ("total_chats", InAppChat, None),
+    ("total_resources", Resources, "type"),
+]
+
+
+def count_by_group(queryset, name, type_field=None):
+    row_type = F(type_field) if type_field else Value("", output_field=CharField())
+    return (
+        queryset.order_by()
+        .annotate(total_name=Value(name, output_field=CharField()), row_type=row_type)
+        .values("total_name", "group", "row_type")
+        .annotate(total=Count("pk"))
+        .values_list("total_name", "group", "row_type", "total")
+    )
+
+
+def get_empty_totals():
+    totals = {"total_members": 0}
+    for name, _, type_field in ACTIVITY_TOTALS:
+        if type_field:
+            totals[name] = {resource_type: 0 for resource_type, _ in RESOURCE_TYPES}
+        else:
+            totals[name] = 0
+    return totals
+
+
+def get_organization_stats(organization, date_range=None):
+    """Totals behind the get-total-* endpoints of an organization, overall and per group
+
+    Every total is counted by one UNION ALL of grouped counts. date_range limits the activity
+    totals to rows created within it, member totals are always current.
+    """
+    activity_filters = {"organization": organization}
+    if date_range is not None:
+        activity_filters["created_at__range"] = date_range
+
+    organization_members = (
+        User.objects.filter(organization_id=organization.organization_id)
+        .order_by()
+        .annotate(
+            total_name=Value("organization_members", output_field=CharField()),
+            group=Value(None, output_field=IntegerField()),
+            row_type=Value("", output_field=CharField()),
+        )
+        .values("total_name", "group", "row_type")
+        .annotate(total=Count("pk"))
+        .values_list("total_name", "group", "row_type", "total")
+    )
+    memberships = UserGroup.groups.through.objects.filter(
+        group__organization_id=organization.organization_id
+    )
+    group_members = count_by_group(memberships, "total_members")
+    activity = [
+        count_by_group(model.objects.filter(**activity_filters), name, type_field)
+        for name, model, type_field in ACTIVITY_TOTALS
+    ]
+
+    groups = {
+        group["pk"]: {"group": group["pk"], "group_name": group["title"], **get_empty_totals()}
+        for group in Group.objects.filter(organization_id=organization.organization_id).values(
+            "pk", "title"
+        )
+    }
+    totals = get_empty_totals()
+
+    for name, group, row_type, total in organization_members.union(
+        group_members, *activity, all=True
+    ):
+        if name == "organization_members":
+            totals["total_members"] = total
+            continue
+
+        targets = [groups[group]] if group in groups else []
+        if name != "total_members":
+            targets.append(totals)
+        for target in targets:
+            if row_type:
+                target[name][row_type] = target[name].get(row_type, 0) + total
+            else:
+                target[name] += total
+
+    # Every chat has one sender and one receiver, both totals count the same rows
+    for stats in [totals, *groups.values()]:
+        stats["total_incoming_chats"] = stats["total_outgoing_chats"] = stats.pop("total_chats")
+
+    return {**totals, "groups": list(groups.values())}
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+import pytest
+from django.urls import reverse
+from accounts.tests.factories import UserFactory
+from blog.models import Blog
+from in_app_chat.models import InAppChat
+from resource.models import Resources
+from leader.tests.factories import OrganizationFactory, GroupFactory, UserGroupFactory
+
+pytestmark = pytest.mark.django_db
+
+STATS_URL = reverse("organization:organization-get-organization-stats")
+
+
+@pytest.fixture
+def organization_activity():
+    organization = OrganizationFactory()
+    group, other_group = GroupFactory.create_batch(
+        2, organization_id=organization.organization_id
+    )
+    admin = UserFactory(role_id=2, organization_id=organization.organization_id)
+    member, other_member = UserFactory.create_batch(
+        2, role_id=3, organization_id=organization.organization_id
+    )
+    UserGroupFactory(user=member, groups=[group, other_group])
+    UserGroupFactory(user=other_member, groups=[group])
+
+    scope = {"organization": organization, "group": group}
+    old_blog = Blog.objects.create(author=member, **scope)
+    Blog.objects.filter(pk=old_blog.pk).update(created_at=datetime(2020, 1, 1, tzinfo=timezone.utc))
+    Blog.objects.create(author=member, **scope)
+    Blog.objects.create(author=member, organization=organization, group=other_group)
+    InAppChat.objects.create(sender=member, receiver=other_member, **scope)
+    InAppChat.objects.create(sender=member, receiver=other_member, organization=organization)
+    Resources.objects.create(sender=member, type="VIDEO", **scope)
+    Resources.objects.create(sender=member, type="IMAGE", **scope)
+
+    # Another organization's rows stay out of the totals
+    Blog.objects.create(author=member, organization=OrganizationFactory(), group=group)
+    return organization, (group, other_group), admin
+
+
+class TestOrganizationStats:
+    def test_returns_every_total_in_one_round_trip(
+        self, api_client, organization_activity, django_assert_max_num_queries
+    ):
+        organization, (group, other_group), admin = organization_activity
+        api_client.force_authenticate(user=admin)
+
+        with django_assert_max_num_queries(3):
+            response = api_client.get(STATS_URL, {"organization": organization.pk})
+
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["total_members"] == 3
+        assert stats["total_blogs"] == 3
+        assert stats["total_incoming_chats"] == stats["total_outgoing_chats"] == 2
+        assert stats["total_resources"]["VIDEO"] == 1
+        assert stats["total_resources"]["AUDIO"] == 0
+
+        by_group = {entry["group"]: entry for entry in stats["groups"]}
+        assert by_group[group.pk]["total_members"] == 2
+        assert by_group[group.pk]["total_blogs"] == 2
+        assert by_group[group.pk]["total_incoming_chats"] == 1
+        assert by_group[group.pk]["total_resources"]["IMAGE"] == 1
+        assert by_group[other_group.pk]["total_members"] == 1
+        assert by_group[other_group.pk]["total_blogs"] == 1
+
+    def test_date_window_limits_activity_totals(self, api_client, organization_activity):
+        organization, (group, _), admin = organization_activity
+        api_client.force_authenticate(user=admin)
+
+        response = api_client.get(
+            STATS_URL,
+            {"organization": organization.pk, "start_date": "2021-01-01T00:00:00.000Z"},
+        )
+
+        stats = response.json()
+        assert stats["total_blogs"] == 2
+        assert stats["total_members"] == 3
+        by_group = {entry["group"]: entry for entry in stats["groups"]}
+        assert by_group[group.pk]["total_blogs"] == 1
+
+    def test_rejects_malformed_dates(self, api_client, organization_activity):
+        organization, _, admin = organization_activity
+        api_client.force_authenticate(user=admin)
+
+        response = api_client.get(
+            STATS_URL, {"organization": organization.pk, "end_date": "yesterday"}
+        )
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("params", [{"organization": "abc"}, {}])
+    def test_unknown_organization_is_not_found(self, api_client, organization_activity, params):
+        _, _, admin = organization_activity
+        api_client.force_authenticate(user=admin)
+
+        response = api_client.get(STATS_URL, params)
+
+        assert response.status_code == 404
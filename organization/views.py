@@ -1,3 +1,5 @@
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 from rest_framework.request import Request
 from rest_framework.response import Response
 from .models import Organization
@@ -6,6 +8,13 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, status, viewsets, filters
 from rest_framework.decorators import action
 from accounts.permissions import IsAdmin, IsSuperAdmin, IsSuperAdminOrAdmin
+from rest_framework.exceptions import ValidationError
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
+from datetime import datetime
+from .stats import get_organization_stats
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
 
 
 class OrganizationViewSets(viewsets.ModelViewSet):
@@ -28,3 +37,62 @@ class OrganizationViewSets(viewsets.ModelViewSet):
             return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="organization",
+                description="organization",
+                required=True,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="start_date",
+                description="Optional start date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="end_date",
+                description="Optional end date in the format 'YYYY-MM-DD'T'HH:mm:ss.SSS'Z'",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+        ],
+        responses={200: None},
+    )
+    @action(
+        methods=['GET'],
+        detail=False,
+        serializer_class=None,
+        url_path='get-organization-stats',
+    )
+    def get_organization_stats(self, request, pk=None):
+        """Get every get-total-* total of an organization, overall and by group"""
+
+        try:
+            organization = get_object_or_404(
+                Organization, pk=request.query_params.get("organization")
+            )
+        except ValueError:
+            raise Http404("No Organization matches the given query.")
+
+        start_date = request.query_params.get("start_date")
+        end_date = request.query_params.get("end_date")
+        date_range = None
+        if start_date or end_date:
+            try:
+                date_range = (
+                    datetime.strptime(start_date or "0001-01-01T00:00:00.000Z", DATE_FORMAT),
+                    datetime.strptime(end_date or "9999-12-31T23:59:59.999Z", DATE_FORMAT),
+                )
+            except ValueError:
+                raise ValidationError(
+                    detail="start_date and end_date must look like 2024-01-31T00:00:00.000Z",
+                    code=status.HTTP_400_BAD_REQUEST,
+                )
+
+        return Response(
+            {"success": True, **get_organization_stats(organization, date_range)},
+            status=status.HTTP_200_OK,
+        )
@@ -1,8 +1,10 @@
 from django.contrib import admin
 
-from .models import Resources
+from .models import MediaDeletion, MediaUpload, Resources
 
 # Register your models here.
 
 
 admin.site.register(Resources)
+admin.site.register(MediaUpload)
+admin.site.register(MediaDeletion)
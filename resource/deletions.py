@@ -0,0 +1,99 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import MediaDeletion
+from .storage import get_media_storage
+
+logger = logging.getLogger(__name__)
+
+
+def queue_deletions(cloud_ids, resource_type="image"):
+    """Queue stored files for the purge worker, it commits or rolls back with the caller"""
+
+    return MediaDeletion.objects.bulk_create(
+        MediaDeletion(cloud_id=cloud_id, resource_type=resource_type)
+        for cloud_id in set(cloud_ids)
+        if cloud_id
+    )
+
+
+def delete_with_media(instance, cloud_ids, resource_type="image"):
+    """Delete a row and queue its stored files in one transaction"""
+
+    with transaction.atomic():
+        queue_deletions(cloud_ids, resource_type)
+        instance.delete()
+
+
+def get_retry_delay(attempts):
+    """Seconds to wait before the next attempt, doubling with every failed one"""
+    return settings.MEDIA_DELETION_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def claim_due_deletions(batch_size):
+    """Pending deletions that are due, leased to this worker so no other worker takes them too"""
+
+    now = timezone.now()
+    with transaction.atomic():
+        due = MediaDeletion.objects.filter(status="PENDING", next_attempt_at__lte=now)
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        deletions = list(due.order_by("next_attempt_at", "pk")[:batch_size])
+        MediaDeletion.objects.filter(pk__in=[deletion.pk for deletion in deletions]).update(
+            next_attempt_at=now + timedelta(seconds=settings.MEDIA_DELETION_LEASE)
+        )
+    return deletions
+
+
+def record_failures(deletions, error):
+    now = timezone.now()
+    for deletion in deletions:
+        deletion.attempts += 1
+        deletion.last_error = error
+        if deletion.attempts >= settings.MEDIA_DELETION_MAX_ATTEMPTS:
+            deletion.status = "FAILED"
+            logger.error("Giving up deleting %s: %s", deletion.cloud_id, error)
+        else:
+            deletion.next_attempt_at = now + timedelta(seconds=get_retry_delay(deletion.attempts))
+        deletion.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+
+
+def purge_deletions_batch(batch_size=None):
+    """Delete up to batch_size due files with as few storage calls as each resource type allows
+
+    Returns (deleted, failed).
+    """
+    storage = get_media_storage()
+    by_resource_type = defaultdict(list)
+    for deletion in claim_due_deletions(batch_size or settings.MEDIA_DELETION_BATCH_SIZE):
+        by_resource_type[deletion.resource_type].append(deletion)
+
+    chunks = [
+        (resource_type, deletions[start:start + storage.max_destroy_batch])
+        for resource_type, deletions in by_resource_type.items()
+        for start in range(0, len(deletions), storage.max_destroy_batch)
+    ]
+    deleted, failed = [], []
+    for resource_type, deletions in chunks:
+        try:
+            gone = storage.destroy_many(
+                [deletion.cloud_id for deletion in deletions], resource_type=resource_type
+            )
+        except Exception as error:
+            logger.warning("Deleting %s %s files failed: %s", len(deletions), resource_type, error)
+            record_failures(deletions, str(error))
+            failed.extend(deletions)
+            continue
+
+        deleted.extend(deletion.pk for deletion in deletions if deletion.cloud_id in gone)
+        left = [deletion for deletion in deletions if deletion.cloud_id not in gone]
+        record_failures(left, "Not deleted by the storage backend")
+        failed.extend(left)
+
+    MediaDeletion.objects.filter(pk__in=deleted).update(
+        status="DELETED", deleted_at=timezone.now(), last_error=""
+    )
+    return len(deleted), len(failed)
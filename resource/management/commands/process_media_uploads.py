@@ -0,0 +1,46 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from resource.uploads import process_due_uploads
+
+
+class Command(BaseCommand):
+    help = "Upload the staged resource and profile image files with a pool of workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Upload what is due and exit instead of polling"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.MEDIA_UPLOAD_WORKERS,
+            help="Uploads run at the same time",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.MEDIA_UPLOAD_BATCH_SIZE,
+            help="Most uploads claimed per batch",
+        )
+
+    def handle(self, *args, **options):
+        total_uploaded = total_failed = 0
+
+        try:
+            while True:
+                uploaded, failed = process_due_uploads(options["workers"], options["batch_size"])
+                total_uploaded += uploaded
+                total_failed += failed
+
+                # Full batches are followed straight away, otherwise wait for new uploads
+                if uploaded + failed < options["batch_size"]:
+                    if options["once"]:
+                        break
+                    time.sleep(settings.MEDIA_UPLOAD_POLL_INTERVAL)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Uploaded {total_uploaded} files, {total_failed} failed attempts")
+        )
@@ -0,0 +1,46 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from resource.deletions import purge_deletions_batch
+from resource.models import MediaDeletion
+
+
+class Command(BaseCommand):
+    help = "Delete the stored files queued for deletion, in bulk batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Delete what is due and exit instead of polling"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.MEDIA_DELETION_BATCH_SIZE,
+            help="Most files deleted per batch",
+        )
+
+    def handle(self, *args, **options):
+        total_deleted = total_failed = 0
+
+        try:
+            while True:
+                deleted, failed = purge_deletions_batch(options["batch_size"])
+                total_deleted += deleted
+                total_failed += failed
+
+                # Full batches are followed straight away, otherwise wait for new deletions
+                if deleted + failed < options["batch_size"]:
+                    if options["once"]:
+                        break
+                    time.sleep(settings.MEDIA_DELETION_POLL_INTERVAL)
+        except KeyboardInterrupt:
+            pass
+
+        given_up = MediaDeletion.objects.filter(status="FAILED").count()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {total_deleted} files, {total_failed} failed attempts")
+        )
+        if given_up:
+            self.stdout.write(
+                self.style.WARNING(f"{given_up} files could not be deleted, see MediaDeletion")
+            )
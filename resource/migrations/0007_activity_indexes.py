@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("group", "0003_usergroup_unique_user_per_group"),
+        ("organization", "0002_alter_organization_organization_id_and_more"),
+        ("platforms", "0001_initial"),
+        ("resource", "0006_alter_resources_type_delete_type"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="resources",
+            index=models.Index(
+                fields=["organization", "group", "created_at"],
+                name="resource_org_group_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="resources",
+            index=models.Index(
+                fields=["sender", "created_at"], name="resource_sender_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="resources",
+            index=models.Index(
+                fields=["type", "organization"], name="resource_type_org_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="resources",
+            index=models.Index(
+                fields=["group", "type"], name="resource_group_type_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:56
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resource", "0009_media_deletions"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="mediaupload",
+            name="replaces_cloud_id",
+        ),
+    ]
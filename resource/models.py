@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from platforms.models import Platform
 from organization.models import Organization
 from group.models import Group
@@ -11,6 +12,16 @@ RESOURCE_TYPES = (
     ("DOCUMENT", "DOCUMENT"),
     ("OTHERS", "OTHERS"),
 )
+UPLOAD_STATUS = (
+    ("PENDING", "PENDING"),
+    ("UPLOADED", "UPLOADED"),
+    ("FAILED", "FAILED"),
+)
+DELETION_STATUS = (
+    ("PENDING", "PENDING"),
+    ("DELETED", "DELETED"),
+    ("FAILED", "FAILED"),
+)
 
 
 class Resources(models.Model):
@@ -35,6 +46,7 @@ class Resources(models.Model):
     )
     media_url = models.CharField(max_length=255, blank=True, null=True)
     cloud_id = models.CharField(max_length=255, blank=True, null=True)
+    upload_status = models.CharField(max_length=20, choices=UPLOAD_STATUS, default="UPLOADED")
     created_at = models.DateTimeField(auto_now_add=True, null=True)
     updated_at = models.DateTimeField(auto_now=True, null=True)
 
@@ -43,3 +55,70 @@ class Resources(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["organization", "group", "created_at"],
+                name="resource_org_group_created_idx",
+            ),
+            models.Index(fields=["sender", "created_at"], name="resource_sender_created_idx"),
+            models.Index(fields=["type", "organization"], name="resource_type_org_idx"),
+            models.Index(fields=["group", "type"], name="resource_group_type_idx"),
+        ]
+
+
+class MediaUpload(models.Model):
+    """A file staged on local disk, waiting for the process_media_uploads worker
+
+    The upload fills in the media of its resource, or the profile image of its user.
+    """
+
+    resource = models.ForeignKey(
+        Resources, on_delete=models.CASCADE, null=True, related_name="uploads"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, related_name="image_uploads"
+    )
+    requested_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, related_name="requested_uploads"
+    )
+    staged_path = models.CharField(max_length=500)
+    options = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=UPLOAD_STATUS, default="PENDING")
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"], name="upload_status_next_attempt_idx"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.staged_path} ({self.status})"
+
+
+class MediaDeletion(models.Model):
+    """A stored file whose row is gone, waiting for the purge_media_deletions worker"""
+
+    cloud_id = models.CharField(max_length=255)
+    resource_type = models.CharField(max_length=20, default="image")
+    status = models.CharField(max_length=20, choices=DELETION_STATUS, default="PENDING")
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    deleted_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"], name="deletion_status_attempt_idx"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.cloud_id} ({self.status})"
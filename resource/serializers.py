@@ -1,7 +1,7 @@
 from rest_framework import serializers
 
 from .models import Resources
-import cloudinary.uploader
+from .uploads import queue_upload
 from organization.models import Organization
 from group.models import Group
 from platforms.models import Platform
@@ -50,27 +50,31 @@ class CreateResourcesSerializer(serializers.ModelSerializer):
             "size",
             "media_url",
             "cloud_id",
+            "upload_status",
         ]
-        read_only_fields = ["id", "media_url", "cloud_id", "size"]
+        read_only_fields = ["id", "media_url", "cloud_id", "size", "upload_status"]
 
     def validate_file(self, value):
         if value.size > MAXIMUM_SIZE_UPLOAD:
             raise ValidationError("File size must not be more than 2MB")
         return value
 
+    def get_requesting_user(self):
+        request = self.context.get("request")
+        return getattr(request, "user", None)
+
     def create(self, validated_data):
         file = validated_data.pop('file')  # Extract 'file' from validated_data
 
-        # Upload the file to Cloudinary or your desired storage
-        upload_result = cloudinary.uploader.upload(file, resource_type='raw')
-
-        # Create a new Resources instance with the other fields
+        # The file is uploaded by the process_media_uploads worker, media_url is set once it is done
         instance = Resources.objects.create(
-            media_url=upload_result["url"],
-            cloud_id=upload_result["public_id"],
-            size=upload_result["bytes"],
+            size=file.size,
+            upload_status="PENDING",
             **validated_data,
         )
+        queue_upload(
+            file, resource=instance, requested_by=self.get_requesting_user(), resource_type='raw'
+        )
 
         return instance
 
@@ -78,16 +82,15 @@ class CreateResourcesSerializer(serializers.ModelSerializer):
         file = validated_data.pop('file', None)  # Extract 'file' from validated_data
 
         if file:
-            # Delete the old file in Cloudinary
-            cloudinary.uploader.destroy(instance.cloud_id)
-
-            # Upload the new file to Cloudinary or your desired storage
-            upload_result = cloudinary.uploader.upload(file, resource_type='raw')
-
-            # Update the media_url and cloud_id with the new values
-            instance.media_url = upload_result["url"]
-            instance.cloud_id = upload_result["public_id"]
-            instance.size = upload_result["bytes"]
+            # The old file stays in place until the worker has uploaded the new one
+            queue_upload(
+                file,
+                resource=instance,
+                requested_by=self.get_requesting_user(),
+                resource_type='raw',
+            )
+            instance.size = file.size
+            instance.upload_status = "PENDING"
 
         # Update other fields as needed
         instance.title = validated_data.get('title', instance.title)
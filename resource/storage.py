@@ -0,0 +1,72 @@
+import os
+import shutil
+from uuid import uuid4
+from django.conf import settings
+from django.utils.module_loading import import_string
+from django.utils.text import get_valid_filename
+import cloudinary.api
+import cloudinary.uploader
+
+
+class CloudinaryStorage:
+    """Uploads media to Cloudinary"""
+
+    def upload(self, path, **options):
+        result = cloudinary.uploader.upload(path, **options)
+        return {"url": result["url"], "public_id": result["public_id"], "bytes": result["bytes"]}
+
+    def destroy(self, public_id):
+        cloudinary.uploader.destroy(public_id)
+
+    # Cloudinary deletes at most 100 public ids per Admin API call
+    max_destroy_batch = 100
+
+    def destroy_many(self, public_ids, resource_type="image"):
+        """Delete files in one call, returning the public ids that are gone"""
+
+        result = cloudinary.api.delete_resources(list(public_ids), resource_type=resource_type)
+        return {
+            public_id
+            for public_id, outcome in result["deleted"].items()
+            if outcome in ("deleted", "not_found")
+        }
+
+
+class LocalStorage:
+    """Keeps media in LOCAL_MEDIA_ROOT, a stand-in for Cloudinary in development and tests"""
+
+    def upload(self, path, public_id=None, **options):
+        extension = os.path.splitext(path)[1]
+        name = get_valid_filename(public_id) if public_id else f"{uuid4().hex}{extension}"
+        os.makedirs(settings.LOCAL_MEDIA_ROOT, exist_ok=True)
+        destination = os.path.join(settings.LOCAL_MEDIA_ROOT, name)
+        shutil.copyfile(path, destination)
+        return {
+            "url": f"{settings.LOCAL_MEDIA_URL}{name}",
+            "public_id": name,
+            "bytes": os.path.getsize(destination),
+        }
+
+    def destroy(self, public_id):
+        path = os.path.join(settings.LOCAL_MEDIA_ROOT, get_valid_filename(public_id))
+        if os.path.exists(path):
+            os.remove(path)
+
+    max_destroy_batch = 100
+
+    def destroy_many(self, public_ids, resource_type="image"):
+        for public_id in public_ids:
+            self.destroy(public_id)
+        return set(public_ids)
+
+
+_storages = {}
+
+
+def get_media_storage():
+    """The storage named by MEDIA_STORAGE_BACKEND, created once per process"""
+
+    backend = settings.MEDIA_STORAGE_BACKEND
+    if backend not in _storages:
+        _storages[backend] = import_string(backend)()
+    return _storages[backend]
@@ -0,0 +1,293 @@
+import os
+from io import BytesIO, StringIO
+import pytest
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from accounts.tests.factories import UserFactory
+from blog.models import Blog
+from resource import uploads
+from resource.models import MediaDeletion, MediaUpload, Resources
+from resource.storage import LocalStorage
+from leader.tests.factories import OrganizationFactory, GroupFactory
+
+pytestmark = pytest.mark.django_db
+
+RESOURCES_URL = reverse("resource:resources-list")
+
+
+class BrokenStorage:
+    max_destroy_batch = 2
+
+    def upload(self, path, **options):
+        raise ConnectionError("storage unavailable")
+
+    def destroy_many(self, public_ids, resource_type="image"):
+        raise ConnectionError("storage unavailable")
+
+
+class CountingStorage(LocalStorage):
+    """LocalStorage that remembers its destroy_many calls and keeps keep@ files"""
+
+    max_destroy_batch = 2
+    calls = []
+
+    def destroy_many(self, public_ids, resource_type="image"):
+        CountingStorage.calls.append((sorted(public_ids), resource_type))
+        return {public_id for public_id in public_ids if not public_id.startswith("keep")}
+
+
+class DeletingStorage(LocalStorage):
+    """LocalStorage deleting the resource titled doomed while its file is uploaded"""
+
+    def upload(self, path, **options):
+        result = super().upload(path, **options)
+        Resources.objects.filter(uploads__staged_path=path, title="doomed").delete()
+        return result
+
+
+@pytest.fixture(autouse=True)
+def local_media(settings, tmp_path, monkeypatch):
+    settings.MEDIA_STORAGE_BACKEND = "resource.storage.LocalStorage"
+    settings.MEDIA_STAGING_DIR = str(tmp_path / "staging")
+    settings.LOCAL_MEDIA_ROOT = str(tmp_path / "media")
+    settings.MEDIA_UPLOAD_MAX_ATTEMPTS = 2
+    notified = []
+    monkeypatch.setattr("resource.uploads.notify_upload", notified.append)
+    return notified
+
+
+@pytest.fixture
+def sender(api_client):
+    user = UserFactory()
+    api_client.force_authenticate(user=user)
+    return user
+
+
+def process_uploads(*args):
+    call_command("process_media_uploads", "--once", *args, stdout=StringIO())
+
+
+def purge_deletions(*args):
+    call_command("purge_media_deletions", "--once", *args, stdout=StringIO())
+
+
+def post_resource(api_client, content=b"lecture notes", title="Notes"):
+    return api_client.post(
+        RESOURCES_URL,
+        {"title": title, "type": "DOCUMENT", "file": SimpleUploadedFile("notes.txt", content)},
+        format="multipart",
+    )
+
+
+class TestMediaUploads:
+    def test_resource_is_created_before_its_file_is_uploaded(self, api_client, sender, settings):
+        response = post_resource(api_client)
+
+        assert response.status_code == 201
+        assert response.json()["upload_status"] == "PENDING"
+        assert response.json()["media_url"] is None
+        upload = MediaUpload.objects.get()
+        assert upload.requested_by == sender
+        assert os.path.exists(upload.staged_path)
+
+        process_uploads("--workers", "1")
+
+        resource = Resources.objects.get()
+        assert resource.upload_status == "UPLOADED"
+        assert resource.media_url.startswith(settings.LOCAL_MEDIA_URL)
+        assert resource.size == len(b"lecture notes")
+        assert not os.path.exists(upload.staged_path)
+
+    def test_worker_pool_uploads_a_batch(self, api_client, sender, local_media):
+        for _ in range(3):
+            post_resource(api_client)
+
+        process_uploads("--workers", "3")
+
+        assert set(Resources.objects.values_list("upload_status", flat=True)) == {"UPLOADED"}
+        assert set(MediaUpload.objects.values_list("status", flat=True)) == {"UPLOADED"}
+        assert len(local_media) == 3
+
+    def test_replaced_file_is_destroyed_after_the_new_one_is_uploaded(
+        self, api_client, sender, settings
+    ):
+        post_resource(api_client, b"first draft")
+        process_uploads("--workers", "1")
+        resource = Resources.objects.get()
+        old_file = os.path.join(settings.LOCAL_MEDIA_ROOT, resource.cloud_id)
+
+        response = api_client.patch(
+            reverse("resource:resources-detail", args=[resource.pk]),
+            {"file": SimpleUploadedFile("notes.txt", b"final")},
+            format="multipart",
+        )
+
+        assert response.json()["upload_status"] == "PENDING"
+        assert os.path.exists(old_file)
+
+        process_uploads("--workers", "1")
+
+        resource.refresh_from_db()
+        assert resource.upload_status == "UPLOADED"
+        assert resource.size == len(b"final")
+        assert MediaDeletion.objects.get().cloud_id == os.path.basename(old_file)
+
+        purge_deletions()
+
+        assert not os.path.exists(old_file)
+
+    def test_replacements_queued_together_each_destroy_the_file_before_them(
+        self, api_client, sender, settings
+    ):
+        post_resource(api_client, b"first draft")
+        process_uploads("--workers", "1")
+        resource = Resources.objects.get()
+        first = resource.cloud_id
+
+        for content in (b"second draft", b"final"):
+            api_client.patch(
+                reverse("resource:resources-detail", args=[resource.pk]),
+                {"file": SimpleUploadedFile("notes.txt", content)},
+                format="multipart",
+            )
+        process_uploads("--workers", "1")
+
+        resource.refresh_from_db()
+        assert resource.size == len(b"final")
+        destroyed = set(MediaDeletion.objects.values_list("cloud_id", flat=True))
+        assert len(destroyed) == 2
+        assert first in destroyed
+        assert resource.cloud_id not in destroyed
+
+    def test_failed_uploads_are_retried_then_given_up(
+        self, api_client, sender, settings, local_media
+    ):
+        settings.MEDIA_STORAGE_BACKEND = "resource.tests.BrokenStorage"
+        post_resource(api_client)
+
+        process_uploads("--workers", "1")
+
+        upload = MediaUpload.objects.get()
+        assert upload.status == "PENDING"
+        assert upload.attempts == 1
+        assert upload.last_error == "storage unavailable"
+        assert upload.next_attempt_at > timezone.now()
+
+        MediaUpload.objects.update(next_attempt_at=timezone.now())
+        process_uploads("--workers", "1")
+
+        upload.refresh_from_db()
+        assert upload.status == "FAILED"
+        assert Resources.objects.get().upload_status == "FAILED"
+        assert not os.path.exists(upload.staged_path)
+        assert [upload.status for upload in local_media] == ["FAILED"]
+
+    def test_resource_deleted_during_its_upload(self, api_client, sender, settings, local_media):
+        settings.MEDIA_STORAGE_BACKEND = "resource.tests.DeletingStorage"
+        post_resource(api_client, title="doomed")
+        post_resource(api_client, title="kept")
+        staged_paths = list(MediaUpload.objects.values_list("staged_path", flat=True))
+
+        process_uploads("--workers", "1")
+
+        assert list(Resources.objects.values_list("upload_status", flat=True)) == ["UPLOADED"]
+        orphan = MediaDeletion.objects.get()
+        assert os.path.exists(os.path.join(settings.LOCAL_MEDIA_ROOT, orphan.cloud_id))
+        assert not any(os.path.exists(path) for path in staged_paths)
+        assert [upload.status for upload in local_media] == ["FAILED", "UPLOADED"]
+
+    def test_one_broken_upload_does_not_stop_the_batch(self, api_client, sender, monkeypatch):
+        post_resource(api_client)
+        post_resource(api_client)
+        lock_upload_target = uploads.lock_upload_target
+        calls = []
+
+        def breaking_lock_upload_target(upload):
+            calls.append(upload.pk)
+            if len(calls) == 1:
+                raise RuntimeError("unexpected")
+            return lock_upload_target(upload)
+
+        monkeypatch.setattr(uploads, "lock_upload_target", breaking_lock_upload_target)
+
+        assert uploads.process_due_uploads() == (1, 1)
+        assert sorted(MediaUpload.objects.values_list("status", flat=True)) == [
+            "PENDING",
+            "UPLOADED",
+        ]
+
+    def test_profile_image_is_queued(self, api_client, sender):
+        image = BytesIO()
+        Image.new("RGB", (2, 2)).save(image, "PNG")
+
+        response = api_client.post(
+            reverse("user:user-update-user-image", args=[sender.pk]),
+            {"image": SimpleUploadedFile("me.png", image.getvalue(), "image/png")},
+            format="multipart",
+        )
+
+        assert response.status_code == 202
+        assert response.json()["upload"] == MediaUpload.objects.get().pk
+
+        process_uploads("--workers", "1")
+
+        sender.refresh_from_db()
+        assert sender.image_url
+        assert sender.cloud_id
+
+
+class TestMediaDeletions:
+    def test_blog_deletion_queues_its_files(self, api_client):
+        organization = OrganizationFactory()
+        group = GroupFactory(organization_id=organization.organization_id)
+        author = UserFactory(organization_id=organization.organization_id)
+        api_client.force_authenticate(user=author)
+        blog = Blog.objects.create(author=author, organization=organization, group=group)
+        blog.resources.set(
+            [Resources.objects.create(cloud_id=f"file-{number}") for number in range(3)]
+        )
+
+        response = api_client.delete(reverse("blog:blog-detail", args=[blog.pk]))
+
+        assert response.status_code == 204
+        assert not Blog.objects.exists()
+        assert sorted(MediaDeletion.objects.values_list("cloud_id", "resource_type")) == [
+            (f"file-{number}", "raw") for number in range(3)
+        ]
+
+    def test_purge_batches_calls_and_retries_leftovers(self, settings):
+        settings.MEDIA_STORAGE_BACKEND = "resource.tests.CountingStorage"
+        settings.MEDIA_DELETION_MAX_ATTEMPTS = 2
+        CountingStorage.calls = []
+        queue = ["a", "b", "keep-c"]
+        MediaDeletion.objects.bulk_create(MediaDeletion(cloud_id=cloud_id) for cloud_id in queue)
+        MediaDeletion.objects.create(cloud_id="d", resource_type="raw")
+
+        purge_deletions()
+
+        assert sorted(CountingStorage.calls) == [
+            (["a", "b"], "image"), (["d"], "raw"), (["keep-c"], "image")
+        ]
+        statuses = dict(MediaDeletion.objects.values_list("cloud_id", "status"))
+        assert statuses == {"a": "DELETED", "b": "DELETED", "keep-c": "PENDING", "d": "DELETED"}
+
+        MediaDeletion.objects.update(next_attempt_at=timezone.now())
+        purge_deletions()
+
+        kept = MediaDeletion.objects.get(cloud_id="keep-c")
+        assert kept.status == "FAILED"
+        assert kept.attempts == 2
+
+    def test_storage_errors_are_retried(self, settings):
+        settings.MEDIA_STORAGE_BACKEND = "resource.tests.BrokenStorage"
+        MediaDeletion.objects.create(cloud_id="a")
+
+        purge_deletions()
+
+        deletion = MediaDeletion.objects.get()
+        assert deletion.status == "PENDING"
+        assert deletion.last_error == "storage unavailable"
+        assert deletion.next_attempt_at > timezone.now()
@@ -0,0 +1,233 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from uuid import uuid4
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from accounts.models import User
+from .deletions import queue_deletions
+from .models import MediaUpload, Resources
+from .storage import get_media_storage
+
+logger = logging.getLogger(__name__)
+
+
+def stage_file(uploaded_file):
+    """Write an uploaded file to the staging directory, returning its path
+
+    The path is read back by the process_media_uploads worker, MEDIA_STAGING_DIR has to be
+    on storage it shares with the web processes.
+    """
+
+    os.makedirs(settings.MEDIA_STAGING_DIR, exist_ok=True)
+    extension = os.path.splitext(uploaded_file.name or "")[1]
+    path = os.path.join(settings.MEDIA_STAGING_DIR, f"{uuid4().hex}{extension}")
+    with open(path, "wb") as staged:
+        for chunk in uploaded_file.chunks():
+            staged.write(chunk)
+    return path
+
+
+def queue_upload(uploaded_file, requested_by=None, **target_and_options):
+    """Stage a file and queue its upload for a resource=... or user=... target
+
+    Other keyword arguments are passed on to the storage backend's upload. The target's file
+    at the time the upload finishes is replaced, and destroyed once the new one is in place.
+    """
+    target = {
+        key: target_and_options.pop(key)
+        for key in ["resource", "user"]
+        if key in target_and_options
+    }
+    return MediaUpload.objects.create(
+        staged_path=stage_file(uploaded_file),
+        requested_by=requested_by if getattr(requested_by, "is_authenticated", False) else None,
+        options=target_and_options,
+        **target,
+    )
+
+
+def get_retry_delay(attempts):
+    """Seconds to wait before the next attempt, doubling with every failed one"""
+    return settings.MEDIA_UPLOAD_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def claim_due_uploads(batch_size):
+    """Pending uploads that are due, leased to this worker so no other worker takes them too"""
+
+    now = timezone.now()
+    with transaction.atomic():
+        due = MediaUpload.objects.filter(status="PENDING", next_attempt_at__lte=now)
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        uploads = list(due.order_by("next_attempt_at", "pk")[:batch_size])
+        MediaUpload.objects.filter(pk__in=[upload.pk for upload in uploads]).update(
+            next_attempt_at=now + timedelta(seconds=settings.MEDIA_UPLOAD_LEASE)
+        )
+    return uploads
+
+
+def lock_upload_target(upload):
+    """The resource or user an upload is for, locked until the transaction ends, None when it
+    was deleted since the upload was queued"""
+
+    if upload.resource_id is not None:
+        return Resources.objects.select_for_update().filter(pk=upload.resource_id).first()
+    if upload.user_id is not None:
+        return User.objects.select_for_update().filter(pk=upload.user_id).first()
+    return None
+
+
+def get_current_cloud_id(target):
+    """The stored file of a locked resource or user, None when it has none"""
+
+    if isinstance(target, Resources):
+        return target.cloud_id or None
+    return target.cloud_id if target.cloud_id and target.image_url else None
+
+
+def apply_upload_result(target, result):
+    if isinstance(target, Resources):
+        target.media_url = result["url"]
+        target.cloud_id = result["public_id"]
+        target.size = result["bytes"]
+        target.upload_status = "UPLOADED"
+        target.save(
+            update_fields=["media_url", "cloud_id", "size", "upload_status", "updated_at"]
+        )
+    else:
+        target.image_url = result["url"]
+        target.cloud_id = result["public_id"]
+        target.save(update_fields=["image_url", "cloud_id"])
+
+
+def save_upload_state(upload):
+    """Write how far an upload got, False when its row went with its resource or user
+
+    Updated rather than saved, save() would insert a row deleted in the meantime again.
+    """
+    return bool(
+        MediaUpload.objects.filter(pk=upload.pk).update(
+            status=upload.status,
+            attempts=upload.attempts,
+            last_error=upload.last_error,
+            next_attempt_at=upload.next_attempt_at,
+            updated_at=timezone.now(),
+        )
+    )
+
+
+def remove_staged_file(upload):
+    try:
+        os.remove(upload.staged_path)
+    except FileNotFoundError:
+        pass
+
+
+def notify_upload(upload):
+    """Tell the uploads socket of the requesting user how an upload ended, best effort"""
+
+    if upload.requested_by_id is None:
+        return
+    try:
+        from asgiref.sync import async_to_sync
+        from channels.layers import get_channel_layer
+
+        media_url = None
+        if upload.status == "UPLOADED":
+            target = upload.resource if upload.resource_id is not None else upload.user
+            media_url = getattr(target, "media_url", None) or getattr(target, "image_url", None)
+        async_to_sync(get_channel_layer().group_send)(
+            f"uploads_{upload.requested_by_id}",
+            {
+                "type": "upload_status",
+                "upload": upload.pk,
+                "resource": upload.resource_id,
+                "user": upload.user_id,
+                "status": upload.status,
+                "media_url": media_url,
+            },
+        )
+    except Exception:
+        logger.exception("Notifying user %s of upload %s failed", upload.requested_by_id, upload.pk)
+
+
+def upload_staged_file(upload):
+    """Send a staged file to the storage backend, returning (result, error)"""
+
+    try:
+        return get_media_storage().upload(upload.staged_path, **upload.options), None
+    except Exception as error:
+        logger.warning("Uploading %s failed: %s", upload.staged_path, error)
+        return None, error
+
+
+def finish_upload(upload, result, error):
+    """Record how an upload went, returning whether it succeeded"""
+
+    upload.attempts += 1
+    if error is not None:
+        upload.last_error = str(error)
+        if upload.attempts >= settings.MEDIA_UPLOAD_MAX_ATTEMPTS:
+            upload.status = "FAILED"
+            if upload.resource_id is not None:
+                Resources.objects.filter(pk=upload.resource_id).update(upload_status="FAILED")
+            remove_staged_file(upload)
+            notify_upload(upload)
+        else:
+            upload.next_attempt_at = timezone.now() + timedelta(
+                seconds=get_retry_delay(upload.attempts)
+            )
+        if not save_upload_state(upload):
+            remove_staged_file(upload)
+        return False
+
+    resource_type = upload.options.get("resource_type", "image")
+    with transaction.atomic():
+        target = lock_upload_target(upload)
+        if target is None:
+            # The resource or user went while its file was in transit, the file goes too
+            queue_deletions([result["public_id"]], resource_type)
+            upload.status = "FAILED"
+            upload.last_error = "The resource or user of this upload was deleted"
+        else:
+            # Read under the lock, an earlier upload of the same target may have replaced the
+            # file this one was queued to replace
+            replaced = get_current_cloud_id(target)
+            apply_upload_result(target, result)
+            upload.status = "UPLOADED"
+            upload.last_error = ""
+
+            # The replaced file goes only once the new one is in place
+            if replaced and replaced != result["public_id"]:
+                queue_deletions([replaced], resource_type)
+        save_upload_state(upload)
+    remove_staged_file(upload)
+    notify_upload(upload)
+    return target is not None
+
+
+def process_due_uploads(workers=1, batch_size=None):
+    """Upload a batch of due files, returning (uploaded, failed)
+
+    The transfers run on a pool of worker threads, the database is only written from this one.
+    """
+    uploads = claim_due_uploads(batch_size or settings.MEDIA_UPLOAD_BATCH_SIZE)
+    if workers <= 1 or len(uploads) <= 1:
+        outcomes = [upload_staged_file(upload) for upload in uploads]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(upload_staged_file, uploads))
+
+    results = []
+    for upload, outcome in zip(uploads, outcomes):
+        # One upload that cannot be finished must not leave the rest of the batch to be sent
+        # again once their lease runs out
+        try:
+            results.append(finish_upload(upload, *outcome))
+        except Exception:
+            logger.exception("Finishing upload %s failed", upload.pk)
+            results.append(False)
+    return results.count(True), results.count(False)
@@ -1,6 +1,8 @@
 from rest_framework.request import Request
+from django.http import HttpResponseRedirect
 from rest_framework.response import Response
 from .models import Resources
+from counter.counts import count_rows
 from .serializers import ResourcesSerializer, CreateResourcesSerializer
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, status, viewsets, filters
@@ -8,7 +10,8 @@ from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
-import cloudinary.uploader
+from .deletions import delete_with_media
+from leader.events import record_view
 from rest_framework.parsers import MultiPartParser
 
 
@@ -24,8 +27,7 @@ class ResourcesViewSets(viewsets.ModelViewSet):
     parser_classes = [MultiPartParser]
 
     def perform_destroy(self, instance):
-        cloudinary.uploader.destroy(instance.cloud_id)
-        instance.delete()
+        delete_with_media(instance, [instance.cloud_id], resource_type="raw")
 
     def get_serializer_class(self):
         if self.action in ['update', 'create', 'partial_update']:
@@ -69,7 +71,7 @@ class ResourcesViewSets(viewsets.ModelViewSet):
         organization = request.query_params["organization"]
         resource_type = request.query_params["type"]
 
-        output = Resources.objects.filter(organization=organization, type=resource_type).count()
+        output = count_rows(Resources, organization=organization, type=resource_type)
         if not output:
             return Response(
                 {"success": False, "total_resources": 0},
@@ -102,7 +104,7 @@ class ResourcesViewSets(viewsets.ModelViewSet):
         """get total resources in the app"""
         resource_type = request.query_params["type"]
 
-        output = Resources.objects.filter(type=resource_type).count()
+        output = count_rows(Resources, type=resource_type)
         if not output:
             return Response(
                 {"success": False, "total_resources": 0},
@@ -140,7 +142,7 @@ class ResourcesViewSets(viewsets.ModelViewSet):
         """Get total for resources by groups"""
         resource_type = request.query_params["type"]
         group = request.query_params["group"]
-        output = Resources.objects.filter(group=group, type=resource_type).count()
+        output = count_rows(Resources, group=group, type=resource_type)
         if not output:
             return Response(
                 {"success": False, "total_resources": 0},
@@ -151,3 +153,17 @@ class ResourcesViewSets(viewsets.ModelViewSet):
             {"success": True, "total_resources": output},
             status=status.HTTP_200_OK,
         )
+
+    @extend_schema(responses={302: None, 409: None})
+    @action(methods=['GET'], detail=True, serializer_class=None, url_path='download')
+    def download(self, request, pk=None):
+        """Redirect to the stored file, counting a download_resources SECI activity"""
+        resource = self.get_object()
+        if not resource.media_url:
+            return Response(
+                {"success": False, "upload_status": resource.upload_status},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        record_view(request.user, "DOWNLOAD_RESOURCE", resource)
+        return HttpResponseRedirect(resource.media_url)
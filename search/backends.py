@@ -0,0 +1,348 @@
+import re
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from in_app_chat.models import InAppChat
+from .models import SearchDocument
+
+# (model, text columns from most to least important) with a full-text index kept by the database
+FULL_TEXT_INDEXES = [
+    (SearchDocument, ["title", "body"]),
+    (InAppChat, ["message"]),
+]
+
+# Matches are marked with control characters, the text is escaped before they become <mark>
+MARK_START, MARK_END = "\x02", "\x03"
+SNIPPET_WORDS = 24
+
+
+def highlight(snippet):
+    return escape(snippet).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+def get_indexed_columns(model):
+    return next(columns for indexed, columns in FULL_TEXT_INDEXES if indexed is model)
+
+
+def get_document_columns():
+    return ", ".join(f"d.{field.column}" for field in SearchDocument._meta.concrete_fields)
+
+
+class SearchResults:
+    """Ranked documents of a search, fetched a page at a time so Paginator can slice them"""
+
+    def __init__(self, backend, query, organization_id, kinds=None, group_id=None):
+        self.backend = backend
+        self.query = query
+        self.filters = {"organization_id": organization_id, "kinds": kinds, "group_id": group_id}
+
+    def count(self):
+        return self.backend.count(self.query, **self.filters)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, page):
+        start, stop = page.start or 0, page.stop
+        documents = self.backend.fetch(self.query, offset=start, limit=stop - start, **self.filters)
+        for document in documents:
+            document.snippet = highlight(document.snippet or "")
+        return documents
+
+
+class SearchBackend:
+    """Finds documents with LIKE, for databases without a full-text backend below"""
+
+    table = SearchDocument._meta.db_table
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self, table, columns):
+        """Create the full-text index of a table and the triggers feeding it"""
+
+    def backfill(self, table, columns):
+        """Index the rows of a table written before its full-text index existed"""
+
+    def filter_matches(self, queryset, query):
+        """Rows of the queryset holding every word of the query"""
+
+        columns = get_indexed_columns(queryset.model)
+        for term in query.split():
+            matches = Q()
+            for column in columns:
+                matches |= Q(**{f"{column}__icontains": term})
+            queryset = queryset.filter(matches)
+        return queryset
+
+    def search(self, query, organization_id, kinds=None, group_id=None):
+        return SearchResults(self, query, organization_id, kinds, group_id)
+
+    def get_filter_sql(self, organization_id, kinds, group_id):
+        clauses, params = ["d.organization_id = %s"], [organization_id]
+        if kinds:
+            clauses.append(f"d.kind IN ({', '.join(['%s'] * len(kinds))})")
+            params.extend(kinds)
+        if group_id is not None:
+            clauses.append("d.group_id = %s")
+            params.append(group_id)
+        return " AND ".join(clauses), params
+
+    def get_queryset(self, query, organization_id, kinds, group_id):
+        documents = SearchDocument.objects.using(self.connection.alias).filter(
+            organization_id=organization_id
+        )
+        if kinds:
+            documents = documents.filter(kind__in=kinds)
+        if group_id is not None:
+            documents = documents.filter(group_id=group_id)
+        return self.filter_matches(documents, query)
+
+    def count(self, query, **filters):
+        return self.get_queryset(query, **filters).count()
+
+    def fetch(self, query, offset, limit, **filters):
+        documents = list(
+            self.get_queryset(query, **filters).order_by("-created_at", "-pk")[
+                offset:offset + limit
+            ]
+        )
+        for document in documents:
+            document.rank = 0
+            document.snippet = " ".join(
+                f"{document.title} {document.body}".split()[:SNIPPET_WORDS]
+            )
+        return documents
+
+
+class PostgresSearchBackend(SearchBackend):
+    """tsvector column kept by a trigger, with a GIN index, ranked by ts_rank_cd"""
+
+    def get_language(self):
+        language = settings.SEARCH_LANGUAGE
+        if not re.fullmatch(r"\w+", language):
+            raise ValueError(f"Invalid SEARCH_LANGUAGE {language!r}")
+        return language
+
+    def install(self, table, columns):
+        vector = "\n|| ".join(
+            f"setweight(to_tsvector(TG_ARGV[0]::regconfig, coalesce(NEW.{column}, '')), '{weight}')"
+            for column, weight in zip(columns, "ABCD")
+        )
+        statements = [
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector",
+            f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {vector};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            """,
+            f"DROP TRIGGER IF EXISTS {table}_search_vector_update ON {table}",
+            f"""
+            CREATE TRIGGER {table}_search_vector_update
+            BEFORE INSERT OR UPDATE OF {", ".join(columns)} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector('{self.get_language()}')
+            """,
+            f"""
+            CREATE INDEX IF NOT EXISTS {table}_search_vector_idx
+            ON {table} USING GIN (search_vector)
+            """,
+        ]
+        with self.connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    def backfill(self, table, columns):
+        # Rows written before the trigger existed, in batches so large tables stay writable
+        with self.connection.cursor() as cursor:
+            while True:
+                cursor.execute(
+                    f"""
+                    UPDATE {table} SET {columns[0]} = {columns[0]} WHERE id IN (
+                        SELECT id FROM {table} WHERE search_vector IS NULL LIMIT 10000
+                    )
+                    """
+                )
+                if not cursor.rowcount:
+                    break
+
+    def filter_matches(self, queryset, query):
+        match = RawSQL(
+            f"{queryset.model._meta.db_table}.search_vector "
+            "@@ websearch_to_tsquery(%s::regconfig, %s)",
+            [self.get_language(), query],
+            output_field=BooleanField(),
+        )
+        return queryset.filter(match)
+
+    def get_match_sql(self, organization_id, kinds, group_id):
+        filter_sql, params = self.get_filter_sql(organization_id, kinds, group_id)
+        return f"d.search_vector @@ q AND {filter_sql}", params
+
+    def count(self, query, **filters):
+        match_sql, params = self.get_match_sql(**filters)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT COUNT(*) FROM {self.table} d, websearch_to_tsquery(%s::regconfig, %s) q
+                WHERE {match_sql}
+                """,
+                [self.get_language(), query, *params],
+            )
+            return cursor.fetchone()[0]
+
+    def fetch(self, query, offset, limit, **filters):
+        match_sql, params = self.get_match_sql(**filters)
+        language = self.get_language()
+        headline_options = (
+            f'StartSel="{MARK_START}", StopSel="{MARK_END}", MaxFragments=2, '
+            f"MaxWords={SNIPPET_WORDS}, MinWords=8"
+        )
+        # Headlines are the expensive part, they are only built for the rows of the page
+        sql = f"""
+            SELECT {get_document_columns()}, ranked.rank,
+                ts_headline(%s::regconfig, d.title || ' ' || d.body, ranked.q, %s) AS snippet
+            FROM (
+                SELECT d.id, ts_rank_cd(d.search_vector, q) AS rank, q
+                FROM {self.table} d, websearch_to_tsquery(%s::regconfig, %s) q
+                WHERE {match_sql}
+                ORDER BY rank DESC, d.id DESC
+                LIMIT %s OFFSET %s
+            ) ranked
+            JOIN {self.table} d ON d.id = ranked.id
+            ORDER BY ranked.rank DESC, d.id DESC
+        """
+        return list(
+            SearchDocument.objects.using(self.connection.alias).raw(
+                sql, [language, headline_options, language, query, *params, limit, offset]
+            )
+        )
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """External content FTS5 table kept by triggers, ranked by bm25"""
+
+    fts_table = f"{SearchDocument._meta.db_table}_fts"
+
+    def install(self, table, columns):
+        # A migration rebuilding the table (SQLite's AlterField) drops the triggers, install again
+        fts = f"{table}_fts"
+        names = ", ".join(columns)
+        new_values = ", ".join(f"new.{column}" for column in columns)
+        old_values = ", ".join(f"old.{column}" for column in columns)
+        statements = [
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {names}, content='{table}', content_rowid='id',
+                tokenize='porter unicode61 remove_diacritics 2'
+            )
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values});
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values});
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values});
+                INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values});
+            END
+            """,
+        ]
+        with self.connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    def backfill(self, table, columns):
+        fts = f"{table}_fts"
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def filter_matches(self, queryset, query):
+        match_query = self.get_match_query(query)
+        if not match_query:
+            return queryset.none()
+        fts = f"{queryset.model._meta.db_table}_fts"
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [match_query])
+        )
+
+    def get_match_query(self, query):
+        # Every word must match, quoted so FTS5 operators in the input are taken literally
+        return " ".join(f'"{term}"' for term in re.findall(r"\w+", query))
+
+    def get_match_sql(self, organization_id, kinds, group_id):
+        filter_sql, params = self.get_filter_sql(organization_id, kinds, group_id)
+        return f"{self.fts_table} MATCH %s AND {filter_sql}", params
+
+    def count(self, query, **filters):
+        match_query = self.get_match_query(query)
+        if not match_query:
+            return 0
+        match_sql, params = self.get_match_sql(**filters)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT COUNT(*) FROM {self.fts_table}
+                JOIN {self.table} d ON d.id = {self.fts_table}.rowid
+                WHERE {match_sql}
+                """,
+                [match_query, *params],
+            )
+            return cursor.fetchone()[0]
+
+    def fetch(self, query, offset, limit, **filters):
+        match_query = self.get_match_query(query)
+        if not match_query:
+            return []
+        match_sql, params = self.get_match_sql(**filters)
+        fts = self.fts_table
+        sql = f"""
+            SELECT {get_document_columns()}, -bm25({fts}, 2.5, 1.0) AS rank,
+                snippet({fts}, -1, %s, %s, '…', {SNIPPET_WORDS}) AS snippet
+            FROM {fts} JOIN {self.table} d ON d.id = {fts}.rowid
+            WHERE {match_sql}
+            ORDER BY rank DESC, d.id DESC
+            LIMIT %s OFFSET %s
+        """
+        return list(
+            SearchDocument.objects.using(self.connection.alias).raw(
+                sql, [MARK_START, MARK_END, match_query, *params, limit, offset]
+            )
+        )
+
+
+SEARCH_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def get_search_backend(using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    return SEARCH_BACKENDS.get(connection.vendor, SearchBackend)(connection)
+
+
+def install_search_index(using=DEFAULT_DB_ALIAS):
+    """Create every full-text index, for databases built without the migrations doing it (tests)"""
+
+    backend = get_search_backend(using)
+    for model, columns in FULL_TEXT_INDEXES:
+        backend.install(model._meta.db_table, columns)
+
+
+def backfill_search_index(using=DEFAULT_DB_ALIAS):
+    """Index the rows every full-text index is missing, the rows written before it existed"""
+
+    backend = get_search_backend(using)
+    for model, columns in FULL_TEXT_INDEXES:
+        backend.backfill(model._meta.db_table, columns)
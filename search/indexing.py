@@ -0,0 +1,65 @@
+from django.db import transaction
+from blog.models import Blog, BlogCommentReplies, Comment
+from forum.models import CommentReplies, Forum, ForumComment
+from .models import SearchDocument
+
+# (model, document kind, title field, parent field, author field) of the searchable rows
+SEARCH_SOURCES = [
+    (Blog, "BLOG", "topic", None, "author"),
+    (Comment, "BLOG_COMMENT", None, "blog", "user"),
+    (BlogCommentReplies, "BLOG_COMMENT_REPLY", None, "comment", "user"),
+    (Forum, "FORUM", "topic", None, "user"),
+    (ForumComment, "FORUM_COMMENT", None, "forum", "user"),
+    (CommentReplies, "FORUM_COMMENT_REPLY", None, "comment", "user"),
+]
+
+
+def get_search_source(model):
+    return next(source for source in SEARCH_SOURCES if source[0] is model)
+
+
+def get_document_fields(instance):
+    """Field values of the search document of a row"""
+
+    model, kind, title_field, parent_field, user_field = get_search_source(type(instance))
+    return {
+        "parent_id": getattr(instance, f"{parent_field}_id") if parent_field else None,
+        "organization_id": instance.organization_id,
+        "group_id": instance.group_id,
+        "user_id": getattr(instance, f"{user_field}_id"),
+        "title": (getattr(instance, title_field) or "") if title_field else "",
+        "body": instance.content or "",
+        "created_at": instance.created_at,
+    }
+
+
+def index_instance(instance):
+    _, kind, *_ = get_search_source(type(instance))
+    SearchDocument.objects.update_or_create(
+        kind=kind, object_id=instance.pk, defaults=get_document_fields(instance)
+    )
+
+
+def remove_instance(instance):
+    _, kind, *_ = get_search_source(type(instance))
+    SearchDocument.objects.filter(kind=kind, object_id=instance.pk).delete()
+
+
+def rebuild_search_index(batch_size=500):
+    """Rewrite every search document from its row, returning how many were written"""
+
+    written = 0
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        for model, kind, *_ in SEARCH_SOURCES:
+            documents = []
+            for instance in model.objects.order_by("pk").iterator(chunk_size=batch_size):
+                fields = get_document_fields(instance)
+                documents.append(SearchDocument(kind=kind, object_id=instance.pk, **fields))
+                if len(documents) == batch_size:
+                    SearchDocument.objects.bulk_create(documents)
+                    written += len(documents)
+                    documents = []
+            SearchDocument.objects.bulk_create(documents)
+            written += len(documents)
+    return written
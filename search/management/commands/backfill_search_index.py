@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from search.backends import backfill_search_index
+
+
+class Command(BaseCommand):
+    help = "Index the documents and chats written before their full-text index was installed"
+
+    def handle(self, *args, **options):
+        backfill_search_index()
+        self.stdout.write(self.style.SUCCESS("Backfilled the full-text indexes"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from search.backends import backfill_search_index
+from search.indexing import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rewrite the search documents of every blog, forum, comment and reply"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="Documents written per insert"
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_search_index(options["batch_size"])
+        backfill_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {written} documents"))
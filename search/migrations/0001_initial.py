@@ -0,0 +1,91 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("group", "0003_usergroup_unique_user_per_group"),
+        ("organization", "0002_alter_organization_organization_id_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("BLOG", "BLOG"),
+                            ("BLOG_COMMENT", "BLOG_COMMENT"),
+                            ("BLOG_COMMENT_REPLY", "BLOG_COMMENT_REPLY"),
+                            ("FORUM", "FORUM"),
+                            ("FORUM_COMMENT", "FORUM_COMMENT"),
+                            ("FORUM_COMMENT_REPLY", "FORUM_COMMENT_REPLY"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("object_id", models.BigIntegerField()),
+                ("parent_id", models.BigIntegerField(null=True)),
+                ("title", models.TextField(blank=True, default="")),
+                ("body", models.TextField(blank=True, default="")),
+                ("created_at", models.DateTimeField(null=True)),
+                (
+                    "group",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_documents",
+                        to="group.group",
+                    ),
+                ),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_documents",
+                        to="organization.organization",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="search_documents",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["organization", "kind"],
+                        name="search_document_org_kind_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("kind", "object_id"), name="unique_search_document"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,111 @@
+import re
+from django.conf import settings
+from django.db import migrations
+
+# The statements are frozen here rather than built by search.backends, so that later changes
+# to the backends never change what this migration did. Existing documents are indexed by
+# manage.py backfill_search_index, outside this transaction.
+
+POSTGRES_INSTALL = [
+    "ALTER TABLE search_searchdocument ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """
+    CREATE OR REPLACE FUNCTION search_searchdocument_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector(TG_ARGV[0]::regconfig, coalesce(NEW.title, '')), 'A')
+            || setweight(to_tsvector(TG_ARGV[0]::regconfig, coalesce(NEW.body, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS search_searchdocument_search_vector_update ON search_searchdocument",
+    """
+    CREATE TRIGGER search_searchdocument_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, body ON search_searchdocument
+    FOR EACH ROW EXECUTE FUNCTION search_searchdocument_search_vector('{language}')
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS search_searchdocument_search_vector_idx
+    ON search_searchdocument USING GIN (search_vector)
+    """,
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS search_searchdocument_search_vector_update ON search_searchdocument",
+    "DROP FUNCTION IF EXISTS search_searchdocument_search_vector()",
+    "ALTER TABLE search_searchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_searchdocument_fts USING fts5(
+        title, body, content='search_searchdocument', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_searchdocument_fts_insert
+    AFTER INSERT ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(rowid, title, body)
+        VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_searchdocument_fts_delete
+    AFTER DELETE ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_searchdocument_fts_update
+    AFTER UPDATE ON search_searchdocument BEGIN
+        INSERT INTO search_searchdocument_fts(search_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO search_searchdocument_fts(rowid, title, body)
+        VALUES (new.id, new.title, new.body);
+    END
+    """,
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS search_searchdocument_fts_insert",
+    "DROP TRIGGER IF EXISTS search_searchdocument_fts_delete",
+    "DROP TRIGGER IF EXISTS search_searchdocument_fts_update",
+    "DROP TABLE IF EXISTS search_searchdocument_fts",
+]
+
+
+def get_language():
+    language = settings.SEARCH_LANGUAGE
+    if not re.fullmatch(r"\w+", language):
+        raise ValueError(f"Invalid SEARCH_LANGUAGE {language!r}")
+    return language
+
+
+def install_document_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        for statement in POSTGRES_INSTALL:
+            schema_editor.execute(statement.replace("{language}", get_language()))
+    elif vendor == "sqlite":
+        for statement in SQLITE_INSTALL:
+            schema_editor.execute(statement)
+
+
+def uninstall_document_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {"postgresql": POSTGRES_UNINSTALL, "sqlite": SQLITE_UNINSTALL}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("search", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_document_index, uninstall_document_index),
+    ]
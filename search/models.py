@@ -0,0 +1,47 @@
+from django.db import models
+from accounts.models import User
+from group.models import Group
+from organization.models import Organization
+
+DOCUMENT_KINDS = (
+    ("BLOG", "BLOG"),
+    ("BLOG_COMMENT", "BLOG_COMMENT"),
+    ("BLOG_COMMENT_REPLY", "BLOG_COMMENT_REPLY"),
+    ("FORUM", "FORUM"),
+    ("FORUM_COMMENT", "FORUM_COMMENT"),
+    ("FORUM_COMMENT_REPLY", "FORUM_COMMENT_REPLY"),
+)
+
+
+class SearchDocument(models.Model):
+    """The searchable text of a blog, forum, comment or reply
+
+    The full-text index over title and body is kept by the database, see search.backends.
+    """
+
+    kind = models.CharField(max_length=30, choices=DOCUMENT_KINDS)
+    object_id = models.BigIntegerField()
+    parent_id = models.BigIntegerField(null=True)
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name="search_documents"
+    )
+    group = models.ForeignKey(
+        Group, on_delete=models.CASCADE, null=True, related_name="search_documents"
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, related_name="search_documents"
+    )
+    title = models.TextField(blank=True, default="")
+    body = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="unique_search_document")
+        ]
+        indexes = [
+            models.Index(fields=["organization", "kind"], name="search_document_org_kind_idx")
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.object_id}"
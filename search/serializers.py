@@ -0,0 +1,23 @@
+from rest_framework import serializers
+
+from .models import SearchDocument
+
+
+class SearchResultSerializer(serializers.ModelSerializer):
+    rank = serializers.FloatField(read_only=True)
+    snippet = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = SearchDocument
+        fields = [
+            "kind",
+            "object_id",
+            "parent_id",
+            "organization",
+            "group",
+            "user",
+            "title",
+            "snippet",
+            "rank",
+            "created_at",
+        ]
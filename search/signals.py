@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from .indexing import SEARCH_SOURCES, index_instance, remove_instance
+
+
+def index_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_instance(instance)
+
+
+def remove_on_delete(sender, instance, **kwargs):
+    remove_instance(instance)
+
+
+for model, *_ in SEARCH_SOURCES:
+    post_save.connect(index_on_save, sender=model)
+    post_delete.connect(remove_on_delete, sender=model)
@@ -0,0 +1,143 @@
+from io import StringIO
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from accounts.tests.factories import UserFactory
+from blog.models import Blog, Comment
+from forum.models import Forum, ForumComment
+from leader.tests.factories import OrganizationFactory, GroupFactory
+from search.models import SearchDocument
+
+pytestmark = pytest.mark.django_db
+
+SEARCH_URL = reverse("search:search-list")
+
+
+@pytest.fixture
+def organization_posts():
+    organization = OrganizationFactory()
+    group = GroupFactory(organization_id=organization.organization_id)
+    user = UserFactory(organization_id=organization.organization_id)
+    scope = {"organization": organization, "group": group}
+
+    blog = Blog.objects.create(
+        author=user, topic="Knowledge sharing", content="How teams share tacit knowledge", **scope
+    )
+    Comment.objects.create(blog=blog, user=user, content="Sharing works in pairs", **scope)
+    forum = Forum.objects.create(
+        user=user, topic="Onboarding", content="Knowledge transfer for new hires", **scope
+    )
+    ForumComment.objects.create(forum=forum, user=user, content="Unrelated remark", **scope)
+
+    # Another organization's posts are never found
+    other_organization = OrganizationFactory()
+    Blog.objects.create(
+        author=user,
+        organization=other_organization,
+        group=GroupFactory(organization_id=other_organization.organization_id),
+        topic="Knowledge elsewhere",
+    )
+    return user, group, blog, forum
+
+
+def search(api_client, user, **params):
+    api_client.force_authenticate(user=user)
+    return api_client.get(SEARCH_URL, params)
+
+
+class TestSearch:
+    def test_ranks_matches_across_kinds(self, api_client, organization_posts):
+        user, _, blog, forum = organization_posts
+
+        response = search(api_client, user, q="knowledge")
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert {(result["kind"], result["object_id"]) for result in results} == {
+            ("BLOG", blog.pk),
+            ("FORUM", forum.pk),
+        }
+        # Title matches weigh more than body matches
+        assert results[0]["kind"] == "BLOG"
+        assert "<mark>" in results[0]["snippet"]
+        assert results[0]["rank"] >= results[1]["rank"]
+
+    def test_stemmed_words_and_comments_match(self, api_client, organization_posts):
+        user, _, blog, _ = organization_posts
+
+        response = search(api_client, user, q="shares", kind="BLOG_COMMENT")
+
+        results = response.json()["results"]
+        assert [(result["kind"], result["parent_id"]) for result in results] == [
+            ("BLOG_COMMENT", blog.pk)
+        ]
+
+    def test_pages_through_results(self, api_client, organization_posts):
+        user, *_ = organization_posts
+
+        first = search(api_client, user, q="knowledge", page_size=1).json()
+        second = search(api_client, user, q="knowledge", page_size=1, page=2).json()
+
+        assert first["total"] == 2
+        assert first["links"]["next"]
+        assert {first["results"][0]["kind"], second["results"][0]["kind"]} == {"BLOG", "FORUM"}
+
+    def test_index_follows_writes(self, api_client, organization_posts):
+        user, group, blog, forum = organization_posts
+
+        blog.topic = "Retrospectives"
+        blog.content = "What went well"
+        blog.save()
+        forum.delete()
+
+        assert search(api_client, user, q="knowledge").json()["results"] == []
+        assert [
+            result["object_id"]
+            for result in search(api_client, user, q="retrospectives").json()["results"]
+        ] == [blog.pk]
+        assert not SearchDocument.objects.filter(kind="FORUM_COMMENT").exists()
+
+    def test_snippets_escape_markup(self, api_client, organization_posts):
+        user, group, blog, _ = organization_posts
+        Comment.objects.create(
+            blog=blog,
+            user=user,
+            organization=blog.organization,
+            group=group,
+            content="<script>alert('knowledge')</script>",
+        )
+
+        results = search(api_client, user, q="alert", kind="BLOG_COMMENT").json()["results"]
+
+        assert "<script>" not in results[0]["snippet"]
+        assert "&lt;script&gt;" in results[0]["snippet"]
+
+    def test_rebuild_restores_documents(self, api_client, organization_posts):
+        user, *_ = organization_posts
+        SearchDocument.objects.all().delete()
+
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        assert SearchDocument.objects.count() == 5
+        assert len(search(api_client, user, q="knowledge").json()["results"]) == 2
+
+    def test_backfill_indexes_rows_written_before_the_index(self, api_client, organization_posts):
+        user, *_ = organization_posts
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("UPDATE search_searchdocument SET search_vector = NULL")
+            else:
+                fts = "search_searchdocument_fts"
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('delete-all')")
+        assert search(api_client, user, q="knowledge").json()["results"] == []
+
+        call_command("backfill_search_index", stdout=StringIO())
+
+        assert len(search(api_client, user, q="knowledge").json()["results"]) == 2
+
+    @pytest.mark.parametrize("params", [{}, {"q": "knowledge", "kind": "POST"}])
+    def test_rejects_bad_parameters(self, api_client, organization_posts, params):
+        user, *_ = organization_posts
+
+        assert search(api_client, user, **params).status_code == 400
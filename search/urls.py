@@ -0,0 +1,13 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import SearchViewSets
+
+app_name = 'search'
+
+router = DefaultRouter()
+router.register('', SearchViewSets, basename='search')
+
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
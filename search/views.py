@@ -0,0 +1,58 @@
+from rest_framework import mixins, status, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
+from organization.models import Organization
+from .backends import get_search_backend
+from .models import DOCUMENT_KINDS
+from .serializers import SearchResultSerializer
+
+
+class SearchViewSets(mixins.ListModelMixin, viewsets.GenericViewSet):
+    serializer_class = SearchResultSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        query = self.request.query_params.get("q", "").strip()
+        kinds = self.request.query_params.getlist("kind")
+        group = self.request.query_params.get("group")
+        if not query:
+            raise ValidationError(detail="q is required", code=status.HTTP_400_BAD_REQUEST)
+        if not set(kinds) <= {kind for kind, _ in DOCUMENT_KINDS}:
+            raise ValidationError(detail="Invalid kind", code=status.HTTP_400_BAD_REQUEST)
+        if group is not None and not group.isdigit():
+            raise ValidationError(detail="group must be a number", code=status.HTTP_400_BAD_REQUEST)
+
+        # Only the organization of the user is searched
+        organization = Organization.objects.filter(
+            organization_id=self.request.user.organization_id
+        ).first()
+        return get_search_backend().search(
+            query,
+            organization.pk if organization else None,
+            kinds=kinds,
+            group_id=int(group) if group is not None else None,
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="q", description="Words to search for", required=True, type=OpenApiTypes.STR
+            ),
+            OpenApiParameter(
+                name="kind",
+                description="Kinds of documents to search, repeat for several",
+                required=False,
+                type=OpenApiTypes.STR,
+                enum=[kind for kind, _ in DOCUMENT_KINDS],
+                many=True,
+            ),
+            OpenApiParameter(
+                name="group", description="group", required=False, type=OpenApiTypes.INT
+            ),
+        ],
+    )
+    def list(self, request, *args, **kwargs):
+        """Search blogs, forums, comments and replies, best matches first with snippets"""
+        return super().list(request, *args, **kwargs)
@@ -1,14 +1,181 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+import json
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 import math
 
 DEFAULT_PAGE = 1
 
 
+class KeysetPagination(BasePagination):
+    """Cursor pagination on (created_at, id), newest first, matching the -created_at ordering
+
+    A page is read with a range condition on the last row of the page before it instead of an
+    OFFSET, and the total is never counted, so a deep page costs the same as the first one.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    @staticmethod
+    def supports(queryset):
+        # Search results and other sequences are paged by number only
+        model = getattr(queryset, "model", None)
+        return model is not None and any(
+            field.name == "created_at" for field in model._meta.concrete_fields
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(page_size, self.max_page_size) if page_size > 0 else self.page_size
+
+    def decode_cursor(self, request):
+        """(created_at, id) position and direction of the cursor, (None, False) for the first page"""
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            created_at = cursor["created_at"]
+            if created_at is not None:
+                created_at = parse_datetime(created_at)
+                if created_at is None:
+                    raise ValueError(cursor["created_at"])
+            return (created_at, int(cursor["id"])), bool(cursor.get("reverse"))
+        except (Base64Error, KeyError, TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position, reverse=False):
+        created_at, pk = position
+        cursor = {
+            "created_at": created_at.isoformat() if created_at is not None else None,
+            "id": pk,
+            "reverse": reverse,
+        }
+        encoded = urlsafe_b64encode(json.dumps(cursor).encode("ascii")).decode("ascii")
+        return replace_query_param(
+            remove_query_param(self.request.build_absolute_uri(), "page"),
+            self.cursor_query_param,
+            encoded,
+        )
+
+    def get_beyond_condition(self, queryset, position, smaller):
+        """Rows whose (created_at, id) sorts strictly below, or above, position
+
+        NULL created_at rows sort wherever the database puts them, so the ORDER BY stays the
+        plain index order.
+        """
+        created_at, pk = position
+        nulls_largest = connections[queryset.db].features.nulls_order_largest
+        pk_beyond = Q(pk__lt=pk) if smaller else Q(pk__gt=pk)
+
+        if created_at is None:
+            condition = Q(created_at__isnull=True) & pk_beyond
+            if smaller == nulls_largest:
+                condition |= Q(created_at__isnull=False)
+            return condition
+
+        if smaller:
+            condition = Q(created_at__lte=created_at) & (Q(created_at__lt=created_at) | pk_beyond)
+        else:
+            condition = Q(created_at__gte=created_at) & (Q(created_at__gt=created_at) | pk_beyond)
+        if smaller != nulls_largest:
+            condition |= Q(created_at__isnull=True)
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*(["created_at", "pk"] if reverse else ["-created_at", "-pk"]))
+        if position is not None:
+            queryset = queryset.filter(self.get_beyond_condition(queryset, position, not reverse))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = position is not None if reverse else has_more
+        self.has_previous = has_more if reverse else position is not None
+        self.first_position = (rows[0].created_at, rows[0].pk) if rows else position
+        self.last_position = (rows[-1].created_at, rows[-1].pk) if rows else position
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.last_position)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.first_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "links": {
+                    "next": self.get_next_link(),
+                    "previous": self.get_previous_link(),
+                },
+                "page_size": self.page_size,
+                "results": data,
+            }
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Cursor of the page, send it empty for the first page",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
 class CustomPagination(PageNumberPagination):
+    """Page number pagination, or keyset pagination for requests that send a cursor"""
+
     page_size_query_param = "page_size"
+    keyset_pagination_class = KeysetPagination
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        keyset = self.keyset_pagination_class()
+        if keyset.cursor_query_param in request.query_params and keyset.supports(queryset):
+            self.keyset = keyset
+            return keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
 
     def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
         return Response(
             {
                 "links": {
@@ -23,6 +190,10 @@ class CustomPagination(PageNumberPagination):
             }
         )
 
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        return parameters + self.keyset_pagination_class().get_schema_operation_parameters(view)[:1]
+
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 100
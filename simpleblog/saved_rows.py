@@ -0,0 +1,21 @@
+from django.db.models.signals import post_save
+
+
+def get_saved_row(sender, instance):
+    """The stored row an instance is about to overwrite, None when it is not stored
+
+    Read once per save and kept on the instance, so every pre_save receiver comparing an
+    update with the stored row shares one SELECT. Models must be registered with
+    track_saved_rows for the row to be dropped again once the save is done.
+    """
+    if "_saved_row" not in instance.__dict__:
+        instance._saved_row = sender.objects.filter(pk=instance.pk).first()
+    return instance._saved_row
+
+
+def forget_saved_row(sender, instance, **kwargs):
+    instance.__dict__.pop("_saved_row", None)
+
+
+def track_saved_rows(model):
+    post_save.connect(forget_saved_row, sender=model, dispatch_uid=f"saved-row-{model._meta.label}")
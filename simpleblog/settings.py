@@ -3,6 +3,7 @@ from pathlib import Path
 import dj_database_url
 from decouple import config
 import os
+import tempfile
 import cloudinary
 
 
@@ -45,6 +46,8 @@ INSTALLED_APPS = [
     "browser_history",
     "category",
     "leader",
+    "counter",
+    "search",
     "feedback",
     # third-party-apps
     "rest_framework",
@@ -62,6 +65,52 @@ AUTH_USER_MODEL = "accounts.User"
 CLIENT_URL = config('CLIENT_URL')
 REDIS_URL = config('REDIS_URL', '127.0.0.1:6379')
 
+# Read whole days of SECI activity from the daily rollup table. Tallies are only kept while
+# this or SECI_SCORE_SNAPSHOTS is enabled, run `manage.py backfill_activity_tallies` right
+# after enabling it; counts read from the tallies are incomplete until the backfill has finished
+SECI_ACTIVITY_ROLLUPS = config("SECI_ACTIVITY_ROLLUPS", "False").lower() == "true"
+
+# Count SECI activity from the one activity event log instead of every activity table.
+# Events are only logged while enabled, run `manage.py backfill_activity_events` right after
+# enabling it; counts read from the log are incomplete until the backfill has finished
+SECI_ACTIVITY_LOG = config("SECI_ACTIVITY_LOG", "False").lower() == "true"
+
+# Serve period=YYYY-MM SECI details and leaderboards from the monthly score snapshots. They
+# are only kept while enabled, run `manage.py backfill_activity_tallies` (unless
+# SECI_ACTIVITY_ROLLUPS is already on) then `manage.py rebuild_seci_snapshots` right after
+SECI_SCORE_SNAPSHOTS = config("SECI_SCORE_SNAPSHOTS", "False").lower() == "true"
+
+# Answer the get-total-* endpoints from the counter table. Counters are only kept while
+# enabled, run `manage.py reconcile_record_counts` right after enabling it to rebuild them;
+# totals read from the counters are incomplete until it has finished
+RECORD_COUNTS = config("RECORD_COUNTS", "False").lower() == "true"
+
+# Text search configuration of the Postgres full-text index, SQLite uses FTS5 with porter stemming
+SEARCH_LANGUAGE = config("SEARCH_LANGUAGE", "english")
+
+# Chat messages are fanned out first and stored in batches of up to CHAT_BATCH_SIZE,
+# at least every CHAT_BATCH_INTERVAL_MS milliseconds
+CHAT_BATCH_SIZE = config("CHAT_BATCH_SIZE", 100, cast=int)
+CHAT_BATCH_INTERVAL_MS = config("CHAT_BATCH_INTERVAL_MS", 50, cast=int)
+
+# Most visits the in-app browser may send to browser-histories/batch/ in one request
+BROWSER_HISTORY_BATCH_LIMIT = config("BROWSER_HISTORY_BATCH_LIMIT", 1000, cast=int)
+
+# Blog and forum reads and resource downloads are buffered in memory and written as ViewEvent
+# rows once VIEW_EVENT_BATCH_SIZE are buffered, or at the end of the first request after the
+# oldest waited VIEW_EVENT_FLUSH_INTERVAL seconds. A process without requests writes them at
+# exit. Events kept after failed writes are capped at VIEW_EVENT_MAX_BUFFERED, oldest dropped.
+VIEW_EVENT_BATCH_SIZE = config("VIEW_EVENT_BATCH_SIZE", 200, cast=int)
+VIEW_EVENT_FLUSH_INTERVAL = config("VIEW_EVENT_FLUSH_INTERVAL", 10, cast=int)
+VIEW_EVENT_MAX_BUFFERED = config("VIEW_EVENT_MAX_BUFFERED", 10000, cast=int)
+
+# Who is connected to chat: "redis" keeps it next to the channel layer, "local" in process.
+# Sockets refresh their presence every PRESENCE_HEARTBEAT_INTERVAL seconds and count as gone
+# PRESENCE_TTL seconds after the last one, `manage.py flush_presence` copies it to online_count.
+PRESENCE_BACKEND = config("PRESENCE_BACKEND", "redis")
+PRESENCE_TTL = config("PRESENCE_TTL", 60, cast=int)
+PRESENCE_HEARTBEAT_INTERVAL = config("PRESENCE_HEARTBEAT_INTERVAL", 20, cast=int)
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -138,6 +187,19 @@ TEMPLATES = [
 WSGI_APPLICATION = "simpleblog.wsgi.application"
 ASGI_APPLICATION = "simpleblog.asgi.application"
 
+# Shared by every web and worker process, cached SECI weights are invalidated across processes
+# through it. "local" keeps a cache per process and is only fit for a single process.
+CACHE_BACKEND = config("CACHE_BACKEND", "redis")
+if CACHE_BACKEND == "redis":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL if "://" in REDIS_URL else f"redis://{REDIS_URL}",
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels_redis.core.RedisChannelLayer',
@@ -215,13 +277,24 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # for Emails
 
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+EMAIL_BACKEND = config("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
 EMAIL_HOST = config("EMAIL_HOST")
 EMAIL_PORT = config("EMAIL_PORT")
 EMAIL_HOST_USER = config("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD")
 EMAIL_USE_TLS = "EMAIL_USE_TLS"
 
+# Emails are queued in the outbox and sent by `manage.py send_outbox_emails`, up to
+# EMAIL_OUTBOX_BATCH_SIZE per SMTP connection. A failed email is retried after
+# EMAIL_OUTBOX_RETRY_DELAY seconds, doubling up to EMAIL_OUTBOX_MAX_RETRY_DELAY, until
+# EMAIL_OUTBOX_MAX_ATTEMPTS. A worker owns the emails it claimed for EMAIL_OUTBOX_LEASE seconds
+EMAIL_OUTBOX_BATCH_SIZE = config("EMAIL_OUTBOX_BATCH_SIZE", 50, cast=int)
+EMAIL_OUTBOX_RETRY_DELAY = config("EMAIL_OUTBOX_RETRY_DELAY", 30, cast=int)
+EMAIL_OUTBOX_MAX_RETRY_DELAY = config("EMAIL_OUTBOX_MAX_RETRY_DELAY", 3600, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config("EMAIL_OUTBOX_MAX_ATTEMPTS", 8, cast=int)
+EMAIL_OUTBOX_LEASE = config("EMAIL_OUTBOX_LEASE", 300, cast=int)
+EMAIL_OUTBOX_POLL_INTERVAL = config("EMAIL_OUTBOX_POLL_INTERVAL", 5, cast=int)
+
 
 # Add your Cloudinary configuration
 cloudinary.config(
@@ -229,3 +302,31 @@ cloudinary.config(
     api_key=config("API_KEY"),
     api_secret=config("API_SECRET"),
 )
+
+# Resource and profile image files are staged in MEDIA_STAGING_DIR and uploaded to
+# MEDIA_STORAGE_BACKEND by `manage.py process_media_uploads`, MEDIA_UPLOAD_WORKERS at a time.
+# A failed upload is retried after MEDIA_UPLOAD_RETRY_DELAY seconds, doubling, until
+# MEDIA_UPLOAD_MAX_ATTEMPTS. MEDIA_STAGING_DIR must be on storage every web process and the
+# upload worker can reach, the same host or a shared volume: a file staged by a web process
+# the worker cannot read is retried until it fails
+MEDIA_STORAGE_BACKEND = config("MEDIA_STORAGE_BACKEND", "resource.storage.CloudinaryStorage")
+MEDIA_STAGING_DIR = config(
+    "MEDIA_STAGING_DIR", os.path.join(tempfile.gettempdir(), "kcesi-uploads")
+)
+LOCAL_MEDIA_ROOT = config("LOCAL_MEDIA_ROOT", str(BASE_DIR / "media"))
+LOCAL_MEDIA_URL = config("LOCAL_MEDIA_URL", "/media/")
+MEDIA_UPLOAD_WORKERS = config("MEDIA_UPLOAD_WORKERS", 4, cast=int)
+MEDIA_UPLOAD_BATCH_SIZE = config("MEDIA_UPLOAD_BATCH_SIZE", 20, cast=int)
+MEDIA_UPLOAD_MAX_ATTEMPTS = config("MEDIA_UPLOAD_MAX_ATTEMPTS", 5, cast=int)
+MEDIA_UPLOAD_RETRY_DELAY = config("MEDIA_UPLOAD_RETRY_DELAY", 10, cast=int)
+MEDIA_UPLOAD_LEASE = config("MEDIA_UPLOAD_LEASE", 600, cast=int)
+MEDIA_UPLOAD_POLL_INTERVAL = config("MEDIA_UPLOAD_POLL_INTERVAL", 2, cast=int)
+
+# Files of deleted rows are queued and removed by `manage.py purge_media_deletions`, up to
+# MEDIA_DELETION_BATCH_SIZE per batch. A failed deletion is retried after
+# MEDIA_DELETION_RETRY_DELAY seconds, doubling, until MEDIA_DELETION_MAX_ATTEMPTS
+MEDIA_DELETION_BATCH_SIZE = config("MEDIA_DELETION_BATCH_SIZE", 100, cast=int)
+MEDIA_DELETION_MAX_ATTEMPTS = config("MEDIA_DELETION_MAX_ATTEMPTS", 6, cast=int)
+MEDIA_DELETION_RETRY_DELAY = config("MEDIA_DELETION_RETRY_DELAY", 60, cast=int)
+MEDIA_DELETION_LEASE = config("MEDIA_DELETION_LEASE", 300, cast=int)
+MEDIA_DELETION_POLL_INTERVAL = config("MEDIA_DELETION_POLL_INTERVAL", 10, cast=int)
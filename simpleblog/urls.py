@@ -17,6 +17,7 @@ urlpatterns = [
     path("blogs/", include("blog.urls")),
     path("feedbacks/", include("feedback.urls")),
     path("auth/", include("accounts.urls")),
+    path("search/", include("search.urls")),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/v1/doc/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/v1/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
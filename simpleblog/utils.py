@@ -1,4 +1,7 @@
+import heapq
+from collections.abc import Mapping
 from decimal import Decimal, ROUND_DOWN
+from operator import itemgetter
 
 
 def calculate_category_score(constants, tallies):
@@ -113,6 +116,131 @@ def calculate_categorized_percentage(leaders):
         return leaders_sorted
 
 
+SECI_ACTIVITY_KEYS = [
+    "post_blog",
+    "send_chat_message",
+    "post_forum",
+    "image_sharing",
+    "video_sharing",
+    "text_resource_sharing",
+    "created_topic",
+    "comment",
+    "used_in_app_browser",
+    "read_blog",
+    "read_forum",
+    "recieve_chat_message",
+    "download_resources",
+]
+
+# SECI weights are stored with 5 decimal places, scores are exact integers in these units
+WEIGHT_SCALE = 10**5
+
+
+def divide_half_even(numerator, denominator):
+    quotient, remainder = divmod(numerator, denominator)
+    doubled_remainder = 2 * remainder
+    if doubled_remainder > denominator or (doubled_remainder == denominator and quotient % 2):
+        quotient += 1
+    return quotient
+
+
+def build_weight_matrix(*weight_rows, fixed_point=True):
+    """4 x 13 weight matrix from the Socialization, Externalization, Combination and
+    Internalization rows (or mappings), with 0 for activities a dimension does not weigh"""
+
+    matrix = []
+    for weights in weight_rows:
+        if not isinstance(weights, Mapping):
+            weights = {key: getattr(weights, key) for key in SECI_ACTIVITY_KEYS if hasattr(weights, key)}
+        if fixed_point:
+            matrix.append(
+                [int(Decimal(str(weights.get(key, 0))).scaleb(5)) for key in SECI_ACTIVITY_KEYS]
+            )
+        else:
+            matrix.append([float(weights.get(key, 0)) for key in SECI_ACTIVITY_KEYS])
+    return matrix
+
+
+def calculate_batch_scores(tally_matrix, weight_matrix, fixed_point=True, with_shares=True):
+    """Score a users x 13 tally matrix against a 4 x 13 weight matrix in one pass
+
+    Returns per-user [sec, eec, cec, iec] scores, TES values, dimension percentages rounded
+    to 2 places and, unless with_shares is False, every user's share of the summed
+    percentages per dimension. In fixed-point mode the weight matrix must come from
+    build_weight_matrix(fixed_point=True) and the results are Decimals equal to
+    calculate_category_score, calculate_percentage and calculate_categorized_percentage.
+    """
+
+    scores = [
+        [sum(weight * tally for weight, tally in zip(weights, tallies)) for weights in weight_matrix]
+        for tallies in tally_matrix
+    ]
+    tes = [sum(user_scores) for user_scores in scores]
+
+    if fixed_point:
+        percentages = [
+            [divide_half_even(score * 10000, total) if total else 0 for score in user_scores]
+            for user_scores, total in zip(scores, tes)
+        ]
+    else:
+        percentages = [
+            [round(score / total * 100, 2) if total else 0 for score in user_scores]
+            for user_scores, total in zip(scores, tes)
+        ]
+
+    if not with_shares:
+        if fixed_point:
+            return {
+                "scores": [[Decimal(score).scaleb(-5) for score in row] for row in scores],
+                "tes": [Decimal(total).scaleb(-5) for total in tes],
+                "percentages": [[Decimal(value).scaleb(-2) for value in row] for row in percentages],
+            }
+        return {"scores": scores, "tes": tes, "percentages": percentages}
+
+    dimension_totals = [sum(column) for column in zip(*percentages)] or [0] * len(weight_matrix)
+    if fixed_point:
+        shares = [
+            [
+                divide_half_even(percentage * 10000, total) if total else 0
+                for percentage, total in zip(user_percentages, dimension_totals)
+            ]
+            for user_percentages in percentages
+        ]
+        return {
+            "scores": [[Decimal(score).scaleb(-5) for score in row] for row in scores],
+            "tes": [Decimal(total).scaleb(-5) for total in tes],
+            "percentages": [[Decimal(value).scaleb(-2) for value in row] for row in percentages],
+            "shares": [[Decimal(value).scaleb(-2) for value in row] for row in shares],
+        }
+
+    shares = [
+        [
+            round(percentage * 100 / total, 2) if total else 0
+            for percentage, total in zip(user_percentages, dimension_totals)
+        ]
+        for user_percentages in percentages
+    ]
+    return {"scores": scores, "tes": tes, "percentages": percentages, "shares": shares}
+
+
+def select_top_shares(percentages, count, offset=0):
+    """Ranks offset to offset + count of a column of 2 place Decimal percentages
+
+    Users are ranked by their share of the column total like calculate_categorized_percentage
+    does, ties keep their input order, but only offset + count candidates are kept on a heap
+    instead of sorting and formatting every share. Returns (index, share) pairs.
+    """
+
+    hundredths = [int(percentage.scaleb(2)) for percentage in percentages]
+    total = sum(hundredths)
+    shares = (
+        (index, divide_half_even(value * 10000, total) if total else 0)
+        for index, value in enumerate(hundredths)
+    )
+    ranked = heapq.nlargest(offset + count, shares, key=itemgetter(1))
+    return [(index, Decimal(share).scaleb(-2)) for index, share in ranked[offset:]]
+
+
 # # Example usage
 # tallies_example = {
 #     "post_blog": 1,
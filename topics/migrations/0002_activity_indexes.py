@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("group", "0003_usergroup_unique_user_per_group"),
+        ("organization", "0002_alter_organization_organization_id_and_more"),
+        ("platforms", "0001_initial"),
+        ("topics", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="topic",
+            index=models.Index(
+                fields=["organization", "group", "created_at"],
+                name="topic_org_group_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="topic",
+            index=models.Index(
+                fields=["author", "created_at"], name="topic_author_created_idx"
+            ),
+        ),
+    ]
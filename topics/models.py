@@ -22,3 +22,10 @@ class Topic(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["organization", "group", "created_at"],
+                name="topic_org_group_created_idx",
+            ),
+            models.Index(fields=["author", "created_at"], name="topic_author_created_idx"),
+        ]
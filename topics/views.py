@@ -1,6 +1,7 @@
 from rest_framework.request import Request
 from rest_framework.response import Response
 from .models import Topic
+from counter.counts import count_rows
 from .serializers import TopicSerializer
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, status, viewsets, filters
@@ -50,7 +51,7 @@ class TopicViewSets(viewsets.ModelViewSet):
 
         organization = request.query_params["organization"]
 
-        output = Topic.objects.filter(organization=organization).count()
+        output = count_rows(Topic, organization=organization)
         if not output:
             return Response(
                 {"success": False, "total_topics": 0},
@@ -70,7 +71,7 @@ class TopicViewSets(viewsets.ModelViewSet):
     )
     def get_total_topics(self, request, pk=None):
         """get total topics in the app"""
-        output = Topic.objects.count()
+        output = count_rows(Topic)
         if not output:
             return Response(
                 {"success": False, "total_topics": 0},
@@ -102,7 +103,7 @@ class TopicViewSets(viewsets.ModelViewSet):
         """Get total for an  organization topics by groups"""
 
         group = request.query_params["group"]
-        output = Topic.objects.filter(group=group).count()
+        output = count_rows(Topic, group=group)
         if not output:
             return Response(
                 {"success": False, "total_topics": 0},